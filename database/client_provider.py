@@ -0,0 +1,167 @@
+'''
+FILE: database/client_provider.py
+DESCRIPTION:
+    Lazily initialised, process-wide database client.
+
+    Nothing connects at import time. The first call to get_client() creates a
+    single Supabase client (reusing one pooled httpx connection with HTTP/2
+    keep-alive where the installed supabase version accepts a custom httpx
+    client) and every thread shares it afterwards. run() wraps a query with a
+    bounded concurrency limit and retries transient network failures with
+    exponential backoff, so parallel frequency fetches share one pool without
+    flooding the server.
+
+    Which source serves failure rates is chosen in failure_rate_backends.py
+    (RISK_FAILURE_RATE_BACKEND); this module only backs its supabase backend.
+    RISK_DB_BACKEND=local and use_local_backend() remain as aliases for the
+    csv backend, and RISK_FAILURE_RATE_BACKEND wins when both are set.
+
+USAGE:
+    from client_provider import run
+    rows = run(lambda db: db.table("10_Process_Pipe")
+                          .select("category, total")
+                          .eq("equipment_size", "25A")
+                          .execute()).data
+
+ENVIRONMENT:
+    SUPABASE_URL, SUPABASE_KEY    Supabase project credentials
+    RISK_DB_BACKEND               "local" selects the csv failure-rate backend when
+                                  RISK_FAILURE_RATE_BACKEND is unset (legacy alias)
+    RISK_DB_MAX_CONCURRENCY       Concurrent queries allowed (default 8)
+    RISK_DB_RETRIES               Retries for transient failures (default 3)
+'''
+
+import os
+import random
+import threading
+import time
+
+_BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+DEFAULT_CSV_DIR = os.path.join(_BASE_DIR, 'risk_csv', 'cleaned')
+
+try:
+    import httpx
+    TRANSIENT_ERRORS = (httpx.TransportError, ConnectionError, TimeoutError)
+except Exception:
+    httpx = None
+    TRANSIENT_ERRORS = (ConnectionError, TimeoutError)
+
+
+# -----------------------------
+# Provider
+# -----------------------------
+def _env_int(name, default):
+    try:
+        return int(os.getenv(name, default))
+    except (TypeError, ValueError):
+        return default
+
+
+def _create_supabase_client():
+    from supabase import create_client
+    from dotenv import load_dotenv
+
+    load_dotenv()
+    url = os.getenv('SUPABASE_URL')
+    key = os.getenv('SUPABASE_KEY')
+    if not url or not key:
+        raise RuntimeError('SUPABASE_URL and SUPABASE_KEY must be set to use the Supabase backend')
+
+    options = None
+    if httpx is not None:
+        try:
+            from supabase.lib.client_options import SyncClientOptions
+            import dataclasses
+            names = {f.name for f in dataclasses.fields(SyncClientOptions)}
+            if 'httpx_client' in names:
+                try:
+                    http_client = httpx.Client(http2=True, timeout=30.0)
+                except ImportError:
+                    # h2 not installed: keep-alive over HTTP/1.1
+                    http_client = httpx.Client(timeout=30.0)
+                options = SyncClientOptions(httpx_client=http_client)
+        except Exception:
+            options = None
+
+    if options is not None:
+        return create_client(url, key, options=options)
+    return create_client(url, key)
+
+
+class ClientProvider:
+    '''Thread-safe holder of one shared client plus a concurrency limit.'''
+
+    def __init__(self, factory=None, max_concurrency=None, retries=None, backoff_s=0.25):
+        self._factory = factory
+        self._client = None
+        self._lock = threading.Lock()
+        self.max_concurrency = max_concurrency or _env_int('RISK_DB_MAX_CONCURRENCY', 8)
+        self.retries = retries if retries is not None else _env_int('RISK_DB_RETRIES', 3)
+        self.backoff_s = backoff_s
+        self._semaphore = threading.BoundedSemaphore(self.max_concurrency)
+
+    def _default_factory(self):
+        return _create_supabase_client()
+
+    def get_client(self):
+        '''Return the shared client, creating it on first use.'''
+        client = self._client
+        if client is None:
+            with self._lock:
+                if self._client is None:
+                    factory = self._factory or self._default_factory
+                    self._client = factory()
+                client = self._client
+        return client
+
+    def set_client(self, client):
+        '''Replace the shared client (tests, alternative backends).'''
+        with self._lock:
+            self._client = client
+
+    def reset(self):
+        '''Drop the shared client; the next call creates a new one.'''
+        with self._lock:
+            self._client = None
+
+    def run(self, query):
+        '''Run query(client) under the concurrency limit, retrying transient errors.'''
+        client = self.get_client()
+        attempt = 0
+        while True:
+            with self._semaphore:
+                try:
+                    return query(client)
+                except TRANSIENT_ERRORS:
+                    if attempt >= self.retries:
+                        raise
+            # Back off outside the semaphore so other queries can proceed.
+            delay = self.backoff_s * (2 ** attempt)
+            time.sleep(delay + random.uniform(0, delay / 2))
+            attempt += 1
+
+
+_provider = ClientProvider()
+
+
+def get_provider():
+    return _provider
+
+
+def get_client():
+    return _provider.get_client()
+
+
+def run(query):
+    return _provider.run(query)
+
+
+def use_local_backend(csv_dir=DEFAULT_CSV_DIR):
+    '''Serve failure rates from CSV files (alias for the csv failure-rate backend).
+
+    This switches failure_rate_backends, not this module: get_client() and
+    run() still talk to Supabase.
+    '''
+    from failure_rate_backends import CsvBackend, set_backend
+
+    set_backend(CsvBackend(csv_dir))
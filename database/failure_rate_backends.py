@@ -0,0 +1,514 @@
+'''
+FILE: database/failure_rate_backends.py
+DESCRIPTION:
+    Pluggable sources of equipment failure-rate data.
+
+    Every backend answers the same question: the failure rate rows of one
+    equipment table ('10_Process_Pipe') for one size ('25A'). Deployments pick
+    the lowest-latency source by configuration; tests can use the CSV files.
+
+    Backends:
+        csv       In-memory FailureRateStore built from database/risk_csv/cleaned
+        sqlite    Embedded SQLite file with the normalised schema
+        postgres  Direct Postgres (pooled psycopg2, server-side prepared statements)
+                  against the legacy per-equipment tables
+        postgres_normalized
+                  Same connection pool against the normalised schema; a whole
+                  study is one prepared query
+        supabase  Supabase PostgREST via client_provider (default)
+
+USAGE:
+    from failure_rate_backends import get_backend
+    rows = get_backend().get_failure_rates("10_Process_Pipe", "25A")
+
+ENVIRONMENT:
+    RISK_FAILURE_RATE_BACKEND      csv | sqlite | postgres | postgres_normalized | supabase
+                                   (default supabase). This is the only backend switch;
+                                   the legacy RISK_DB_BACKEND=local means csv and is
+                                   read only when this variable is unset.
+    RISK_FAILURE_RATE_CSV_DIR      CSV directory or snapshot file written by
+                                   risk_csv/ingest.py (default database/risk_csv/cleaned)
+    RISK_FAILURE_RATE_SQLITE_PATH  SQLite file (default database/failure_rates.sqlite3)
+    DB_USER, DB_PASSWORD, DB_HOST, DB_PORT, DB_NAME   Postgres connection
+    RISK_DB_POOL_SIZE              Postgres connections, all kept open (default 8)
+'''
+
+import csv
+import os
+import re
+import sqlite3
+import threading
+import weakref
+from abc import ABC, abstractmethod
+from typing import Dict, Iterable, List, Tuple
+
+from failure_rate_schema import FailureRateStore, alias_key, create_schema, load_tables, normalize_rows
+
+_BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+DEFAULT_CSV_DIR = os.path.join(_BASE_DIR, 'risk_csv', 'cleaned')
+DEFAULT_SQLITE_PATH = os.path.join(_BASE_DIR, 'failure_rates.sqlite3')
+
+RATE_COLUMNS = ('category', 'total', 'full_pressure', 'zero_pressure')
+# Columns of the long table used by snapshots and bulk_load()
+LONG_COLUMNS = ('equipment_table', 'equipment_size', 'category', 'total', 'full_pressure', 'zero_pressure')
+# Equipment tables are named '<number>_<Words_Joined>'; anything else is rejected
+# before it is interpolated into SQL.
+_TABLE_NAME_RE = re.compile(r'^\d+_[A-Za-z_]+$')
+
+
+def _rate_row(category, total, full_pressure, zero_pressure):
+    return {
+        'category': category,
+        'total': float(total or 0.0),
+        'full_pressure': float(full_pressure or 0.0),
+        'zero_pressure': float(zero_pressure or 0.0),
+    }
+
+
+def table_name_from_csv(filename: str) -> str:
+    '''"10_Process Pipe.csv" -> "10_Process_Pipe"'''
+    return os.path.splitext(os.path.basename(filename))[0].replace(' ', '_')
+
+
+def csv_filename_from_table(table_name: str) -> str:
+    '''"10_Process_Pipe" -> "10_Process Pipe.csv"'''
+    number, _, name = table_name.partition('_')
+    return f"{number}_{name.replace('_', ' ')}.csv"
+
+
+def read_csv_dir(csv_dir: str = DEFAULT_CSV_DIR) -> Iterable[Tuple[str, dict]]:
+    '''Yield (table name, raw CSV row) for every cleaned CSV file.
+
+    csv_dir may also be a long-format snapshot file (LONG_COLUMNS).
+    '''
+    if os.path.isfile(csv_dir):
+        with open(csv_dir, newline='', encoding='utf-8') as f:
+            for row in csv.DictReader(f):
+                yield row['equipment_table'], row
+        return
+    for filename in sorted(os.listdir(csv_dir)):
+        if not filename.endswith('.csv'):
+            continue
+        table = table_name_from_csv(filename)
+        with open(os.path.join(csv_dir, filename), newline='', encoding='utf-8') as f:
+            for row in csv.DictReader(f):
+                yield table, row
+
+
+class FailureRateBackend(ABC):
+    '''Source of failure rate rows keyed by equipment table and size.'''
+
+    name = 'base'
+
+    # True when get_many resolves a whole study in one query or gather.
+    batched = False
+
+    @abstractmethod
+    def get_failure_rates(self, table_name: str, db_size: str) -> List[dict]:
+        '''Return rows with keys category, total, full_pressure, zero_pressure.'''
+
+    def get_many(self, pairs: Iterable[Tuple[str, str]]) -> Dict[Tuple[str, str], List[dict]]:
+        '''{(table_name, db_size): rows} for many pairs; backends may batch this.'''
+        return {pair: self.get_failure_rates(*pair) for pair in dict.fromkeys(pairs)}
+
+    def bulk_load(self, rows: List[dict]) -> int:
+        '''Replace the stored data with `rows` (dicts keyed by LONG_COLUMNS).'''
+        raise NotImplementedError(f"The {self.name} backend does not support bulk loading")
+
+    def close(self) -> None:
+        '''Release connections; the backend may not be used afterwards.'''
+
+
+def _rows_by_table(rows: List[dict]) -> Dict[str, List[dict]]:
+    tables: Dict[str, List[dict]] = {}
+    for row in rows:
+        tables.setdefault(row['equipment_table'], []).append(row)
+    return tables
+
+
+class CsvBackend(FailureRateBackend):
+    '''Loads every cleaned CSV once into a FailureRateStore (dense id-keyed array).'''
+
+    name = 'csv'
+    batched = True
+
+    def __init__(self, csv_dir: str = DEFAULT_CSV_DIR):
+        self.csv_dir = csv_dir
+        self._store = None
+        self._lock = threading.Lock()
+
+    def _load(self) -> FailureRateStore:
+        if self._store is None:
+            with self._lock:
+                if self._store is None:
+                    self._store = FailureRateStore.from_rows(
+                        dict(row, equipment_table=table) for table, row in read_csv_dir(self.csv_dir)
+                    )
+        return self._store
+
+    def get_failure_rates(self, table_name, db_size):
+        return self._load().get_many([(table_name, db_size)])[(table_name, db_size)]
+
+    def get_many(self, pairs):
+        return self._load().get_many(pairs)
+
+    def bulk_load(self, rows):
+        '''Rewrite the per-equipment CSV files (cleaned column layout).'''
+        os.makedirs(self.csv_dir, exist_ok=True)
+        columns = ('total', 'full_pressure', 'zero_pressure', 'equipment_size', 'category')
+        for table, table_rows in _rows_by_table(rows).items():
+            path = os.path.join(self.csv_dir, csv_filename_from_table(table))
+            with open(path, 'w', newline='', encoding='utf-8') as f:
+                writer = csv.DictWriter(f, fieldnames=columns, extrasaction='ignore')
+                writer.writeheader()
+                writer.writerows(table_rows)
+        with self._lock:
+            self._store = None
+        return len(rows)
+
+
+class SqliteBackend(FailureRateBackend):
+    '''Embedded SQLite file using the normalised schema (schema/failure_rates.sql).
+
+    Connections are per thread (sqlite3 objects may not cross threads).
+    build_from_csv() creates the file from the cleaned CSV directory.
+    '''
+
+    name = 'sqlite'
+    batched = True
+    # Pairs per query; keeps the bound parameters under SQLite's limit.
+    CHUNK = 400
+
+    def __init__(self, path: str = DEFAULT_SQLITE_PATH):
+        self.path = path
+        self._local = threading.local()
+
+    def _connection(self):
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.path)
+            self._local.conn = conn
+        return conn
+
+    def get_failure_rates(self, table_name, db_size):
+        return self.get_many([(table_name, db_size)])[(table_name, db_size)]
+
+    def get_many(self, pairs):
+        '''Resolve all pairs with one indexed join per chunk of CHUNK pairs.'''
+        pairs = list(dict.fromkeys(pairs))
+        result = {pair: [] for pair in pairs}
+        conn = self._connection()
+        for start in range(0, len(pairs), self.CHUNK):
+            chunk = pairs[start:start + self.CHUNK]
+            values = ', '.join(['(?, ?, ?)'] * len(chunk))
+            params = [p for name, size in chunk for p in (name, alias_key(name), size)]
+            cursor = conn.execute(
+                f'''
+                WITH req(name, alias, size) AS (VALUES {values})
+                SELECT req.name, req.size, c.label, f.total, f.full_pressure, f.zero_pressure
+                FROM req
+                JOIN equipment_alias a ON a.alias = req.alias
+                JOIN size_class s ON s.label = req.size
+                JOIN failure_rate f ON f.equipment_type_id = a.equipment_type_id AND f.size_id = s.id
+                JOIN leak_category c ON c.id = f.category_id
+                ORDER BY req.name, req.size, c.id
+                ''',
+                params,
+            )
+            for name, size, category, total, full, zero in cursor.fetchall():
+                result[(name, size)].append(_rate_row(category, total, full, zero))
+        return result
+
+    def build_from_csv(self, csv_dir: str = DEFAULT_CSV_DIR) -> int:
+        '''(Re)create the normalised tables from CSV files; returns the row count.'''
+        return self.bulk_load([dict(row, equipment_table=table) for table, row in read_csv_dir(csv_dir)])
+
+    def bulk_load(self, rows):
+        conn = self._connection()
+        with conn:
+            create_schema(conn)
+            return load_tables(conn, normalize_rows(rows), placeholder='?')
+
+    def close(self):
+        conn = getattr(self._local, 'conn', None)
+        if conn is not None:
+            conn.close()
+            self._local.conn = None
+
+
+class PostgresBackend(FailureRateBackend):
+    '''Direct Postgres connection to the per-equipment tables.
+
+    Uses a psycopg2 ThreadedConnectionPool; each pooled connection PREPAREs one
+    server-side statement per equipment table the first time it queries it and
+    EXECUTEs it afterwards, so repeated lookups skip parsing and planning.
+
+    The pool keeps all max_connections open by default (min_connections), as
+    psycopg2 closes a returned connection beyond min_connections and its
+    prepared statements go with it. The set of prepared statements is held
+    per connection object, so it cannot outlive the connection.
+    '''
+
+    name = 'postgres'
+
+    def __init__(self, dsn: str = None, min_connections: int = None, max_connections: int = None, **connect_kwargs):
+        from psycopg2.pool import ThreadedConnectionPool
+
+        if dsn is None and not connect_kwargs:
+            from dotenv import load_dotenv
+            load_dotenv()
+            connect_kwargs = {
+                'user': os.getenv('DB_USER'),
+                'password': os.getenv('DB_PASSWORD'),
+                'host': os.getenv('DB_HOST'),
+                'port': os.getenv('DB_PORT'),
+                'dbname': os.getenv('DB_NAME'),
+            }
+        max_connections = max_connections or int(os.getenv('RISK_DB_POOL_SIZE', '8'))
+        if min_connections is None:
+            min_connections = max_connections
+        self._pool = ThreadedConnectionPool(min_connections, max_connections, dsn, **connect_kwargs)
+        # The pool raises instead of waiting when exhausted, so callers queue here.
+        self._slots = threading.BoundedSemaphore(max_connections)
+        # connection -> names of statements prepared on it; an entry goes
+        # away with its connection, even if the pool closes it
+        self._prepared = weakref.WeakKeyDictionary()
+        self._lock = threading.Lock()
+
+    def _prepared_on(self, conn) -> set:
+        '''Names of the statements prepared on conn (empty for a new connection).'''
+        with self._lock:
+            return self._prepared.setdefault(conn, set())
+
+    def _discard(self, conn):
+        '''Roll back and close a connection whose session state is unknown.'''
+        conn.rollback()
+        with self._lock:
+            self._prepared.pop(conn, None)
+        self._pool.putconn(conn, close=True)
+
+    @staticmethod
+    def _statement_name(table_name):
+        return 'failure_rates_' + table_name.lower()
+
+    def get_failure_rates(self, table_name, db_size):
+        if not _TABLE_NAME_RE.match(table_name):
+            raise ValueError(f"Invalid equipment table name '{table_name}'")
+        statement = self._statement_name(table_name)
+
+        with self._slots:
+            return self._query(table_name, statement, db_size)
+
+    def _query(self, table_name, statement, db_size):
+        conn = self._pool.getconn()
+        try:
+            prepared = self._prepared_on(conn)
+            with conn.cursor() as cursor:
+                if statement not in prepared:
+                    cursor.execute(
+                        f'PREPARE {statement} (text) AS '
+                        f'SELECT category, total, full_pressure, zero_pressure '
+                        f'FROM "{table_name}" WHERE equipment_size = $1'
+                    )
+                    prepared.add(statement)
+                cursor.execute(f'EXECUTE {statement} (%s)', (db_size,))
+                rows = cursor.fetchall()
+            conn.commit()
+        except Exception:
+            self._discard(conn)
+            raise
+        self._pool.putconn(conn)
+        return [_rate_row(*row) for row in rows]
+
+    def bulk_load(self, rows):
+        '''TRUNCATE and COPY each per-equipment table in a single transaction.'''
+        import io
+
+        tables = _rows_by_table(rows)
+        for table in tables:
+            if not _TABLE_NAME_RE.match(table):
+                raise ValueError(f"Invalid equipment table name '{table}'")
+
+        with self._slots:
+            conn = self._pool.getconn()
+            try:
+                with conn.cursor() as cursor:
+                    for table, table_rows in tables.items():
+                        buffer = io.StringIO()
+                        writer = csv.writer(buffer)
+                        for row in table_rows:
+                            writer.writerow((row['total'], row['full_pressure'], row['zero_pressure'],
+                                             row['equipment_size'], row['category']))
+                        buffer.seek(0)
+                        cursor.execute(f'TRUNCATE "{table}"')
+                        cursor.copy_expert(
+                            f'COPY "{table}" (total, full_pressure, zero_pressure, equipment_size, category) '
+                            f'FROM STDIN WITH (FORMAT csv)',
+                            buffer,
+                        )
+                conn.commit()
+            except Exception:
+                conn.rollback()
+                self._pool.putconn(conn)
+                raise
+            self._pool.putconn(conn)
+        return len(rows)
+
+    def close(self):
+        self._pool.closeall()
+        self._prepared.clear()
+
+
+class NormalizedPostgresBackend(PostgresBackend):
+    '''Direct Postgres using the normalised schema (schema/failure_rates.sql).
+
+    A whole study is resolved by one prepared statement that joins the
+    requested (name, size) arrays against the indexed fact table.
+    '''
+
+    name = 'postgres_normalized'
+    batched = True
+    STATEMENT = 'failure_rates_study'
+
+    def get_failure_rates(self, table_name, db_size):
+        return self.get_many([(table_name, db_size)])[(table_name, db_size)]
+
+    def get_many(self, pairs):
+        pairs = list(dict.fromkeys(pairs))
+        result = {pair: [] for pair in pairs}
+        if not pairs:
+            return result
+        names = [name for name, _ in pairs]
+        aliases = [alias_key(name) for name, _ in pairs]
+        sizes = [size for _, size in pairs]
+
+        with self._slots:
+            conn = self._pool.getconn()
+            try:
+                prepared = self._prepared_on(conn)
+                with conn.cursor() as cursor:
+                    if self.STATEMENT not in prepared:
+                        cursor.execute(
+                            f'''
+                            PREPARE {self.STATEMENT} (text[], text[], text[]) AS
+                            SELECT r.name, r.size, c.label, f.total, f.full_pressure, f.zero_pressure
+                            FROM unnest($1, $2, $3) AS r(name, alias, size)
+                            JOIN equipment_alias a ON a.alias = r.alias
+                            JOIN size_class s ON s.label = r.size
+                            JOIN failure_rate f ON f.equipment_type_id = a.equipment_type_id AND f.size_id = s.id
+                            JOIN leak_category c ON c.id = f.category_id
+                            ORDER BY r.name, r.size, c.id
+                            '''
+                        )
+                        prepared.add(self.STATEMENT)
+                    cursor.execute(f'EXECUTE {self.STATEMENT} (%s, %s, %s)', (names, aliases, sizes))
+                    rows = cursor.fetchall()
+                conn.commit()
+            except Exception:
+                self._discard(conn)
+                raise
+            self._pool.putconn(conn)
+
+        for name, size, category, total, full, zero in rows:
+            result[(name, size)].append(_rate_row(category, total, full, zero))
+        return result
+
+    def bulk_load(self, rows):
+        '''Create the normalised tables if needed and replace their contents.'''
+        with self._slots:
+            conn = self._pool.getconn()
+            try:
+                create_schema(conn)
+                count = load_tables(conn, normalize_rows(rows), placeholder='%s')
+                conn.commit()
+            except Exception:
+                conn.rollback()
+                self._pool.putconn(conn)
+                raise
+            self._pool.putconn(conn)
+        return count
+
+
+class SupabaseBackend(FailureRateBackend):
+    '''Supabase PostgREST through the shared client_provider client.'''
+
+    name = 'supabase'
+
+    def get_failure_rates(self, table_name, db_size):
+        import client_provider
+
+        response = client_provider.run(
+            lambda db: db.table(table_name).select(
+                'category, total, full_pressure, zero_pressure'
+            ).eq('equipment_size', db_size).execute()
+        )
+        return response.data
+
+    def bulk_load(self, rows, batch_size=500):
+        '''Replace each table's rows with batched inserts (PostgREST has no COPY).'''
+        import client_provider
+
+        columns = ('total', 'full_pressure', 'zero_pressure', 'equipment_size', 'category')
+        for table, table_rows in _rows_by_table(rows).items():
+            payload = [{key: row[key] for key in columns} for row in table_rows]
+            client_provider.run(lambda db: db.table(table).delete().neq('category', '').execute())
+            for start in range(0, len(payload), batch_size):
+                batch = payload[start:start + batch_size]
+                client_provider.run(lambda db: db.table(table).insert(batch).execute())
+        return len(rows)
+
+
+BACKENDS = {
+    'csv': lambda: CsvBackend(os.getenv('RISK_FAILURE_RATE_CSV_DIR', DEFAULT_CSV_DIR)),
+    'sqlite': lambda: SqliteBackend(os.getenv('RISK_FAILURE_RATE_SQLITE_PATH', DEFAULT_SQLITE_PATH)),
+    'postgres': lambda: PostgresBackend(),
+    'postgres_normalized': lambda: NormalizedPostgresBackend(),
+    'supabase': lambda: SupabaseBackend(),
+}
+
+_backend = None
+_backend_lock = threading.Lock()
+
+
+def create_backend(name: str) -> FailureRateBackend:
+    key = (name or 'supabase').strip().lower()
+    if key not in BACKENDS:
+        raise ValueError(f"Unknown failure rate backend '{name}' (choose from {', '.join(BACKENDS)})")
+    return BACKENDS[key]()
+
+
+def configured_backend_name() -> str:
+    '''Backend named by the environment; RISK_FAILURE_RATE_BACKEND wins over the legacy alias.'''
+    name = os.getenv('RISK_FAILURE_RATE_BACKEND')
+    if name:
+        return name
+    if os.getenv('RISK_DB_BACKEND', '').strip().lower() == 'local':
+        return 'csv'
+    return 'supabase'
+
+
+def get_backend() -> FailureRateBackend:
+    '''Return the configured process-wide backend, creating it on first use.'''
+    global _backend
+    if _backend is None:
+        with _backend_lock:
+            if _backend is None:
+                _backend = create_backend(configured_backend_name())
+    return _backend
+
+
+def set_backend(backend) -> None:
+    '''Use `backend` (an instance or a backend name) for all later lookups.'''
+    global _backend
+    if isinstance(backend, str):
+        backend = create_backend(backend)
+    with _backend_lock:
+        previous, _backend = _backend, backend
+    if previous is not None and previous is not backend:
+        previous.close()
+
+
+if __name__ == '__main__':
+    # Build the SQLite file from the cleaned CSVs
+    count = SqliteBackend().build_from_csv()
+    print(f'Wrote {count} rows to {DEFAULT_SQLITE_PATH}')
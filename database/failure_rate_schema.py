@@ -0,0 +1,262 @@
+'''
+FILE: database/failure_rate_schema.py
+DESCRIPTION:
+    Normalised failure-rate data: integer-keyed dimensions and one fact array.
+
+    The per-equipment tables are flattened into equipment_type / size_class /
+    leak_category dimensions plus a failure_rate fact table keyed by their ids
+    (DDL in schema/failure_rates.sql). In memory the facts are a dense numpy
+    array rates[equipment_id, size_id, category_id, field], so a whole study is
+    resolved with one fancy-indexing gather instead of one lookup per row.
+
+CLASSES:
+    NormalizedTables: Dimension and fact rows ready to insert into the schema.
+    FailureRateStore: In-memory store with id lookups and vectorised gathers.
+FUNCTIONS:
+    normalize_rows(rows) -> NormalizedTables
+    create_schema(conn): Run schema/failure_rates.sql on a DB-API connection.
+    load_tables(conn, tables, placeholder): Replace the schema contents.
+'''
+
+import os
+import re
+from dataclasses import dataclass, field
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+_BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+SCHEMA_PATH = os.path.join(_BASE_DIR, 'schema', 'failure_rates.sql')
+
+# Leak categories in hole-size order; ids are 1-based positions.
+CATEGORIES = [
+    ('1-3mm', 1.0, 3.0),
+    ('3-10mm', 3.0, 10.0),
+    ('10-50mm', 10.0, 50.0),
+    ('50-150mm', 50.0, 150.0),
+    ('>150mm', 150.0, None),
+    ('Total', None, None),
+]
+CATEGORY_IDS = {label: i for i, (label, _, _) in enumerate(CATEGORIES, start=1)}
+RATE_FIELDS = ('total', 'full_pressure', 'zero_pressure')
+
+# Per-equipment tables of the reference data (risk_csv/cleaned), keyed by type id.
+EQUIPMENT_TABLES = {
+    1: '1_Centrifugal_Compressors',
+    2: '2_Reciprocating_Compressors',
+    3: '3_Filters',
+    4: '4_Flange',
+    5: '5_Fin_Fan_Heat_Exchanger',
+    6: '6_Plate_Heat_Exchanger',
+    7: '7_Shell_Side_Heat_Exchanger',
+    8: '8_Tube_Side_Heat_Exchanger',
+    9: '9_Pig_Trap',
+    10: '10_Process_Pipe',
+    11: '11_Centrifugal_Pump',
+    12: '12_Reciprocating_Pump',
+    13: '13_Small_Bore_Fittings',
+    14: '14_Actuated_Valves',
+    15: '15_Manual_Valves',
+    16: '16_Process_Vessel',
+    17: '17_Atmospheric_Storage_Vessel',
+}
+
+# Nominal size labels in the reference data.
+SIZE_LABELS = ('12.5A', '25A', '50A', '100A', '125A', '250A', '350A', '500A')
+
+# Equipment labels used by the Frequency Data tab, keyed by equipment type id.
+# They differ from the table names (singular vs plural), so they are aliases.
+UI_EQUIPMENT_NAMES = {
+    1: '1. Centrifugal Compressor',
+    2: '2. Reciprocating Compressor',
+    3: '3. Filter',
+    4: '4. Flange',
+    5: '5. Fin Fan Heat Exchanger',
+    6: '6. Plate Heat Exchanger',
+    7: '7. Shell Side Heat Exchanger',
+    8: '8. Tube Side Heat Exchanger',
+    9: '9. Pig Trap',
+    10: '10. Process Pipe',
+    11: '11. Centrifugal Pump',
+    12: '12. Reciprocating Pump',
+    13: '13. Small Bore Fitting',
+    14: '14. Actuated Valve',
+    15: '15. Manual Valve',
+    16: '16. Process Vessel',
+    17: '17. Atmospheric Storage Vessel',
+}
+
+_SIZE_RE = re.compile(r'^(\d+(?:\.\d+)?)A$')
+
+
+def parse_size_mm(label: str) -> float:
+    '''"25A" -> 25.0'''
+    match = _SIZE_RE.match(label.strip())
+    if not match:
+        raise ValueError(f"Unrecognised equipment size '{label}'")
+    return float(match.group(1))
+
+
+def alias_key(name: str) -> str:
+    '''Aliases are matched case-insensitively with whitespace collapsed.'''
+    return ' '.join(name.split()).casefold()
+
+
+def equipment_dimension(table_name: str) -> Tuple[int, str, str]:
+    '''"10_Process_Pipe" -> (10, "10_Process_Pipe", "Process Pipe")'''
+    number, _, name = table_name.partition('_')
+    return int(number), table_name, name.replace('_', ' ')
+
+
+def size_dimension(labels: Iterable[str]) -> List[Tuple[int, str, float]]:
+    '''(id, label, nominal_mm) rows; ids are 1-based in ascending nominal size.'''
+    sizes = sorted(dict.fromkeys(labels), key=parse_size_mm)
+    return [(size_id, label, parse_size_mm(label)) for size_id, label in enumerate(sizes, start=1)]
+
+
+def equipment_aliases(type_id: int, table_name: str, display_name: str) -> List[str]:
+    names = {table_name, display_name, f'{type_id}. {display_name}', f'{type_id}_{display_name}'}
+    ui_name = UI_EQUIPMENT_NAMES.get(type_id)
+    if ui_name:
+        names.add(ui_name)
+        names.add(ui_name.split('.', 1)[1].strip())
+    return sorted({alias_key(n) for n in names})
+
+
+@dataclass
+class NormalizedTables:
+    equipment: List[Tuple[int, str, str]] = field(default_factory=list)      # id, table_name, display_name
+    aliases: List[Tuple[str, int]] = field(default_factory=list)             # alias, equipment_type_id
+    sizes: List[Tuple[int, str, float]] = field(default_factory=list)        # id, label, nominal_mm
+    categories: List[Tuple[int, str, Optional[float], Optional[float]]] = field(default_factory=list)
+    facts: List[Tuple[int, int, int, float, float, float]] = field(default_factory=list)
+
+
+def normalize_rows(rows: Iterable[dict]) -> NormalizedTables:
+    '''Build dimension and fact rows from long rows (equipment_table, equipment_size, category, rates).'''
+    tables = NormalizedTables()
+    tables.categories = [(CATEGORY_IDS[label], label, lo, hi) for label, lo, hi in CATEGORIES]
+
+    equipment_ids: Dict[str, int] = {}
+    size_ids: Dict[str, int] = {}
+    facts = {}
+    for row in rows:
+        table_name = row['equipment_table']
+        if table_name not in equipment_ids:
+            type_id, _, display_name = equipment_dimension(table_name)
+            equipment_ids[table_name] = type_id
+            tables.equipment.append((type_id, table_name, display_name))
+            tables.aliases.extend((alias, type_id) for alias in equipment_aliases(type_id, table_name, display_name))
+        size = str(row['equipment_size']).strip()
+        if size not in size_ids:
+            size_ids[size] = len(size_ids) + 1
+        category = str(row['category']).strip()
+        if category not in CATEGORY_IDS:
+            raise ValueError(f"{table_name} {size}: unknown category '{category}'")
+        key = (equipment_ids[table_name], size_ids[size], CATEGORY_IDS[category])
+        facts[key] = key + tuple(float(row[f] or 0.0) for f in RATE_FIELDS)
+
+    # Renumber sizes in ascending nominal size so ids sort like sizes.
+    tables.sizes = size_dimension(size_ids)
+    renumber = {size_ids[label]: new_id for new_id, label, _ in tables.sizes}
+    tables.facts = sorted((e, renumber[s], c, t, f, z) for (e, s, c, t, f, z) in facts.values())
+    tables.equipment.sort()
+    return tables
+
+
+class FailureRateStore:
+    '''Dense in-memory failure-rate facts with integer-id lookups.'''
+
+    def __init__(self, tables: NormalizedTables):
+        self.tables = tables
+        self.equipment_ids = {table_name: type_id for type_id, table_name, _ in tables.equipment}
+        self.alias_ids = dict(tables.aliases)
+        self.size_ids = {label: size_id for size_id, label, _ in tables.sizes}
+        self.size_mm = np.array([0.0] + [mm for _, _, mm in tables.sizes])
+        self.category_labels = [label for _, label, _, _ in tables.categories]
+
+        n_equipment = max((e for e, _, _ in tables.equipment), default=0) + 1
+        n_sizes = len(tables.sizes) + 1
+        n_categories = len(tables.categories) + 1
+        # NaN marks (equipment, size) combinations that have no data.
+        self.rates = np.full((n_equipment, n_sizes, n_categories, len(RATE_FIELDS)), np.nan)
+        if tables.facts:
+            facts = np.asarray(tables.facts, dtype=float)
+            idx = facts[:, :3].astype(int)
+            self.rates[idx[:, 0], idx[:, 1], idx[:, 2]] = facts[:, 3:]
+
+    @classmethod
+    def from_rows(cls, rows: Iterable[dict]) -> 'FailureRateStore':
+        return cls(normalize_rows(rows))
+
+    def equipment_id(self, name: str) -> Optional[int]:
+        '''Equipment type id for a table name, UI label or other alias.'''
+        type_id = self.equipment_ids.get(name)
+        if type_id is None:
+            type_id = self.alias_ids.get(alias_key(name))
+        return type_id
+
+    def rows_for(self, equipment_id: int, size_id: int) -> List[dict]:
+        '''Rows in the get_failure_rates format; empty when there is no data.'''
+        block = self.rates[equipment_id, size_id]
+        return [
+            {'category': self.category_labels[c - 1], **dict(zip(RATE_FIELDS, map(float, block[c])))}
+            for c in range(1, block.shape[0])
+            if not np.isnan(block[c, 0])
+        ]
+
+    def gather(self, equipment_ids, size_ids) -> np.ndarray:
+        '''Rates for many (equipment, size) pairs at once: shape (n, categories, fields).'''
+        return self.rates[np.asarray(equipment_ids, dtype=int), np.asarray(size_ids, dtype=int), 1:]
+
+    def get_many(self, pairs: Iterable[Tuple[str, str]]) -> Dict[Tuple[str, str], List[dict]]:
+        '''{(table_name, db_size): rows} for every resolvable pair, from one gather.'''
+        pairs = list(dict.fromkeys(pairs))
+        resolved = [
+            (pair, self.equipment_id(pair[0]), self.size_ids.get(pair[1]))
+            for pair in pairs
+        ]
+        known = [(pair, e, s) for pair, e, s in resolved if e is not None and s is not None]
+        result = {pair: [] for pair in pairs}
+        if not known:
+            return result
+        block = self.gather([e for _, e, _ in known], [s for _, _, s in known])
+        present = ~np.isnan(block[:, :, 0])
+        for i, (pair, _, _) in enumerate(known):
+            result[pair] = [
+                {'category': self.category_labels[c], **dict(zip(RATE_FIELDS, map(float, block[i, c])))}
+                for c in np.flatnonzero(present[i])
+            ]
+        return result
+
+
+def create_schema(conn) -> None:
+    '''Create the normalised tables on a DB-API connection (Postgres or SQLite).'''
+    with open(SCHEMA_PATH, encoding='utf-8') as f:
+        statements = [s.strip() for s in f.read().split(';')]
+    cursor = conn.cursor()
+    for statement in statements:
+        body = '\n'.join(line for line in statement.splitlines() if not line.strip().startswith('--'))
+        if body.strip():
+            cursor.execute(body)
+
+
+def load_tables(conn, tables: NormalizedTables, placeholder: str = '?') -> int:
+    '''Replace the contents of the normalised tables; returns the fact row count.
+
+    placeholder is the driver's parameter marker ('?' for sqlite3, '%s' for psycopg2).
+    The caller commits.
+    '''
+    def insert(table, rows, width):
+        marks = ', '.join([placeholder] * width)
+        cursor.executemany(f'INSERT INTO {table} VALUES ({marks})', rows)
+
+    cursor = conn.cursor()
+    for table in ('failure_rate', 'equipment_alias', 'equipment_type', 'size_class', 'leak_category'):
+        cursor.execute(f'DELETE FROM {table}')
+    insert('equipment_type', tables.equipment, 3)
+    insert('equipment_alias', tables.aliases, 2)
+    insert('size_class', tables.sizes, 3)
+    insert('leak_category', tables.categories, 4)
+    insert('failure_rate', tables.facts, 6)
+    return len(tables.facts)
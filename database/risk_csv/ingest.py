@@ -0,0 +1,201 @@
+'''
+FILE: database/risk_csv/ingest.py
+DESCRIPTION:
+    One-command ingestion of the failure-rate reference data.
+
+    Reads every raw per-equipment CSV, cleans it (column names, forward-filled
+    equipment_size, numeric rates), validates it, normalises all tables into a
+    single long table of (equipment, size, category) rows, bulk-loads that
+    into the chosen backend and writes a versioned snapshot for offline use.
+
+    Validation:
+        errors    unknown or repeated categories, categories or sizes out of
+                  order, negative or missing rates
+        warnings  full_pressure + zero_pressure differs from total, or the
+                  'Total' row differs from the sum of the hole categories, by
+                  more than --tolerance (relative). The published datasets do
+                  not always satisfy these exactly, so they only fail the run
+                  with --strict.
+
+USAGE:
+    python database/risk_csv/ingest.py [--raw raw] [--backend sqlite]
+        [--snapshot-dir DIR] [--tolerance 0.05] [--strict] [--dry-run]
+
+    The snapshot (failure_rates_<date>_<hash>.csv plus a .json manifest) is
+    written outside the repository, to RISK_SNAPSHOT_DIR or by default
+    ~/.risk_cache/snapshots, and can be used directly with
+    RISK_FAILURE_RATE_BACKEND=csv and RISK_FAILURE_RATE_CSV_DIR=<snapshot file>.
+'''
+
+import argparse
+import datetime
+import hashlib
+import json
+import os
+import re
+import sys
+
+import pandas as pd
+
+_BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(_BASE_DIR))
+
+from failure_rate_backends import LONG_COLUMNS, create_backend, table_name_from_csv
+
+# Snapshots are build artefacts; keep them out of the repository by default.
+DEFAULT_SNAPSHOT_DIR = os.path.expanduser(os.getenv('RISK_SNAPSHOT_DIR', '~/.risk_cache/snapshots'))
+
+CATEGORY_ORDER = ['1-3mm', '3-10mm', '10-50mm', '50-150mm', '>150mm', 'Total']
+HOLE_CATEGORIES = CATEGORY_ORDER[:-1]
+RATE_FIELDS = ['total', 'full_pressure', 'zero_pressure']
+_SIZE_RE = re.compile(r'^(\d+(?:\.\d+)?)A$')
+
+
+def read_raw_table(path):
+    '''Clean one raw CSV the way process_csv.py does, plus numeric parsing.'''
+    df = pd.read_csv(path)
+    df.columns = [col.strip().lower().replace(' ', '_') for col in df.columns]
+    df = df.loc[:, [col for col in df.columns if not col.startswith('unnamed')]]
+    df = df.dropna(how='all')
+    df['equipment_size'] = df['equipment_size'].ffill().astype(str).str.strip()
+    df['category'] = df['category'].astype(str).str.strip()
+    for field in RATE_FIELDS:
+        df[field] = pd.to_numeric(df[field], errors='coerce')
+    df.insert(0, 'equipment_table', table_name_from_csv(path))
+    return df[list(LONG_COLUMNS)]
+
+
+def read_raw_dir(raw_dir):
+    files = sorted(f for f in os.listdir(raw_dir) if f.endswith('.csv'))
+    if not files:
+        raise FileNotFoundError(f'No CSV files in {raw_dir}')
+    return pd.concat([read_raw_table(os.path.join(raw_dir, f)) for f in files], ignore_index=True)
+
+
+def _size_value(size):
+    match = _SIZE_RE.match(size)
+    return float(match.group(1)) if match else None
+
+
+def validate(df, tolerance=0.05):
+    '''Return (errors, warnings) as lists of messages.'''
+    errors = []
+    warnings = []
+
+    missing = df[df[RATE_FIELDS].isna().any(axis=1)]
+    for row in missing.itertuples():
+        errors.append(f'{row.equipment_table} {row.equipment_size} {row.category}: missing rate')
+    negative = df[(df[RATE_FIELDS] < 0).any(axis=1)]
+    for row in negative.itertuples():
+        errors.append(f'{row.equipment_table} {row.equipment_size} {row.category}: negative rate')
+    unknown = df[~df['category'].isin(CATEGORY_ORDER)]
+    for row in unknown.itertuples():
+        errors.append(f"{row.equipment_table} {row.equipment_size}: unknown category '{row.category}'")
+
+    rank = {category: i for i, category in enumerate(CATEGORY_ORDER)}
+    for table, table_df in df.groupby('equipment_table', sort=False):
+        sizes = list(dict.fromkeys(table_df['equipment_size']))
+        values = [_size_value(size) for size in sizes]
+        if None in values:
+            errors.append(f"{table}: unrecognised size(s) {[s for s, v in zip(sizes, values) if v is None]}")
+        elif values != sorted(values):
+            errors.append(f'{table}: sizes not in increasing order {sizes}')
+
+        for size, size_df in table_df.groupby('equipment_size', sort=False):
+            categories = list(size_df['category'])
+            ranks = [rank[c] for c in categories if c in rank]
+            if len(set(categories)) != len(categories):
+                errors.append(f'{table} {size}: repeated categories {categories}')
+            elif ranks != sorted(ranks):
+                errors.append(f'{table} {size}: categories out of order {categories}')
+
+            holes = size_df[size_df['category'].isin(HOLE_CATEGORIES)]
+            total_row = size_df[size_df['category'] == 'Total']
+            if not total_row.empty:
+                expected = holes['total'].sum()
+                actual = float(total_row['total'].iloc[0])
+                if abs(actual - expected) > tolerance * max(abs(actual), 1e-30):
+                    warnings.append(
+                        f'{table} {size}: Total row {actual:.3e} != sum of categories {expected:.3e}'
+                    )
+
+    rates = df[df['total'] > 0]
+    split = (rates['full_pressure'] + rates['zero_pressure'] - rates['total']).abs() / rates['total']
+    for row, rel in zip(rates[split > tolerance].itertuples(), split[split > tolerance]):
+        warnings.append(
+            f'{row.equipment_table} {row.equipment_size} {row.category}: '
+            f'full + zero differs from total by {rel:.0%}'
+        )
+    return errors, warnings
+
+
+def write_snapshot(flat, snapshot_dir):
+    '''Write the long table (LONG_COLUMNS) as a versioned CSV plus manifest; returns the CSV path.'''
+    os.makedirs(snapshot_dir, exist_ok=True)
+    content = flat.to_csv(index=False, float_format='%.6g').encode('utf-8')
+    digest = hashlib.sha256(content).hexdigest()
+    version = f"{datetime.date.today():%Y%m%d}_{digest[:8]}"
+    path = os.path.join(snapshot_dir, f'failure_rates_{version}.csv')
+    with open(path, 'wb') as f:
+        f.write(content)
+    manifest = {
+        'version': version,
+        'sha256': digest,
+        'rows': len(flat),
+        'tables': sorted(flat['equipment_table'].unique().tolist()),
+        'created': datetime.datetime.now().isoformat(timespec='seconds'),
+    }
+    with open(os.path.splitext(path)[0] + '.json', 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, indent=2)
+    return path
+
+
+def build_arg_parser():
+    parser = argparse.ArgumentParser(description='Validate and load the failure-rate reference data.')
+    parser.add_argument('--raw', default=os.path.join(_BASE_DIR, 'raw'), help='Directory of raw CSV files')
+    parser.add_argument('--backend', default=os.getenv('RISK_FAILURE_RATE_BACKEND', 'sqlite'),
+                        help='Backend to load into: csv, sqlite, postgres, postgres_normalized or supabase (default: sqlite)')
+    parser.add_argument('--snapshot-dir', default=DEFAULT_SNAPSHOT_DIR,
+                        help=f'Where to write the versioned snapshot (default: {DEFAULT_SNAPSHOT_DIR})')
+    parser.add_argument('--tolerance', type=float, default=0.05,
+                        help='Relative tolerance for the totals consistency checks (default: 0.05)')
+    parser.add_argument('--strict', action='store_true', help='Treat consistency warnings as errors')
+    parser.add_argument('--dry-run', action='store_true', help='Validate and snapshot only; do not load')
+    parser.add_argument('--verbose', action='store_true', help='List every warning')
+    return parser
+
+
+def main(argv=None):
+    args = build_arg_parser().parse_args(argv)
+
+    df = read_raw_dir(args.raw)
+    errors, warnings = validate(df, args.tolerance)
+    print(f'Read {len(df)} rows from {df["equipment_table"].nunique()} tables')
+    for message in errors:
+        print(f'ERROR: {message}', file=sys.stderr)
+    for message in (warnings if args.verbose else warnings[:10]):
+        print(f'WARNING: {message}', file=sys.stderr)
+    if len(warnings) > 10 and not args.verbose:
+        print(f'... {len(warnings) - 10} more warning(s), use --verbose to list them', file=sys.stderr)
+    if errors or (args.strict and warnings):
+        print(f'Validation failed: {len(errors)} error(s), {len(warnings)} warning(s)', file=sys.stderr)
+        return 1
+
+    flat = df[list(LONG_COLUMNS)]
+    snapshot = write_snapshot(flat, args.snapshot_dir)
+    print(f'Snapshot written to {snapshot}')
+
+    if args.dry_run:
+        return 0
+    rows = flat.to_dict('records')
+    backend = create_backend(args.backend)
+    try:
+        count = backend.bulk_load(rows)
+    finally:
+        backend.close()
+    print(f'Loaded {count} rows into the {args.backend} backend')
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,40 @@
+-- Normalised failure-rate schema.
+-- Replaces the 17 per-equipment tables ("1_Centrifugal_Compressors", ...) with
+-- one fact table keyed by integer ids plus small dimension tables. Written to
+-- run unchanged on Postgres and SQLite (see database/failure_rate_schema.py).
+
+CREATE TABLE IF NOT EXISTS equipment_type (
+    id            INTEGER PRIMARY KEY,          -- the number prefix, 1..17
+    table_name    TEXT NOT NULL UNIQUE,         -- legacy table, e.g. '10_Process_Pipe'
+    display_name  TEXT NOT NULL                 -- e.g. 'Process Pipe'
+);
+
+-- Every spelling that should resolve to an equipment type: legacy table
+-- names, UI labels ('10. Process Pipe'), singular/plural forms.
+CREATE TABLE IF NOT EXISTS equipment_alias (
+    alias              TEXT PRIMARY KEY,
+    equipment_type_id  INTEGER NOT NULL REFERENCES equipment_type (id)
+);
+
+CREATE TABLE IF NOT EXISTS size_class (
+    id          INTEGER PRIMARY KEY,
+    label       TEXT NOT NULL UNIQUE,           -- database format, e.g. '25A'
+    nominal_mm  DOUBLE PRECISION NOT NULL
+);
+
+CREATE TABLE IF NOT EXISTS leak_category (
+    id          INTEGER PRIMARY KEY,            -- also the sort order
+    label       TEXT NOT NULL UNIQUE,           -- '1-3mm', ..., '>150mm', 'Total'
+    min_mm      DOUBLE PRECISION,
+    max_mm      DOUBLE PRECISION
+);
+
+CREATE TABLE IF NOT EXISTS failure_rate (
+    equipment_type_id  INTEGER NOT NULL REFERENCES equipment_type (id),
+    size_id            INTEGER NOT NULL REFERENCES size_class (id),
+    category_id        INTEGER NOT NULL REFERENCES leak_category (id),
+    total              DOUBLE PRECISION NOT NULL,
+    full_pressure      DOUBLE PRECISION NOT NULL,
+    zero_pressure      DOUBLE PRECISION NOT NULL,
+    PRIMARY KEY (equipment_type_id, size_id, category_id)
+);
@@ -1,21 +1,26 @@
 # This is the boilerplate for database connections and configuration for the application
+#
+# The client is created on first use by client_provider (shared, thread-safe),
+# so importing this module no longer needs credentials or a network handshake.
+# `from supabase_connect import supabase` still works and returns that client.
 
-import os
 import json
-from supabase import create_client, Client
-from dotenv import load_dotenv
+import os
+import sys
 
-load_dotenv()
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+from client_provider import get_client
 
-url: str = os.getenv("SUPABASE_URL")
-key: str = os.getenv("SUPABASE_KEY")
 
-supabase: Client = create_client(url, key)
+def __getattr__(name):
+    if name == "supabase":
+        return get_client()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
 
 if __name__ == "__main__":
     # Simple test to verify connection
-    response = supabase.table("10_Process_Pipe").select("*").eq("equipment_size", "12.5A").execute()
+    response = get_client().table("10_Process_Pipe").select("*").eq("equipment_size", "12.5A").execute()
     #print(json.dumps(response.data, indent=2))
     pretty_response = json.dumps(response.data, indent=2)
-    print(pretty_response)
\ No newline at end of file
+    print(pretty_response)
@@ -0,0 +1,80 @@
+"""
+Ad-hoc test driver for failure_rate_backends.
+Run: python test_failure_rate_backends.py
+"""
+import os
+import sys
+import tempfile
+from collections import defaultdict
+
+# Ensure local imports work when executed directly
+CURRENT_DIR = os.path.dirname(os.path.abspath(__file__))
+if CURRENT_DIR not in sys.path:
+    sys.path.insert(0, CURRENT_DIR)
+
+from failure_rate_backends import CsvBackend, SqliteBackend, _rate_row, read_csv_dir
+from failure_rate_schema import EQUIPMENT_TABLES, SIZE_LABELS, UI_EQUIPMENT_NAMES
+
+
+def all_pairs():
+    return [(table, size) for table in EQUIPMENT_TABLES.values() for size in SIZE_LABELS]
+
+
+def expected_rows():
+    """Rows per (table, size) read straight from the CSV files, no schema involved."""
+    expected = defaultdict(list)
+    for table, row in read_csv_dir():
+        expected[(table, row['equipment_size'])].append(
+            _rate_row(row['category'], row['total'], row['full_pressure'], row['zero_pressure'])
+        )
+    return expected
+
+
+def by_category(rows):
+    return sorted(rows, key=lambda row: row['category'])
+
+
+def check_parity(backend, expected):
+    pairs = all_pairs()
+    batched = backend.get_many(pairs)
+    assert set(batched) == set(pairs), f"{backend.name}: missing pairs"
+    for pair in pairs:
+        assert by_category(batched[pair]) == by_category(expected.get(pair, [])), (backend.name, pair)
+        single = backend.get_failure_rates(*pair)
+        assert by_category(single) == by_category(batched[pair]), (backend.name, pair, 'get_failure_rates')
+    found = sum(1 for pair in pairs if batched[pair])
+    print(f"{backend.name}: {found} of {len(pairs)} pairs have rows, all match the CSV files")
+    assert found, backend.name
+
+
+def check_aliases(backend):
+    """Frequency Data tab labels resolve to the same rows as the table names."""
+    for type_id, table in EQUIPMENT_TABLES.items():
+        label = UI_EQUIPMENT_NAMES[type_id]
+        for size in SIZE_LABELS:
+            assert by_category(backend.get_failure_rates(label, size)) == \
+                by_category(backend.get_failure_rates(table, size)), (backend.name, label, size)
+
+
+def check_unknown(backend):
+    rows = backend.get_many([('99_Not_A_Table', '25A'), ('10_Process_Pipe', '7A')])
+    assert rows == {('99_Not_A_Table', '25A'): [], ('10_Process_Pipe', '7A'): []}, (backend.name, rows)
+
+
+def main():
+    expected = expected_rows()
+    with tempfile.TemporaryDirectory() as tmp:
+        sqlite_backend = SqliteBackend(os.path.join(tmp, 'failure_rates.sqlite3'))
+        sqlite_backend.build_from_csv()
+        try:
+            for backend in (CsvBackend(), sqlite_backend):
+                check_parity(backend, expected)
+                check_aliases(backend)
+                check_unknown(backend)
+        finally:
+            sqlite_backend.close()
+    print("OK")
+
+
+if __name__ == "__main__":
+    main()
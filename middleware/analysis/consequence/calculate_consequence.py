@@ -41,35 +41,52 @@ from dispersion_calculations import (
     gaussian_plume_concentration,
     gaussian_puff_concentration,
 )
+from dense_gas import (
+    AIR_DENSITY_KG_M3,
+    dense_plume_concentration,
+    dense_puff_concentration,
+    is_dense,
+)
 
-# Calculate leak rates and dispersion per each group
-# Returns: dict keyed by group number, with operational conditions, leak categories, operational dispersion results
-def calculate_group_consequence(
-    *,
-    cache_file_path: Optional[str] = None,
-    group_manager=None,
-    density_overrides: Optional[Dict[int, Dict[str, Any]]] = None,
+def attach_dispersion(
+    leak_profiles: Dict[int, Dict[str, Any]],
     dispersion_params: Optional[Dict[str, Any]] = None,
-    hole_diametres_mm: Optional[Dict[str, float]] = None,
+    job=None,
+    pools: Optional[Dict[int, Dict[str, Any]]] = None,
 ) -> Dict[int, Dict[str, Any]]:
-    
-    group_results = calculate_all_group_frequencies(
-        cache_file_path=cache_file_path,
-        group_manager=group_manager,
-    )
-
-    if not group_results:
-        return {}
-
-    leak_profiles = compute_leak_profiles(
-        group_results,
-        density_overrides=density_overrides,
-        hole_diametres_mm=hole_diametres_mm,
-    )
-
+    """Return a copy of leak_profiles with per-category dispersion results added.
+
+    The input is not modified so cached leak profiles can be reused when only
+    the dispersion inputs change. Liquid groups with an entry in pools (see
+    pool_spread.simulate_pools) disperse their pool's evaporation: the peak
+    evaporation rate for the plume, the evaporated mass for the puff.
+
+    Releases denser than air (gas_vapour_density_kg_m3, or
+    pool_vapour_density_kg_m3 for pools, above air_density_kg_m3) use the
+    dense-gas box/slab models, evaluated for all of a group's categories at
+    once. Both are vapour densities at ambient conditions, not the upstream
+    gas density the leak model uses.
+    """
+    results: Dict[int, Dict[str, Any]] = {}
+    if job is not None:
+        job.start(
+            sum(len(g.get("categories", {})) for g in leak_profiles.values()),
+            "Dispersion",
+        )
     for group_num, group_data in leak_profiles.items():
+        if job is not None:
+            job.checkpoint(results)
+        categories = {
+            category: dict(cat_data)
+            for category, cat_data in group_data.get("categories", {}).items()
+        }
+        results[group_num] = {**group_data, "categories": categories}
+
         phase = group_data.get("phase", "")
-        if phase != "gas" or not dispersion_params:
+        if job is not None:
+            job.advance(len(categories))
+        group_pools = (pools or {}).get(group_num) if phase == "liquid" else None
+        if (phase != "gas" and not group_pools) or not dispersion_params:
             continue
 
         model = str(dispersion_params.get("model", "plume")).lower()
@@ -81,9 +98,42 @@ def calculate_group_consequence(
         z_m = float(dispersion_params.get("z_m", 0.0))
         puff_time = float(dispersion_params.get("puff_time_s", 0.0))
         duration = float(dispersion_params.get("release_duration_s", 0.0))
+        air_density = float(dispersion_params.get("air_density_kg_m3") or AIR_DENSITY_KG_M3)
+        density_key = "pool_vapour_density_kg_m3" if group_pools is not None else "gas_vapour_density_kg_m3"
+        release_density = float(dispersion_params.get(density_key) or 0.0)
 
-        for category, cat_data in group_data.get("categories", {}).items():
+        releases = []
+        for category, cat_data in categories.items():
             leak_rate = float(cat_data.get("leak_rate_kg_s") or 0.0)
+            mass_kg = leak_rate * max(duration, 0.0)
+            source = "leak"
+            if group_pools is not None:
+                pool = group_pools.get(category)
+                if pool is None:
+                    continue
+                leak_rate = float(pool["peak_evaporation_kg_s"])
+                mass_kg = float(pool["evaporated_mass_kg"])
+                source = "pool_evaporation"
+            releases.append((cat_data, leak_rate, mass_kg, source))
+
+        if model in ("plume", "puff") and releases and is_dense(release_density, air_density):
+            if model == "plume":
+                concentrations = dense_plume_concentration(
+                    [r[1] for r in releases], release_density, wind, x_m, y_m, z_m, stability, air_density
+                )
+            else:
+                concentrations = dense_puff_concentration(
+                    [r[2] for r in releases], release_density, wind, x_m, y_m, z_m, puff_time, stability, air_density
+                )
+            for (cat_data, _, _, source), concentration in zip(releases, concentrations):
+                cat_data["dispersion"] = {
+                    "model": f"dense_{model}",
+                    "concentration_kg_m3": float(concentration),
+                    "source": source,
+                }
+            continue
+
+        for cat_data, leak_rate, mass_kg, source in releases:
             dispersion = None
             if model == "plume":
                 concentration = gaussian_plume_concentration(
@@ -100,7 +150,6 @@ def calculate_group_consequence(
                     "concentration_kg_m3": concentration,
                 }
             elif model == "puff":
-                mass_kg = leak_rate * max(duration, 0.0)
                 concentration = gaussian_puff_concentration(
                     mass_kg,
                     wind,
@@ -117,6 +166,39 @@ def calculate_group_consequence(
                 }
 
             if dispersion is not None:
+                dispersion["source"] = source
                 cat_data["dispersion"] = dispersion
 
-    return leak_profiles
+    return results
+
+
+# Calculate leak rates and dispersion per each group
+# Returns: dict keyed by group number, with operational conditions, leak categories, operational dispersion results
+def calculate_group_consequence(
+    *,
+    cache_file_path: Optional[str] = None,
+    group_manager=None,
+    density_overrides: Optional[Dict[int, Dict[str, Any]]] = None,
+    dispersion_params: Optional[Dict[str, Any]] = None,
+    hole_diametres_mm: Optional[Dict[str, float]] = None,
+    job=None,
+) -> Dict[int, Dict[str, Any]]:
+    # job: optional job_control.Job; each stage reports progress and checks
+    # for cancellation once per group.
+    group_results = calculate_all_group_frequencies(
+        cache_file_path=cache_file_path,
+        group_manager=group_manager,
+        job=job,
+    )
+
+    if not group_results:
+        return {}
+
+    leak_profiles = compute_leak_profiles(
+        group_results,
+        density_overrides=density_overrides,
+        hole_diametres_mm=hole_diametres_mm,
+        job=job,
+    )
+
+    return attach_dispersion(leak_profiles, dispersion_params, job=job)
@@ -1,3 +1,7 @@
+import numpy as np
+
+import BlastEngine
+
 def scaled_distance_calc(energy, p0, distance):
   R = distance / (energy / p0 / 1000) ** (1/3) #/1000 for kj to mj conversion
   return R
@@ -10,9 +14,8 @@ def scenario_calc(energy, p0):
   if energy <= 0 or p0 <= 0:
     raise ValueError("Energy and ambient pressure must be positive.")
 
-  res = []
-  for scenario in range(1, 200):
-    R = scaled_distance_calc(energy, p0, scenario)
-    p_s = pressure_calc(R)
-    res.append((scenario, R, p_s))
-  return res
+  distances = np.arange(1, 200)
+  scale = BlastEngine.energy_scale(energy, p0)
+  R = BlastEngine.scaled_distance(distances, scale)
+  p_s = BlastEngine.overpressure("bst", distances, scale)
+  return list(zip(distances.tolist(), R.tolist(), p_s.tolist()))
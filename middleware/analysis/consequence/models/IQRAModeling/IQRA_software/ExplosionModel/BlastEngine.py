@@ -0,0 +1,110 @@
+"""
+Stateless blast overpressure engine (TNT equivalency, TNO and BST correlations)
+
+All three correlations used by the explosion models are power laws in a
+scaled distance:
+
+    p_s = a * Z ** -b,   Z = R / L
+
+where L is the charge length scale: W ** (1/3) for TNT equivalency (W in kg)
+and (E / p0 / 1000) ** (1/3) for TNO and BST (E in kJ, p0 in bar). So both
+directions are closed form and broadcast over NumPy arrays:
+
+    overpressure(model, distances, scale)       -> p_s
+    distance_to_overpressure(model, p, scale)   -> R = L * (a / p) ** (1 / b)
+
+Pass scale with a trailing axis (e.g. scale[:, None]) to evaluate many
+charges against many distances or thresholds in one call.
+"""
+
+from dataclasses import dataclass
+
+import numpy as np
+
+
+@dataclass(frozen=True)
+class BlastCurve:
+    name: str
+    coefficient: float   # a, bar
+    exponent: float      # b
+
+
+CURVES = {
+    "tnt": BlastCurve("TNT equivalency", 5.73, 1.685),
+    "tno": BlastCurve("TNO multi-energy", 0.406, 1.2),
+    "bst": BlastCurve("Baker-Strehlow-Tang", 0.085, 1.05),
+}
+
+
+def _curve(model):
+    if isinstance(model, BlastCurve):
+        return model
+    try:
+        return CURVES[model]
+    except KeyError:
+        raise ValueError(f"Unknown blast model '{model}' (expected one of {sorted(CURVES)})") from None
+
+
+def tnt_equivalent_mass(eta, mass, heat_combustion, tnt_heat_combustion):
+    """W = eta * m * Hc / Hc_TNT (kg); broadcasts over arrays."""
+    return (np.asarray(eta, dtype=float) * np.asarray(mass, dtype=float)
+            * np.asarray(heat_combustion, dtype=float)) / np.asarray(tnt_heat_combustion, dtype=float)
+
+
+def tnt_scale(tnt_mass):
+    """Length scale W ** (1/3) (m) for TNT equivalency."""
+    return np.cbrt(np.asarray(tnt_mass, dtype=float))
+
+
+def energy_scale(energy_kj, p0_bar):
+    """Length scale (E / p0 / 1000) ** (1/3) (m) for TNO and BST; /1000 converts kJ to MJ."""
+    return np.cbrt(np.asarray(energy_kj, dtype=float) / np.asarray(p0_bar, dtype=float) / 1000)
+
+
+def scaled_distance(distances, scale):
+    return np.asarray(distances, dtype=float) / np.asarray(scale, dtype=float)
+
+
+def overpressure(model, distances, scale):
+    """Side-on overpressure (bar) at the given distances (m)."""
+    curve = _curve(model)
+    with np.errstate(divide="ignore"):
+        return curve.coefficient * scaled_distance(distances, scale) ** -curve.exponent
+
+
+def distance_to_overpressure(model, thresholds_bar, scale):
+    """Distance (m) at which the overpressure falls to each threshold (bar)."""
+    curve = _curve(model)
+    thresholds = np.asarray(thresholds_bar, dtype=float)
+    with np.errstate(divide="ignore"):
+        return np.asarray(scale, dtype=float) * (curve.coefficient / thresholds) ** (1.0 / curve.exponent)
+
+
+def model_scale(model, tnt_mass=None, energy_kj=None, p0_bar=None):
+    """Length scale for a model from the charge it uses (TNT mass, or energy and p0)."""
+    if _curve(model) is CURVES["tnt"]:
+        if tnt_mass is None:
+            raise ValueError("TNT equivalency needs the TNT equivalent mass.")
+        return tnt_scale(tnt_mass)
+    if energy_kj is None or p0_bar is None:
+        raise ValueError("TNO and BST need the combustion energy and ambient pressure.")
+    return energy_scale(energy_kj, p0_bar)
+
+
+def threshold_distances(thresholds_bar, tnt_mass=None, energy_kj=None, p0_bar=None, models=("tnt", "tno", "bst")):
+    """
+    {model: distances} for every charge x threshold
+
+    Charges may be arrays; each result has shape charges.shape + thresholds.shape.
+    Models whose charge inputs are missing are skipped.
+    """
+    thresholds = np.asarray(thresholds_bar, dtype=float)
+    result = {}
+    for model in models:
+        try:
+            scale = model_scale(model, tnt_mass, energy_kj, p0_bar)
+        except ValueError:
+            continue
+        scale = scale.reshape(scale.shape + (1,) * thresholds.ndim)
+        result[model] = distance_to_overpressure(model, thresholds, scale)
+    return result
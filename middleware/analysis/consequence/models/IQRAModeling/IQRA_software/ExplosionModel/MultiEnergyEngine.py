@@ -0,0 +1,279 @@
+"""
+Congestion-zone explosion engine (TNO multi-energy and Baker-Strehlow-Tang)
+
+Each congested or confined zone is treated as its own blast source with
+energy E = volume x energy density (3.5 MJ/m3 for a stoichiometric
+hydrocarbon-air mixture) and a strength: a TNO curve number 1-10 or a BST
+flame Mach number. Blast parameters follow Sachs scaling,
+
+    R_bar = R / (E / P0) ** (1/3),   P_bar = dP / P0,   t_bar = t+ * c0 / (E / P0) ** (1/3)
+
+and are read from curve families stored as lookup arrays on a common
+log-spaced R_bar grid. Interpolation is linear in log space along R_bar and
+along the strength axis (so TNO class 6.5 or any Mf between table values is
+allowed). Every zone is evaluated at every receptor at once and the fields
+are superposed by their maximum (envelope).
+
+No digitised chart data ships with the module. The default 'tno_approx'
+family, and 'bst_approx', are reconstructions of the published charts: each
+curve holds its peak overpressure out to where the weak TNO curves start to
+decay (R_bar 0.56; the charge radius 0.24 for BST), then falls off
+acoustically as 1 / R_bar, and never exceeds the detonation curve. The
+detonation curve is the Kinney-Graham free-air TNT blast for a charge of the
+same energy (4680 kJ/kg TNT), so curves 7-10 merge beyond R_bar of about 1 as
+on the chart. Peak overpressures are the TNO class values (0.01 ... 10
+bar/bar) and, for BST, 2.4 Mf^2 / (1 + Mf).
+
+Against TNO_REFERENCE_POINTS, approximate readings of the TNO chart (CPR 14E)
+from curve 1 to 10 and R_bar 0.3 to 10, 'tno_approx' overpressures are within
+12 %. The positive-phase t_bar is not calibrated (it grows slowly with
+distance and is longer for weak curves), so impulses are for screening only.
+Digitised charts loaded with load_family_csv(path, 'tno') or 'bst' are used
+when asked for by name.
+
+The engine is a library for site-wide maps; it is not yet wired into the
+consequence pipeline, the UI or the API.
+
+USAGE:
+    zones = [CongestionZone(x=0, y=0, volume_m3=2000, strength=7),
+             CongestionZone(x=60, y=20, volume_m3=500, strength=5)]
+    field = blast_field(zones, receptors)                            # TNO reconstruction
+    field = blast_field(bst_zones, receptors, method="bst_approx")
+    load_family_csv("tno_curves.csv", "tno")
+    field = blast_field(zones, receptors, method="tno")              # digitised TNO
+    X, Y, field = blast_grid(zones, (-200, 200), (-200, 200), 2.0)
+"""
+
+import csv
+from dataclasses import dataclass
+from typing import Dict, Iterable, List, Sequence
+
+import numpy as np
+
+ENERGY_DENSITY_J_M3 = 3.5e6
+SOUND_SPEED_M_S = 340.0
+P0_PA = 101325.0
+CHARGE_RADIUS_SCALED = 0.24
+TNO_PLATEAU_END_SCALED = 0.56
+TNT_ENERGY_J_KG = 4.68e6
+
+_LOG_R = np.linspace(np.log(0.05), np.log(100.0), 241)
+
+TNO_PEAK = {1: 0.01, 2: 0.02, 3: 0.05, 4: 0.1, 5: 0.2, 6: 0.5, 7: 1.0, 8: 2.0, 9: 5.0, 10: 10.0}
+BST_FLAME_MACH = (0.035, 0.07, 0.125, 0.25, 0.35, 0.5, 0.7, 1.0, 1.4, 2.0, 3.0, 4.0, 5.2)
+
+# (curve number, R_bar, dP / P0) read off the published TNO multi-energy chart
+TNO_REFERENCE_POINTS = (
+    (1, 0.3, 0.01), (1, 5.0, 0.001),
+    (4, 0.3, 0.1), (4, 2.0, 0.03),
+    (6, 0.3, 0.5), (6, 1.0, 0.3),
+    (7, 0.3, 1.0), (7, 1.0, 0.5),
+    (10, 1.0, 0.55), (10, 2.0, 0.17), (10, 5.0, 0.05), (10, 10.0, 0.022),
+)
+
+# Receptors evaluated per block, bounding memory to zones x block values per array.
+_BLOCK = 65536
+
+
+@dataclass(frozen=True)
+class CongestionZone:
+    x: float
+    y: float
+    volume_m3: float
+    strength: float                 # TNO curve number (1-10) or BST flame Mach number
+    z: float = 0.0
+    energy_density_j_m3: float = ENERGY_DENSITY_J_M3
+
+    @property
+    def energy_j(self) -> float:
+        return self.volume_m3 * self.energy_density_j_m3
+
+
+class CurveFamily:
+    """Blast curves P_bar(R_bar) and t_bar(R_bar) indexed by a strength parameter."""
+
+    def __init__(self, name: str, params: Sequence[float], log_r: np.ndarray,
+                 log_p: np.ndarray, log_t: np.ndarray, log_param_axis: bool = False):
+        order = np.argsort(params)
+        self.name = name
+        self.params = np.asarray(params, dtype=float)[order]
+        self.log_param_axis = log_param_axis
+        self._axis = np.log(self.params) if log_param_axis else self.params
+        self.log_r = np.asarray(log_r, dtype=float)
+        self.log_p = np.asarray(log_p, dtype=float)[order]
+        self.log_t = np.asarray(log_t, dtype=float)[order]
+
+    def _weights(self, param, scaled_r):
+        """Cell indices and fractions on the (strength, log R_bar) grid, shared by both tables."""
+        axis = np.log(param) if self.log_param_axis else np.asarray(param, dtype=float)
+        last_p = len(self._axis) - 1
+        pi = np.interp(axis, self._axis, np.arange(last_p + 1, dtype=float))
+        p0 = np.minimum(pi.astype(np.intp), max(last_p - 1, 0))
+        pf = pi - p0
+        p1 = np.minimum(p0 + 1, last_p)
+
+        step = self.log_r[1] - self.log_r[0]
+        ri = np.clip((np.log(scaled_r) - self.log_r[0]) / step, 0.0, len(self.log_r) - 1.0)
+        r0 = np.minimum(ri.astype(np.intp), len(self.log_r) - 2)
+        rf = ri - r0
+        return p0, p1, pf, r0, rf
+
+    @staticmethod
+    def _bilinear(table, weights):
+        p0, p1, pf, r0, rf = weights
+        low = table[p0, r0] * (1 - rf) + table[p0, r0 + 1] * rf
+        high = table[p1, r0] * (1 - rf) + table[p1, r0 + 1] * rf
+        return low * (1 - pf) + high * pf
+
+    def evaluate(self, param, scaled_r):
+        """(dP / P0, t+ c0 / (E / P0) ** (1/3)) at each (strength, R_bar)."""
+        weights = self._weights(param, scaled_r)
+        return np.exp(self._bilinear(self.log_p, weights)), np.exp(self._bilinear(self.log_t, weights))
+
+    def overpressure(self, param, scaled_r):
+        """Scaled side-on overpressure dP / P0."""
+        return np.exp(self._bilinear(self.log_p, self._weights(param, scaled_r)))
+
+    def duration(self, param, scaled_r):
+        """Scaled positive-phase duration t+ c0 / (E / P0) ** (1/3)."""
+        return np.exp(self._bilinear(self.log_t, self._weights(param, scaled_r)))
+
+
+def detonation_overpressure(scaled_r):
+    """Kinney-Graham free-air TNT blast dP / P0 at R_bar, for a TNT charge of the same energy."""
+    z = np.asarray(scaled_r, dtype=float) * np.cbrt(TNT_ENERGY_J_KG / P0_PA)
+    return 808.0 * (1 + (z / 4.5) ** 2) / np.sqrt(
+        (1 + (z / 0.048) ** 2) * (1 + (z / 0.32) ** 2) * (1 + (z / 1.35) ** 2)
+    )
+
+
+def _parametric_curves(peaks: Sequence[float], plateau_end: float = TNO_PLATEAU_END_SCALED):
+    """Plateau, then acoustic 1 / R_bar decay, capped by the detonation curve, on the log R_bar grid."""
+    scaled_r = np.exp(_LOG_R)
+    detonation = detonation_overpressure(scaled_r)
+    log_p = np.empty((len(peaks), len(_LOG_R)))
+    log_t = np.empty_like(log_p)
+    log_r0 = np.log(CHARGE_RADIUS_SCALED)
+    for i, peak in enumerate(peaks):
+        log_p[i] = np.log(np.minimum(peak * np.minimum(1.0, plateau_end / scaled_r), detonation))
+        # Longer positive phase for weaker (slower) deflagrations, growing with distance.
+        t0 = 0.3 * (1.0 + 1.5 / (1.0 + 10.0 * peak))
+        log_t[i] = np.log(t0) + 0.25 * np.maximum(_LOG_R - log_r0, 0.0)
+    return log_p, log_t
+
+
+def _default_families() -> Dict[str, CurveFamily]:
+    tno_params = sorted(TNO_PEAK)
+    log_p, log_t = _parametric_curves([TNO_PEAK[n] for n in tno_params])
+    families = {"tno_approx": CurveFamily("TNO multi-energy (approximate)", tno_params, _LOG_R, log_p, log_t)}
+    bst_peaks = [2.4 * mf ** 2 / (1 + mf) for mf in BST_FLAME_MACH]
+    log_p, log_t = _parametric_curves(bst_peaks, CHARGE_RADIUS_SCALED)
+    families["bst_approx"] = CurveFamily(
+        "Baker-Strehlow-Tang (approximate)", BST_FLAME_MACH, _LOG_R, log_p, log_t, log_param_axis=True
+    )
+    return families
+
+
+FAMILIES = _default_families()
+
+
+def load_family_csv(path: str, name: str, log_param_axis: bool = False) -> CurveFamily:
+    """
+    Build a curve family from digitised chart data and register it in FAMILIES
+
+    CSV columns: param, scaled_distance, overpressure[, duration]; each param's
+    points are resampled onto the common R_bar grid (log-log, clamped at the ends).
+    """
+    points: Dict[float, List[tuple]] = {}
+    with open(path, newline="", encoding="utf-8") as f:
+        for row in csv.DictReader(f):
+            duration = row.get("duration")
+            points.setdefault(float(row["param"]), []).append(
+                (float(row["scaled_distance"]), float(row["overpressure"]), float(duration) if duration else np.nan)
+            )
+    params = sorted(points)
+    log_p = np.empty((len(params), len(_LOG_R)))
+    log_t = np.empty_like(log_p)
+    default_t = _parametric_curves([1.0])[1][0]
+    for i, param in enumerate(params):
+        r, p, t = (np.asarray(c, dtype=float) for c in zip(*sorted(points[param])))
+        log_p[i] = np.interp(_LOG_R, np.log(r), np.log(p))
+        known = ~np.isnan(t)
+        log_t[i] = np.interp(_LOG_R, np.log(r[known]), np.log(t[known])) if known.any() else default_t
+    family = CurveFamily(name, params, _LOG_R, log_p, log_t, log_param_axis)
+    FAMILIES[name] = family
+    return family
+
+
+def blast_field(
+    zones: Iterable[CongestionZone],
+    receptors,
+    method: str = "tno_approx",
+    p0_pa: float = P0_PA,
+    sound_speed_m_s: float = SOUND_SPEED_M_S,
+) -> Dict[str, np.ndarray]:
+    """
+    Envelope of the blast from every zone at every receptor
+
+    Args:
+        zones: Congestion zones (strength is a TNO curve number or BST flame Mach number)
+        receptors: (n, 2) or (n, 3) array of receptor coordinates (m)
+        method: Curve family name: 'tno_approx' / 'bst_approx' for the built-in
+            reconstructions, 'tno' / 'bst' once loaded with load_family_csv
+
+    Returns:
+        {'overpressure_bar', 'impulse_pa_s', 'zone'}: arrays of length n; zone is the index
+        of the zone giving the highest overpressure (-1 when there are no zones)
+    """
+    family = FAMILIES.get(method)
+    if family is None:
+        hint = f", or pass method='{method}_approx' for the built-in reconstruction" \
+            if f"{method}_approx" in FAMILIES else ""
+        raise ValueError(
+            f"Curve family '{method}' is not loaded: load digitised chart data with "
+            f"load_family_csv(path, '{method}'){hint}"
+        )
+    zones = list(zones)
+    points = np.atleast_2d(np.asarray(receptors, dtype=float))
+    n = len(points)
+    result = {
+        "overpressure_bar": np.zeros(n),
+        "impulse_pa_s": np.zeros(n),
+        "zone": np.full(n, -1, dtype=int),
+    }
+    if not zones or not n:
+        return result
+
+    centres = np.array([[z.x, z.y, z.z] for z in zones])[:, :points.shape[1]]
+    length = np.cbrt(np.array([z.energy_j for z in zones]) / p0_pa)[:, None]
+    strength = np.array([z.strength for z in zones], dtype=float)[:, None]
+    for start in range(0, n, _BLOCK):
+        block = points[start:start + _BLOCK]
+        distance = np.sqrt(((block[None, :, :] - centres[:, None, :]) ** 2).sum(axis=2))
+        scaled = np.maximum(distance, 1e-9) / length
+        scaled_p, scaled_t = family.evaluate(np.broadcast_to(strength, scaled.shape), scaled)
+        pressure = scaled_p * p0_pa
+        duration = scaled_t * length / sound_speed_m_s
+        impulse = 0.5 * pressure * duration
+        governing = np.argmax(pressure, axis=0)
+        columns = np.arange(len(block))
+        result["overpressure_bar"][start:start + len(block)] = pressure[governing, columns] / 1e5
+        result["impulse_pa_s"][start:start + len(block)] = impulse.max(axis=0)
+        result["zone"][start:start + len(block)] = governing
+    return result
+
+
+def blast_grid(
+    zones: Iterable[CongestionZone],
+    x_range: Sequence[float],
+    y_range: Sequence[float],
+    resolution_m: float,
+    method: str = "tno_approx",
+    p0_pa: float = P0_PA,
+):
+    """blast_field on a ground-level grid; returns X, Y and the fields reshaped to X.shape."""
+    xs = np.arange(x_range[0], x_range[1] + resolution_m / 2, resolution_m)
+    ys = np.arange(y_range[0], y_range[1] + resolution_m / 2, resolution_m)
+    X, Y = np.meshgrid(xs, ys)
+    field = blast_field(zones, np.column_stack([X.ravel(), Y.ravel()]), method=method, p0_pa=p0_pa)
+    return X, Y, {key: value.reshape(X.shape) for key, value in field.items()}
@@ -1,3 +1,7 @@
+import numpy as np
+
+import BlastEngine
+
 def energy_context_calc(mass_part, lhv):
     energy = mass_part * lhv
     return energy
@@ -11,10 +15,9 @@ def pressure_calc(R):
     return p_s
 
 def scenario_calc(energy, p0):
-    res = []
-    for scenario in range(1, 200):
-        R = scaled_distance_calc(scenario, energy, p0)
-        p_s = pressure_calc(R)
-        res.append((scenario, R, p_s))
-    return res
+    distances = np.arange(1, 200)
+    scale = BlastEngine.energy_scale(energy, p0)
+    R = BlastEngine.scaled_distance(distances, scale)
+    p_s = BlastEngine.overpressure("tno", distances, scale)
+    return list(zip(distances.tolist(), R.tolist(), p_s.tolist()))
         #print(f"Distance: {scenario} m, Scaled Distance: {R:.2f}, Overpressure: {p_s:.4f} bar")
\ No newline at end of file
@@ -1,5 +1,9 @@
 from dataclasses import dataclass
 
+import numpy as np
+
+import BlastEngine
+
 # Global variable to store TNT equivalent mass (W)
 tnt_mass_global = None
 
@@ -45,9 +49,6 @@ def per_distance_pressure(tnt_mass=None, start=1, end=200):
     end = int(end)
     if start <= 0 or end <= 0 or end < start:
         raise ValueError("Distance range must be positive and end >= start.")
-    pressure_values = []
-    for distance in range(start, end + 1):
-        z_e = scale_param_calc(mass, distance)
-        p_s = distance_pressure_calc(z_e)
-        pressure_values.append((distance, p_s))
-    return pressure_values
+    distances = np.arange(start, end + 1)
+    pressures = BlastEngine.overpressure("tnt", distances, BlastEngine.tnt_scale(mass))
+    return list(zip(distances.tolist(), pressures.tolist()))
@@ -0,0 +1,116 @@
+"""
+Ad-hoc test driver for MultiEnergyEngine.
+Run: python test_multi_energy_engine.py
+"""
+import csv
+import os
+import sys
+import tempfile
+
+import numpy as np
+
+# Ensure local imports work when executed directly
+CURRENT_DIR = os.path.dirname(os.path.abspath(__file__))
+if CURRENT_DIR not in sys.path:
+    sys.path.insert(0, CURRENT_DIR)
+
+from MultiEnergyEngine import (
+    FAMILIES,
+    P0_PA,
+    TNO_PEAK,
+    TNO_REFERENCE_POINTS,
+    CongestionZone,
+    blast_field,
+    blast_grid,
+    load_family_csv,
+)
+
+REFERENCE_RTOL = 0.125
+
+
+def check_reference_points():
+    family = FAMILIES['tno_approx']
+    worst = 0.0
+    for curve, scaled_r, expected in TNO_REFERENCE_POINTS:
+        value = float(family.overpressure(curve, scaled_r))
+        worst = max(worst, abs(value / expected - 1))
+        assert np.isclose(value, expected, rtol=REFERENCE_RTOL), (curve, scaled_r, value, expected)
+    print(f"tno_approx against {len(TNO_REFERENCE_POINTS)} chart points: worst error {worst:.1%}")
+
+
+def check_curve_shape():
+    """Peaks inside the charge, never weaker for a stronger curve, always decaying outward."""
+    family = FAMILIES['tno_approx']
+    scaled_r = np.geomspace(0.1, 50.0, 200)
+    curves = np.array([family.overpressure(n, scaled_r) for n in sorted(TNO_PEAK)])
+    assert np.allclose(curves[:, 0], [TNO_PEAK[n] for n in sorted(TNO_PEAK)])
+    assert np.all(np.diff(curves, axis=0) >= -1e-12)
+    assert np.all(np.diff(curves, axis=1) <= 1e-12)
+    # Between curve numbers the curve lies between its neighbours.
+    between = family.overpressure(6.5, scaled_r)
+    assert np.all((between >= curves[5] - 1e-12) & (between <= curves[6] + 1e-12))
+
+
+def check_superposition():
+    """The field is the per-receptor envelope of each zone on its own."""
+    zones = [CongestionZone(x=0.0, y=0.0, volume_m3=2000.0, strength=7),
+             CongestionZone(x=80.0, y=30.0, volume_m3=500.0, strength=5),
+             CongestionZone(x=-40.0, y=90.0, volume_m3=8000.0, strength=6)]
+    receptors = np.random.default_rng(0).uniform(-300.0, 300.0, size=(5000, 2))
+    combined = blast_field(zones, receptors)
+    single = [blast_field([zone], receptors) for zone in zones]
+    pressures = np.array([field['overpressure_bar'] for field in single])
+    assert np.allclose(combined['overpressure_bar'], pressures.max(axis=0))
+    assert np.array_equal(combined['zone'], pressures.argmax(axis=0))
+    assert np.allclose(combined['impulse_pa_s'], np.max([f['impulse_pa_s'] for f in single], axis=0))
+    print("Receptors governed by each zone:", np.bincount(combined['zone'], minlength=len(zones)))
+
+    # Sachs scaling: a lone zone at the centre of its charge gives its curve's peak.
+    at_centre = blast_field(zones[:1], [[1.0, 0.0]])['overpressure_bar'][0]
+    assert np.isclose(at_centre, TNO_PEAK[7] * P0_PA / 1e5), at_centre
+
+    X, Y, grid = blast_grid(zones, (-100.0, 100.0), (-100.0, 100.0), 10.0)
+    flat = blast_field(zones, np.column_stack([X.ravel(), Y.ravel()]))
+    assert np.array_equal(grid['overpressure_bar'].ravel(), flat['overpressure_bar'])
+
+    empty = blast_field([], receptors[:3])
+    assert np.all(empty['overpressure_bar'] == 0) and np.all(empty['zone'] == -1)
+
+
+def check_loaded_family():
+    """Digitised curves are opt-in by name and reproduce the points they were loaded from (after resampling)."""
+    try:
+        blast_field([CongestionZone(0.0, 0.0, 100.0, 7)], [[50.0, 0.0]], method='tno')
+    except ValueError as e:
+        assert 'tno_approx' in str(e), e
+    else:
+        raise AssertionError("'tno' used before load_family_csv")
+
+    approx = FAMILIES['tno_approx']
+    scaled_r = np.geomspace(0.1, 50.0, 40)
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, 'tno.csv')
+        with open(path, 'w', newline='', encoding='utf-8') as f:
+            writer = csv.writer(f)
+            writer.writerow(['param', 'scaled_distance', 'overpressure'])
+            for curve in sorted(TNO_PEAK):
+                for r, p in zip(scaled_r, approx.overpressure(curve, scaled_r)):
+                    writer.writerow([curve, r, p])
+        loaded = load_family_csv(path, 'tno_test')
+    try:
+        for curve in sorted(TNO_PEAK):
+            assert np.allclose(loaded.overpressure(curve, scaled_r), approx.overpressure(curve, scaled_r), rtol=0.02)
+    finally:
+        del FAMILIES['tno_test']
+
+
+def main():
+    check_reference_points()
+    check_curve_shape()
+    check_superposition()
+    check_loaded_family()
+    print("OK")
+
+
+if __name__ == "__main__":
+    main()
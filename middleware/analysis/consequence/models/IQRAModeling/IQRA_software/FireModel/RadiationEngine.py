@@ -0,0 +1,274 @@
+"""
+Vectorised thermal radiation engine (pool fires and jet fires)
+
+Fires are validated once into arrays (PoolFires / JetFires), then the flux
+from every fire at every receptor is one broadcast (fires x receptors)
+evaluation with no per-point checks. Receptors are processed in blocks to
+bound memory; fluxes from several fires add up (combine='sum') or can be
+reduced to the governing fire (combine='max').
+
+Models:
+    'point'  point source, q = tau * f * Q / (pi * r^2) with r measured to the
+             pool rim height (same formula as PoolFire.calculate_radiant_heat_flux)
+    'solid'  Mudan solid flame: vertical cylinder of the pool diameter and flame
+             length L, q = tau * SEP * F with SEP = f * Q / flame surface and F
+             the maximum (vertical/horizontal target) view factor
+    jet fire point source at the middle of the flame, q = tau * f * Q / (4 pi r^2),
+             flame length L = 0.00326 * Q[W] ** 0.478
+
+Flame length of a pool fire uses the Thomas correlation (pool_flame_length);
+when no burning flux is known, Heskestad's L = 0.235 Q[kW] ** 0.4 - 1.02 D.
+
+USAGE:
+    fires = PoolFires.from_sources(x=[0, 40], y=[0, 10], heat_release_kw=[5e4, 2e4],
+                                   diameter_m=[8, 5], radiative_fraction=0.35)
+    flux = pool_fire_flux(fires, receptors, model="solid")
+    X, Y, flux = radiation_grid(fires, (-100, 100), (-100, 100), 1.0)
+"""
+
+from dataclasses import dataclass
+
+import numpy as np
+
+GRAVITY = 9.81
+AIR_DENSITY_KG_M3 = 1.225
+MODELS = ("point", "solid")
+
+# Receptors evaluated per block, bounding memory to fires x block values per array.
+_BLOCK = 65536
+
+
+def _column(values, n, name, low=None, high=None, strict_low=False):
+    array = np.broadcast_to(np.asarray(values, dtype=float), (n,)).copy()
+    if np.isnan(array).any():
+        raise ValueError(f"{name} must be numeric.")
+    if low is not None and (np.any(array <= low) if strict_low else np.any(array < low)):
+        raise ValueError(f"{name} must be {'>' if strict_low else '>='} {low:g}.")
+    if high is not None and np.any(array > high):
+        raise ValueError(f"{name} must be <= {high:g}.")
+    return array
+
+
+def pool_flame_length(burning_flux_kg_m2_s, diameter_m, wind_speed_m_s=0.0, air_density_kg_m3=AIR_DENSITY_KG_M3):
+    """
+    Thomas flame length (m), broadcast over arrays
+
+    L / D = 55 F ** (2/3) (u* < 1) or 55 F ** (2/3) u* ** -0.21, with the combustion
+    Froude number F = m'' / (rho_a sqrt(g D)) and u* = u / (g m'' D / rho_a) ** (1/3).
+    """
+    flux = np.asarray(burning_flux_kg_m2_s, dtype=float)
+    d = np.asarray(diameter_m, dtype=float)
+    froude = flux / (air_density_kg_m3 * np.sqrt(GRAVITY * d))
+    u_star = np.asarray(wind_speed_m_s, dtype=float) / np.cbrt(flux * GRAVITY * d / air_density_kg_m3)
+    lf_d = 55.0 * froude ** (2.0 / 3.0) * np.where(u_star < 1.0, 1.0, np.maximum(u_star, 1.0) ** -0.21)
+    return lf_d * d
+
+
+def heskestad_flame_length(heat_release_kw, diameter_m):
+    """Heskestad flame length L = 0.235 Q ** 0.4 - 1.02 D (m), floored at 0."""
+    q = np.asarray(heat_release_kw, dtype=float)
+    return np.maximum(0.235 * q ** 0.4 - 1.02 * np.asarray(diameter_m, dtype=float), 0.0)
+
+
+def jet_flame_length(heat_release_kw):
+    """Jet flame length L = 0.00326 (m Hc) ** 0.478 (m), heat release in W."""
+    return 0.00326 * (np.asarray(heat_release_kw, dtype=float) * 1000.0) ** 0.478
+
+
+@dataclass(frozen=True)
+class PoolFires:
+    """Validated pool fire arrays; build with from_sources()."""
+    x: np.ndarray
+    y: np.ndarray
+    heat_release_kw: np.ndarray
+    diameter_m: np.ndarray
+    radiative_fraction: np.ndarray
+    transmissivity: np.ndarray
+    flame_length_m: np.ndarray
+
+    @classmethod
+    def from_sources(cls, x, y, heat_release_kw, diameter_m, radiative_fraction=0.35,
+                     transmissivity=1.0, flame_length_m=None, burning_flux_kg_m2_s=None,
+                     wind_speed_m_s=0.0, air_density_kg_m3=AIR_DENSITY_KG_M3) -> 'PoolFires':
+        """Validate every fire once; scalars broadcast to the number of fires."""
+        n = np.broadcast(np.asarray(x), np.asarray(y), np.asarray(heat_release_kw), np.asarray(diameter_m)).size
+        q = _column(heat_release_kw, n, "Heat release rate", 0.0, strict_low=True)
+        d = _column(diameter_m, n, "Pool diameter", 0.0, strict_low=True)
+        if flame_length_m is not None:
+            length = _column(flame_length_m, n, "Flame length", 0.0)
+        elif burning_flux_kg_m2_s is not None:
+            flux = _column(burning_flux_kg_m2_s, n, "Burning flux", 0.0, strict_low=True)
+            length = pool_flame_length(flux, d, wind_speed_m_s, air_density_kg_m3)
+        else:
+            length = heskestad_flame_length(q, d)
+        return cls(
+            x=_column(x, n, "x"),
+            y=_column(y, n, "y"),
+            heat_release_kw=q,
+            diameter_m=d,
+            radiative_fraction=_column(radiative_fraction, n, "Radiative fraction", 0.0, 1.0),
+            transmissivity=_column(transmissivity, n, "Atmospheric transmissivity", 0.0, 1.0),
+            flame_length_m=length,
+        )
+
+    @property
+    def surface_emissive_power(self) -> np.ndarray:
+        """SEP (kW/m2): radiated power over the cylinder's top and side area."""
+        d = self.diameter_m
+        area = np.pi * d * d / 4.0 + np.pi * d * self.flame_length_m
+        return self.radiative_fraction * self.heat_release_kw / area
+
+
+@dataclass(frozen=True)
+class JetFires:
+    """Validated jet fire arrays; build with from_sources()."""
+    x: np.ndarray
+    y: np.ndarray
+    height_m: np.ndarray
+    heat_release_kw: np.ndarray
+    radiative_fraction: np.ndarray
+    transmissivity: np.ndarray
+    direction_rad: np.ndarray       # horizontal jet heading; NaN for a vertical jet
+    flame_length_m: np.ndarray
+
+    @classmethod
+    def from_sources(cls, x, y, mass_rate_kg_s, heat_combustion_kj_kg, radiative_fraction=0.2,
+                     transmissivity=1.0, height_m=0.0, direction_deg=None) -> 'JetFires':
+        n = np.broadcast(np.asarray(x), np.asarray(y), np.asarray(mass_rate_kg_s)).size
+        m = _column(mass_rate_kg_s, n, "Mass release rate", 0.0, strict_low=True)
+        hc = _column(heat_combustion_kj_kg, n, "Heat of combustion", 0.0, strict_low=True)
+        q = m * hc
+        direction = (np.full(n, np.nan) if direction_deg is None
+                     else np.radians(np.broadcast_to(np.asarray(direction_deg, dtype=float), (n,))))
+        return cls(
+            x=_column(x, n, "x"),
+            y=_column(y, n, "y"),
+            height_m=_column(height_m, n, "Release height", 0.0),
+            heat_release_kw=q,
+            radiative_fraction=_column(radiative_fraction, n, "Radiative fraction", 0.0, 1.0),
+            transmissivity=_column(transmissivity, n, "Atmospheric transmissivity", 0.0, 1.0),
+            direction_rad=direction,
+            flame_length_m=jet_flame_length(q),
+        )
+
+    def flame_centres(self) -> np.ndarray:
+        """(n, 3) point-source positions: the middle of each flame."""
+        half = self.flame_length_m / 2.0
+        vertical = np.isnan(self.direction_rad)
+        heading = np.where(vertical, 0.0, self.direction_rad)
+        dx = np.where(vertical, 0.0, half * np.cos(heading))
+        dy = np.where(vertical, 0.0, half * np.sin(heading))
+        dz = np.where(vertical, half, 0.0)
+        return np.column_stack([self.x + dx, self.y + dy, self.height_m + dz])
+
+
+def point_source_flux(heat_release_kw, diameter_m, distance_m, radiative_fraction, transmissivity):
+    """Point-source pool fire flux (kW/m2), broadcast over arrays; no validation."""
+    d = np.asarray(distance_m, dtype=float)
+    r2 = d * d + (np.asarray(diameter_m, dtype=float) / 2.0) ** 2
+    return transmissivity * radiative_fraction * np.asarray(heat_release_kw, dtype=float) / (np.pi * r2)
+
+
+def cylinder_view_factor(distance_m, diameter_m, flame_length_m):
+    """
+    Maximum view factor from a ground-level target to a vertical cylindrical flame
+
+    Mudan's closed forms for vertical (Fv) and horizontal (Fh) targets, combined
+    as sqrt(Fv^2 + Fh^2). Targets at or inside the flame base get F = 1.
+    """
+    d = np.asarray(diameter_m, dtype=float)
+    s = 2.0 * np.asarray(distance_m, dtype=float) / d
+    h = 2.0 * np.asarray(flame_length_m, dtype=float) / d
+    s, h = np.broadcast_arrays(s, h)
+    outside = s > 1.0 + 1e-9
+    s_o = np.where(outside, s, 2.0)
+    h = np.maximum(h, 1e-12)
+    a = (h * h + s_o * s_o + 1.0) / (2.0 * s_o)
+    b = (1.0 + s_o * s_o) / (2.0 * s_o)
+    ratio = (s_o - 1.0) / (s_o + 1.0)
+    term_a = np.arctan(np.sqrt((a + 1.0) / (a - 1.0) * ratio))
+    term_b = np.arctan(np.sqrt((b + 1.0) / (b - 1.0) * ratio))
+    fv = (
+        np.arctan(h / np.sqrt(s_o * s_o - 1.0)) / (np.pi * s_o)
+        + h / (np.pi * s_o) * (term_a * a / np.sqrt(a * a - 1.0) - np.arctan(np.sqrt(ratio)))
+    )
+    fh = (
+        (b - 1.0 / s_o) * term_b / (np.pi * np.sqrt(b * b - 1.0))
+        - (a - 1.0 / s_o) * term_a / (np.pi * np.sqrt(a * a - 1.0))
+    )
+    return np.where(outside, np.minimum(np.sqrt(fv * fv + fh * fh), 1.0), 1.0)
+
+
+def _combine(flux, combine):
+    if combine == "sum":
+        return flux.sum(axis=0)
+    if combine == "max":
+        return flux.max(axis=0)
+    raise ValueError("combine must be 'sum' or 'max'")
+
+
+def _receptors(receptors):
+    points = np.atleast_2d(np.asarray(receptors, dtype=float))
+    if points.shape[1] == 2:
+        points = np.column_stack([points, np.zeros(len(points))])
+    return points
+
+
+def pool_fire_flux(fires: PoolFires, receptors, model: str = "point", combine: str = "sum") -> np.ndarray:
+    """Heat flux (kW/m2) at each (n, 2) ground receptor from every pool fire."""
+    if model not in MODELS:
+        raise ValueError(f"Unknown radiation model '{model}' (expected one of {MODELS})")
+    points = _receptors(receptors)[:, :2]
+    out = np.zeros(len(points))
+    if not len(fires.x) or not len(points):
+        return out
+    centres = np.column_stack([fires.x, fires.y])
+    col = (slice(None), None)
+    for start in range(0, len(points), _BLOCK):
+        block = points[start:start + _BLOCK]
+        distance = np.sqrt(((block[None, :, :] - centres[:, None, :]) ** 2).sum(axis=2))
+        if model == "point":
+            flux = point_source_flux(
+                fires.heat_release_kw[col], fires.diameter_m[col], distance,
+                fires.radiative_fraction[col], fires.transmissivity[col],
+            )
+        else:
+            view = cylinder_view_factor(distance, fires.diameter_m[col], fires.flame_length_m[col])
+            flux = fires.transmissivity[col] * fires.surface_emissive_power[col] * view
+        out[start:start + len(block)] = _combine(flux, combine)
+    return out
+
+
+def jet_fire_flux(fires: JetFires, receptors, combine: str = "sum") -> np.ndarray:
+    """Heat flux (kW/m2) at each (n, 2) or (n, 3) receptor from every jet fire."""
+    points = _receptors(receptors)
+    out = np.zeros(len(points))
+    if not len(fires.x) or not len(points):
+        return out
+    centres = fires.flame_centres()
+    power = (fires.transmissivity * fires.radiative_fraction * fires.heat_release_kw)[:, None]
+    for start in range(0, len(points), _BLOCK):
+        block = points[start:start + _BLOCK]
+        r2 = ((block[None, :, :] - centres[:, None, :]) ** 2).sum(axis=2)
+        out[start:start + len(block)] = _combine(power / (4.0 * np.pi * np.maximum(r2, 1e-6)), combine)
+    return out
+
+
+def point_source_distances(heat_release_kw, diameter_m, radiative_fraction, transmissivity, thresholds_kw_m2):
+    """Distance (m) from the pool centre at which the point-source flux drops to each threshold."""
+    thresholds = np.asarray(thresholds_kw_m2, dtype=float)
+    r2 = transmissivity * radiative_fraction * heat_release_kw / (np.pi * thresholds)
+    return np.sqrt(np.maximum(r2 - (diameter_m / 2.0) ** 2, 0.0))
+
+
+def radiation_grid(fires, x_range, y_range, resolution_m, model: str = "point", combine: str = "sum"):
+    """Flux on a ground-level grid for PoolFires or JetFires; returns X, Y, flux."""
+    xs = np.arange(x_range[0], x_range[1] + resolution_m / 2, resolution_m)
+    ys = np.arange(y_range[0], y_range[1] + resolution_m / 2, resolution_m)
+    X, Y = np.meshgrid(xs, ys)
+    points = np.column_stack([X.ravel(), Y.ravel()])
+    if isinstance(fires, JetFires):
+        flux = jet_fire_flux(fires, points, combine)
+    else:
+        flux = pool_fire_flux(fires, points, model, combine)
+    return X, Y, flux.reshape(X.shape)
@@ -1,6 +1,7 @@
 import tkinter as tk
 from tkinter import messagebox
-import math
+
+from RadiationEngine import pool_flame_length
 
 def calculate_plume_length():
     try:
@@ -10,23 +11,8 @@ def calculate_plume_length():
         u_wind = float(entry_u_wind.get())  # Mean wind speed (m/s)
         rho_air = float(entry_rho_air.get())  # Air density (kg/m^3)
 
-        # Constants
-        g = 9.81  # Gravity (m/s^2)
-
-        # Combustion Froude Number (F)
-        F = gb / (rho_air * math.sqrt(g * diameter))
-
-        # Dimensionless wind speed (U*)
-        u_star = u_wind / ((gb * g * diameter / rho_air) ** (1/3))
-
-        # Calculate Lf/D based on U*
-        if u_star < 1:
-            lf_d = 55 * (F ** (2/3))
-        else:
-            lf_d = 55 * (F ** (2/3)) * (u_star ** -0.21)
-
-        # Calculate Lf (plume length)
-        plume_length = lf_d * diameter
+        # Thomas correlation (shared with the radiation engine)
+        plume_length = float(pool_flame_length(gb, diameter, u_wind, rho_air))
 
         # Display result
         result_label.config(text=f"Calculated Plume Length: {plume_length:.2f} m")
@@ -1,3 +1,5 @@
+import os
+import sys
 import tkinter as tk
 from tkinter import ttk, messagebox
 import numpy as np
@@ -5,32 +7,26 @@ import matplotlib.pyplot as plt
 from matplotlib import colors
 from matplotlib.widgets import Slider
 from mpl_toolkits.mplot3d import Axes3D  # noqa: F401
+from mpl_toolkits.mplot3d.art3d import Poly3DCollection
 
 # -----------------------------
 # Gaussian plume model functions
 # -----------------------------
-def sigma_yz(x, stability_class):
-    if stability_class == 'A':
-        sigma_y = 0.22 * x * (1 + 0.0001 * x) ** -0.5
-        sigma_z = 0.20 * x
-    elif stability_class == 'B':
-        sigma_y = 0.16 * x * (1 + 0.0001 * x) ** -0.5
-        sigma_z = 0.12 * x
-    elif stability_class == 'C':
-        sigma_y = 0.11 * x * (1 + 0.0001 * x) ** -0.5
-        sigma_z = 0.08 * x * (1 + 0.0002 * x) ** -0.5
-    elif stability_class == 'D':
-        sigma_y = 0.08 * x * (1 + 0.0001 * x) ** -0.5
-        sigma_z = 0.06 * x * (1 + 0.0015 * x) ** -0.5
-    elif stability_class == 'E':
-        sigma_y = 0.06 * x * (1 + 0.0001 * x) ** -0.5
-        sigma_z = 0.03 * x * (1 + 0.0003 * x) ** -1
-    elif stability_class == 'F':
-        sigma_y = 0.04 * x * (1 + 0.0001 * x) ** -0.5
-        sigma_z = 0.016 * x * (1 + 0.0003 * x) ** -1
-    else:
-        raise ValueError("Invalid stability class")
-    return sigma_y, sigma_z
+_gas_dispersion_path = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if _gas_dispersion_path not in sys.path:
+    sys.path.insert(0, _gas_dispersion_path)
+
+from stability_params import sigma_yz_plume as sigma_yz  # noqa: E402
+from adaptive_grid import aligned_span, plume_extent, sample_adaptive, threshold_criterion  # noqa: E402
+from iso_surface import IsoSurfaceCache, face_shading  # noqa: E402
+
+# Quadtree / octree levels below the coarse grid for the adaptive plots
+CONTOUR_LEVELS = 4
+FIELD_LEVELS = 3
+# Iso-surfaces in the 3D view: the threshold and each decade above it
+SHELLS = 3
+# Triangles per iso-surface before it is meshed from a coarser grid
+MAX_SHELL_TRIANGLES = 20000
 
 
 def gaussian_plume(Qevp, u_wind, H_E, x, y, z, stability_class):
@@ -45,18 +41,71 @@ def gaussian_plume(Qevp, u_wind, H_E, x, y, z, stability_class):
     return C
 
 
+def plume_concentration(Qevp, u_wind, H_E, x, y, z, stability_class):
+    """gaussian_plume over arrays of points (0 where x <= 0)."""
+    x, y, z = np.broadcast_arrays(*(np.asarray(a, dtype=float) for a in (x, y, z)))
+    C = np.zeros(x.shape)
+    ok = x > 0
+    if u_wind <= 0 or not ok.any():
+        return C
+    sigma_y, sigma_z = sigma_yz(x[ok], stability_class)
+    y, z = y[ok], z[ok]
+    C[ok] = (
+        Qevp / (2 * np.pi * u_wind * sigma_y * sigma_z)
+        * np.exp(-y**2 / (2 * sigma_y**2))
+        * (np.exp(-((H_E - z)**2) / (2 * sigma_z**2)) + np.exp(-((H_E + z)**2) / (2 * sigma_z**2)))
+    )
+    return C
+
+
+def _concentration_field(Qevp, u_wind, H_E, stability_class):
+    return lambda x, y, z: plume_concentration(Qevp, u_wind, H_E, x, y, z, stability_class)
+
+
+def _level_progress(job, levels, label):
+    if job is None:
+        return None
+    job.start(levels + 1, label)
+
+    def progress():
+        job.checkpoint()
+        job.advance()
+
+    return progress
+
+
 # -----------------------------
 # Contour Plot Function
 # -----------------------------
-def plot_contour(Qevp, u_wind, H_E, stability_class, x_min, x_max, z_min, z_max, C_limit):
-    x = np.linspace(x_min, x_max, 200)
-    z = np.linspace(z_min, z_max, 150)
+def plot_contour(Qevp, u_wind, H_E, stability_class, x_min, x_max, z_min, z_max, C_limit, job=None):
+    # Same resolution as a 200 x 150 grid over the whole range, but sampled
+    # only inside the plume's analytic extent (to the lowest colour level) and
+    # refined by a quadtree where the colour changes or the C_limit line runs.
+    dx = (x_max - x_min) / 199
+    dz = (z_max - z_min) / 149
+    x_end, _, z_top = plume_extent(Qevp, u_wind, H_E, stability_class, C_limit / 20)
+    x_hi, nx = aligned_span(x_min, min(x_max, x_end), x_max, dx, CONTOUR_LEVELS)
+    z_hi, nz = aligned_span(z_min, min(z_max, z_top), z_max, dz, CONTOUR_LEVELS)
+    field = _concentration_field(Qevp, u_wind, H_E, stability_class)
+    grid = sample_adaptive(
+        lambda x, z: field(x, 0.0, z),
+        (x_min, z_min),
+        (x_hi, z_hi),
+        (nx, nz),
+        CONTOUR_LEVELS,
+        threshold_criterion(C_limit, tolerance=0.05),
+        progress=_level_progress(job, CONTOUR_LEVELS, "Plume contour"),
+    )
+    x, z = grid["axes"]
+    C = grid["values"].T
+    # Beyond the extent every value is below the lowest colour level
+    if x_hi < x_max:
+        x = np.append(x, x_max)
+        C = np.pad(C, ((0, 0), (0, 1)))
+    if z_hi < z_max:
+        z = np.append(z, z_max)
+        C = np.pad(C, ((0, 1), (0, 0)))
     X, Z = np.meshgrid(x, z)
-    C = np.zeros_like(X)
-
-    for i in range(len(x)):
-        for j in range(len(z)):
-            C[j, i] = gaussian_plume(Qevp, u_wind, H_E, x[i], 0, z[j], stability_class)
 
     # 클리핑 (C_limit 이하만 시각화)
     C_clipped = np.clip(C, 0, C_limit)
@@ -78,6 +127,54 @@ def plot_contour(Qevp, u_wind, H_E, stability_class, x_min, x_max, z_min, z_max,
     plt.show()
 
 
+def compute_plume_field(Qevp, u_wind, H_E, stability_class, x_min, x_max, y_max, z_min, z_max, job=None,
+                        threshold=None):
+    """Evaluate the plume on the 3D plotting grid. Returns (x, y, z, C).
+
+    job: optional job_control.Job, advanced and checked once per x slice
+    (once per refinement level with threshold).
+    threshold: optional iso-surface concentration. The grid is then cut to
+    the plume's analytic extent at that concentration and sampled by an
+    octree refined around the iso-surface, at the regular grid's spacing.
+    """
+    field = _concentration_field(Qevp, u_wind, H_E, stability_class)
+    if threshold is not None and threshold > 0:
+        x_end, y_half, z_top = plume_extent(Qevp, u_wind, H_E, stability_class, threshold)
+        if min(x_max, x_end) > x_min and y_half > 0 and min(z_max, z_top) > z_min:
+            x_hi, nx = aligned_span(x_min, min(x_max, x_end), x_max, (x_max - x_min) / 69, FIELD_LEVELS)
+            y_hi, ny = aligned_span(0.0, min(y_max, y_half), y_max, 2 * y_max / 69, FIELD_LEVELS)
+            z_hi, nz = aligned_span(z_min, min(z_max, z_top), z_max, (z_max - z_min) / 39, FIELD_LEVELS)
+            # The plume is symmetric in y: sample y >= 0 and mirror.
+            grid = sample_adaptive(
+                field,
+                (x_min, 0.0, z_min),
+                (x_hi, y_hi, z_hi),
+                (nx, ny, nz),
+                FIELD_LEVELS,
+                threshold_criterion(threshold, span=10.0),
+                progress=_level_progress(job, FIELD_LEVELS, "Plume field"),
+            )
+            x, y, z = grid["axes"]
+            C = grid["values"]
+            return x, np.concatenate([-y[:0:-1], y]), z, np.concatenate([C[:, :0:-1, :], C], axis=1)
+
+    x = np.linspace(x_min, x_max, 70)
+    y = np.linspace(-y_max, y_max, 70)
+    z = np.linspace(z_min, z_max, 40)
+    C = np.zeros((x.size, y.size, z.size))
+    Y, Z = np.meshgrid(y, z, indexing="ij")
+
+    if job is not None:
+        job.start(x.size, "Plume field")
+    for i, x_val in enumerate(x):
+        if job is not None:
+            job.checkpoint()
+        C[i] = field(x_val, Y, Z)
+        if job is not None:
+            job.advance()
+    return x, y, z, C
+
+
 def plot_plume_3d(
     Qevp,
     u_wind,
@@ -89,34 +186,20 @@ def plot_plume_3d(
     z_min,
     z_max,
     C_limit,
+    field=None,
 ):
-    x = np.linspace(x_min, x_max, 70)
-    y = np.linspace(-y_max, y_max, 70)
-    z = np.linspace(z_min, z_max, 40)
-    X, Y, Z = np.meshgrid(x, y, z, indexing="ij")
-    C = np.zeros_like(X)
-
-    for i, x_val in enumerate(x):
-        for j, y_val in enumerate(y):
-            for k, z_val in enumerate(z):
-                C[i, j, k] = gaussian_plume(Qevp, u_wind, H_E, x_val, y_val, z_val, stability_class)
+    # field: optional precomputed (x, y, z, C) from compute_plume_field, so the
+    # evaluation can run off the UI thread and only the drawing happens here.
+    if field is None:
+        field = compute_plume_field(
+            Qevp, u_wind, H_E, stability_class, x_min, x_max, y_max, z_min, z_max, threshold=C_limit
+        )
+    x, y, z, C = field
 
     positive = C[C > 0]
     if positive.size == 0:
         return
 
-    vmax = float(positive.max())
-    cutoff = vmax * 1e-3
-    x_profile = C.max(axis=(1, 2))
-    keep = x_profile >= cutoff
-    if keep.any():
-        last_idx = int(np.where(keep)[0][-1])
-        x = x[: last_idx + 1]
-        X = X[: last_idx + 1, :, :]
-        Y = Y[: last_idx + 1, :, :]
-        Z = Z[: last_idx + 1, :, :]
-        C = C[: last_idx + 1, :, :]
-
     if C_limit > 0:
         threshold = C_limit
     else:
@@ -124,59 +207,35 @@ def plot_plume_3d(
     fig = plt.figure(figsize=(8.5, 6))
     ax = fig.add_subplot(111, projection="3d")
     cmap = plt.get_cmap("plasma")
-    positive = C[C > 0]
     vmax = float(positive.max())
     vmin = max(vmax * 1e-4, 1e-12)
     norm = colors.LogNorm(vmin=vmin, vmax=vmax)
 
-    def _edges(values):
-        step = np.diff(values).mean() if values.size > 1 else 1.0
-        edges = np.concatenate(
-            ([values[0] - step / 2.0], (values[:-1] + values[1:]) / 2.0, [values[-1] + step / 2.0])
-        )
-        if values[0] == 0.0:
-            edges[0] = 0.0
-        return edges
-
-    mask = C >= threshold
-    if not mask.any():
+    # Nested iso-surfaces at the threshold and each decade above it, meshed
+    # once per level; the x slider only takes a prefix of each cached mesh.
+    levels = [threshold * 10.0 ** k for k in range(SHELLS) if threshold * 10.0 ** k <= vmax]
+    if not levels:
+        return
+    surfaces = IsoSurfaceCache(x, y, z, C, max_triangles=MAX_SHELL_TRIANGLES)
+    shells = []
+    for n, level in enumerate(levels):
+        triangles = surfaces.mesh(level)
+        if not len(triangles):
+            continue
+        face = np.tile(cmap(norm(level)), (len(triangles), 1))
+        face[:, :3] *= face_shading(triangles)[:, None]
+        face[:, 3] = 0.35 + 0.5 * n / max(len(levels) - 1, 1)
+        collection = Poly3DCollection(triangles, facecolors=face, edgecolors="none")
+        ax.add_collection3d(collection)
+        shells.append((collection, level, face))
+    if not shells:
         return
-
-    clipped = np.clip(C, norm.vmin, norm.vmax)
-    norm_vals = norm(clipped.ravel()).reshape(C.shape)
-    facecolors = cmap(norm_vals)
-    facecolors[..., -1] = np.where(mask, 0.45 + 0.4 * norm_vals, 0.0)
-
-    x_edges = _edges(x)
-    y_edges = _edges(y)
-    z_edges = _edges(z)
-    x_e, y_e, z_e = np.meshgrid(x_edges, y_edges, z_edges, indexing="ij")
-
-    voxel_artist = {"collection": None}
 
     def _render(max_x):
-        max_idx = int(np.searchsorted(x, max_x, side="right") - 1)
-        max_idx = max(0, min(max_idx, x.size - 1))
-        x_e_slice = x_e[: max_idx + 2, :, :]
-        y_e_slice = y_e[: max_idx + 2, :, :]
-        z_e_slice = z_e[: max_idx + 2, :, :]
-        mask_slice = mask[: max_idx + 1, :, :]
-        face_slice = facecolors[: max_idx + 1, :, :, :]
-
-        if voxel_artist["collection"] is not None:
-            for coll in voxel_artist["collection"].values():
-                coll.remove()
-
-        voxel_artist["collection"] = ax.voxels(
-            x_e_slice,
-            y_e_slice,
-            z_e_slice,
-            mask_slice,
-            facecolors=face_slice,
-            edgecolor=None,
-        )
-
-    _render(x_max)
+        for collection, level, face in shells:
+            triangles = surfaces.clipped(level, max_x)
+            collection.set_verts(triangles)
+            collection.set_facecolor(face[: len(triangles)])
 
     mappable = plt.cm.ScalarMappable(norm=norm, cmap=cmap)
     mappable.set_array([])
@@ -1,3 +1,5 @@
+import os
+import sys
 import tkinter as tk
 from tkinter import ttk, messagebox
 import numpy as np
@@ -5,39 +7,22 @@ import matplotlib.pyplot as plt
 from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
 
 # -----------------------------
-# Pasquill–Gifford 계수
+# Pasquill–Gifford 계수 (stability_params)
 # -----------------------------
-PG_params = {
-    'A': {'a_xy': 0.18, 'b_xy': 0.92, 'a_z': 0.60, 'b_z': 0.75},
-    'B': {'a_xy': 0.14, 'b_xy': 0.92, 'a_z': 0.53, 'b_z': 0.73},
-    'C': {'a_xy': 0.10, 'b_xy': 0.92, 'a_z': 0.34, 'b_z': 0.71},
-    'D': {'a_xy': 0.06, 'b_xy': 0.92, 'a_z': 0.15, 'b_z': 0.70},
-    'E': {'a_xy': 0.04, 'b_xy': 0.92, 'a_z': 0.10, 'b_z': 0.65},
-    'F': {'a_xy': 0.02, 'b_xy': 0.89, 'a_z': 0.05, 'b_z': 0.61},
-}
+_gas_dispersion_path = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if _gas_dispersion_path not in sys.path:
+    sys.path.insert(0, _gas_dispersion_path)
 
-# -----------------------------
-# σx, σy, σz 계산
-# -----------------------------
-def sigma_x(u, t, params): 
-    return params['a_xy'] * (u * t)**params['b_xy']
-
-def sigma_y(u, t, params): 
-    return params['a_xy'] * (u * t)**params['b_xy']
-
-def sigma_z(u, t, params): 
-    return params['a_z'] * (u * t)**params['b_z']
+from stability_params import STABILITY_CLASSES, sigma_puff  # noqa: E402
 
 # -----------------------------
-# Puff 농도 계산
+# Puff 농도 계산 (x, y, z 배열 가능)
 # -----------------------------
 def puff_concentration(M, u, H, stability, x, y, z, t):
     if t <= 0:
         return 0.0, 0.0, 0.0, 0.0
-    params = PG_params[stability]
-    sig_x = sigma_x(u, t, params)
-    sig_y = sigma_y(u, t, params)
-    sig_z = sigma_z(u, t, params)
+    sig_x, sig_z = sigma_puff(u * t, stability)
+    sig_y = sig_x
     term_exp = np.exp(-((x - u*t)**2)/(2*sig_x**2) - (y**2)/(2*sig_y**2))
     term_z = np.exp(-(z - H)**2/(2*sig_z**2)) + np.exp(-(z + H)**2/(2*sig_z**2))
     C = (M / ((2*np.pi)**1.5 * sig_x * sig_y * sig_z)) * term_exp * term_z
@@ -56,7 +41,7 @@ def calculate_concentration():
         z = float(entry_z.get())
         stability = combo_stab.get().strip().upper()
 
-        if stability not in PG_params:
+        if stability not in STABILITY_CLASSES:
             messagebox.showerror("Error", "Stability must be one of A–F")
             return
 
@@ -85,11 +70,8 @@ def draw_contour(M, H, u, stability, t):
     X, Z = np.meshgrid(x, z)
     Y = np.zeros_like(X)
 
-    C = np.zeros_like(X)
-    for i in range(X.shape[0]):
-        for j in range(X.shape[1]):
-            c_val, *_ = puff_concentration(M, u, H, stability, X[i, j], Y[i, j], Z[i, j], t)
-            C[i, j] = c_val
+    C, *_ = puff_concentration(M, u, H, stability, X, Y, Z, t)
+    C = np.broadcast_to(C, X.shape)
 
     contour = ax.contourf(X, Z, C, levels=np.linspace(0, 1.0, 40), cmap='plasma')
     c1 = ax.contour(X, Z, C, levels=[1.0], colors='black', linewidths=2)
@@ -146,7 +128,7 @@ entry_z = tk.Entry(frame_input, width=10)
 entry_z.grid(row=3, column=3)
 
 tk.Label(frame_input, text="Stability (A–F):").grid(row=4, column=0, sticky="e")
-combo_stab = ttk.Combobox(frame_input, values=list(PG_params.keys()), width=5)
+combo_stab = ttk.Combobox(frame_input, values=list(STABILITY_CLASSES), width=5)
 combo_stab.grid(row=4, column=1)
 combo_stab.set("D")
 
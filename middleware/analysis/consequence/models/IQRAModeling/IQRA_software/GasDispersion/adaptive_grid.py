@@ -0,0 +1,175 @@
+"""
+    Adaptive sampling of concentration fields for plotting
+
+    Plots need a regular grid (contourf, voxels), but only the cells that
+    carry the threshold iso-line, or a visible change of colour, need exact
+    values at the plotted resolution. sample_adaptive() builds the fine grid
+    as a quadtree (2D) or octree (3D) over a coarse base grid:
+
+    - every level evaluates the field at the corners of its active cells, all
+      cells of the level in one vectorised call;
+    - a cell is split in 2^d children when the refinement test on its corner
+      values says so (threshold_criterion: the iso-line crosses it, it spans
+      more than one colour level, or it is steep enough to hide a crossing);
+    - cells that stop early are filled by multilinear interpolation of their
+      corners (of the log values where all corners are positive, which suits
+      Gaussian profiles), so the result is the full fine grid with exact
+      values wherever the field was refined to the last level.
+
+    plume_extent() bounds where a Gaussian plume can reach a concentration
+    analytically, so the sampled domain can be cut to the plume before any
+    evaluation.
+
+USAGE:
+    x1, nx = aligned_span(x0, x_end, x_max, dx, 4)
+    grid = sample_adaptive(field, (x0, z0), (x1, z1), base_cells=(nx, nz), levels=4,
+                           needs_refinement=threshold_criterion(c_limit, tolerance=0.05))
+    X, Z = np.meshgrid(*grid["axes"], indexing="ij"); C = grid["values"]
+"""
+
+import itertools
+import math
+from typing import Callable, Dict, Sequence, Tuple
+
+import numpy as np
+
+from stability_params import sigma_yz_plume
+
+
+def aligned_span(lower: float, needed: float, limit: float, spacing: float, levels: int) -> Tuple[float, int]:
+    """
+    (upper, base_cells) for an axis covering [lower, needed] at the given finest spacing
+
+    The axis is extended to a whole number of base cells (up to limit), so the
+    finest spacing stays the requested one instead of being rounded finer.
+    """
+    fine = max(1, math.ceil((needed - lower) / spacing - 1e-9))
+    cells = max(1, math.ceil(fine / 2 ** levels))
+    return min(limit, lower + cells * 2 ** levels * spacing), cells
+
+
+def threshold_criterion(threshold: float, tolerance: float = None, span: float = 100.0):
+    """
+    Refinement test on corner values (m, 2^d) for an iso-surface at threshold
+
+    A cell is refined when the threshold lies between its corner values, when
+    (with tolerance) its values clipped to [0, threshold] differ by more than
+    tolerance * threshold (one colour level of a linear map), or when its
+    corners differ by more than `span` times near the threshold, where a
+    narrow feature could cross the cell without reaching a corner.
+    """
+    def needs_refinement(corners):
+        high = corners.max(axis=1)
+        low = corners.min(axis=1)
+        refine = (low < threshold) & (high >= threshold)
+        refine |= (high >= threshold / span) & (high > span * low)
+        if tolerance:
+            refine |= np.minimum(high, threshold) - np.minimum(low, threshold) > tolerance * threshold
+        return refine
+
+    return needs_refinement
+
+
+def sample_adaptive(
+    field: Callable[..., np.ndarray],
+    lower: Sequence[float],
+    upper: Sequence[float],
+    base_cells: Sequence[int],
+    levels: int,
+    needs_refinement: Callable[[np.ndarray], np.ndarray],
+    progress: Callable[[], None] = None,
+) -> Dict[str, object]:
+    """
+    Fine regular grid of field values, refined only where needed
+
+    Args:
+        field: f(*coordinate arrays) -> values, vectorised over points
+        lower, upper: Domain corners (one value per dimension)
+        base_cells: Coarse cells per dimension; the fine grid has base_cells * 2^levels
+        needs_refinement: corner values (m, 2^d) -> bool (m), see threshold_criterion
+        progress: Called after each level (e.g. a job checkpoint)
+
+    Returns:
+        {'axes': node coordinates per dimension, 'values': fine node values,
+         'exact': bool mask of evaluated nodes, 'evaluations': count}
+    """
+    dims = len(base_cells)
+    step = 2 ** levels
+    shape = tuple(int(n) * step + 1 for n in base_cells)
+    axes = [np.linspace(lo, hi, n) for lo, hi, n in zip(lower, upper, shape)]
+    values = np.zeros(shape)
+    exact = np.zeros(shape, dtype=bool)
+    strides = np.array([int(np.prod(shape[k + 1:])) for k in range(dims)])
+    flat_values = values.reshape(-1)
+    flat_exact = exact.reshape(-1)
+
+    def evaluate(nodes):
+        flat = np.unique(nodes.reshape(-1, dims) @ strides)
+        flat = flat[~flat_exact[flat]]
+        if len(flat):
+            index = np.unravel_index(flat, shape)
+            flat_values[flat] = field(*(axes[k][index[k]] for k in range(dims)))
+            flat_exact[flat] = True
+
+    def corner_offsets(size):
+        return np.array(list(itertools.product((0, size), repeat=dims)))
+
+    # Level 0: every base cell
+    cells = np.stack(np.meshgrid(*(np.arange(n) * step for n in base_cells), indexing="ij"), axis=-1).reshape(-1, dims)
+    evaluate(cells[:, None, :] + corner_offsets(step)[None, :, :])
+    leaves = []
+    size = step
+    while True:
+        if progress is not None:
+            progress()
+        corners = flat_values[(cells[:, None, :] + corner_offsets(size)[None, :, :]) @ strides]
+        refine = needs_refinement(corners) if size > 1 else np.zeros(len(cells), dtype=bool)
+        leaves.append((size, cells[~refine], corners[~refine]))
+        if not refine.any():
+            break
+        half = size // 2
+        cells = (cells[refine][:, None, :] + corner_offsets(half)[None, :, :]).reshape(-1, dims)
+        evaluate(cells[:, None, :] + corner_offsets(half)[None, :, :])
+        size = half
+
+    # Unrefined cells: interpolate the corners onto their inner nodes
+    for size, origin, corners in leaves:
+        if size == 1 or not len(origin):
+            continue
+        t = np.stack(np.meshgrid(*([np.linspace(0.0, 1.0, size + 1)] * dims), indexing="ij"), axis=-1).reshape(-1, dims)
+        bits = corner_offsets(1)
+        weights = np.prod(np.where(bits[:, None, :] == 1, t[None, :, :], 1.0 - t[None, :, :]), axis=2)
+        nodes = ((origin[:, None, :] + (t * size).round().astype(np.intp)[None, :, :]) @ strides).ravel()
+        positive = (corners > 0).all(axis=1)
+        filled = corners @ weights
+        filled[positive] = np.exp(np.log(corners[positive]) @ weights)
+        filled = filled.ravel()
+        free = ~flat_exact[nodes]
+        flat_values[nodes[free]] = filled[free]
+
+    return {"axes": axes, "values": values, "exact": exact, "evaluations": int(exact.sum())}
+
+
+def plume_extent(q_kg_s: float, wind_speed_m_s: float, height_m: float, stability_class,
+                 threshold_kg_m3: float, margin: float = 1.1) -> Tuple[float, float, float]:
+    """
+    (x_end, y_half, z_top) beyond which a Gaussian plume stays below threshold
+
+    Uses the bound C <= q / (pi u sy sz) e^(-r^2 / 2 s^2), which holds with
+    the ground reflection, so the box always contains the iso-surface.
+    """
+    if q_kg_s <= 0 or wind_speed_m_s <= 0 or threshold_kg_m3 <= 0:
+        return 0.0, 0.0, 0.0
+    x = np.geomspace(1e-3, 1e6, 4001)
+    sy, sz = sigma_yz_plume(x, stability_class)
+    peak = q_kg_s / (math.pi * wind_speed_m_s * sy * sz)
+    above = peak > threshold_kg_m3
+    if not above.any():
+        return 0.0, 0.0, 0.0
+    reach = np.sqrt(2 * np.log(peak[above] / threshold_kg_m3))
+    x_end = x[min(np.flatnonzero(above)[-1] + 1, len(x) - 1)]
+    return (
+        float(x_end * margin),
+        float((sy[above] * reach).max() * margin),
+        float(height_m + (sz[above] * reach).max() * margin),
+    )
@@ -0,0 +1,229 @@
+"""
+    Dense-gas dispersion (box model for puffs, slab model for plumes)
+
+    A release denser than air slumps under gravity and mixes with air through
+    its edges and top before it becomes passive:
+
+        front speed      dR/dt = k sqrt(g' H)
+        entrainment      dV/dt = edge: alpha * (side area) * dR/dt
+                                 + top: (area) * kappa u* / (1 + 0.8 Ri)
+        buoyancy         g' V = g0' V0   (conserved),   Ri = g' H / u*^2
+
+    The instantaneous release is a cylinder (radius R, height H, volume V);
+    the continuous release is a steady slab (half-width b, height h, volume
+    flux Phi) advected at the wind speed. Concentrations are uniform over the
+    cloud (top-hat) during the dense phase. Once Ri drops to 1 the cloud is
+    handed to the Gaussian puff or plume from a virtual source that matches
+    the ground-level centre concentration at the transition.
+
+    Scaled by the source (length V0^(1/3) or sqrt(Phi0 / u), time
+    sqrt(L / g0')), each model depends on one dimensionless parameter:
+    u* / sqrt(g0' L) for the puff and g0' L / u^2 for the plume. Solutions
+    are cached per parameter, quantised to PARAM_STEPS per decade, and every
+    uncached parameter of a batch is integrated together (vectorised RK4 on a
+    geometric time grid), so a study's scenarios share a handful of
+    integrations. Atmospheric stability only enters after the transition.
+"""
+
+import math
+import threading
+from typing import Dict, Tuple
+
+import numpy as np
+
+from stability_params import sigma_puff, sigma_yz_plume, stability_code
+
+GRAVITY = 9.81
+AIR_DENSITY_KG_M3 = 1.225
+FRONT_FROUDE = 1.07          # k
+EDGE_ENTRAINMENT = 0.6       # alpha
+VON_KARMAN = 0.4             # kappa
+FRICTION_RATIO = 0.06        # u* / u near the ground
+TRANSITION_RI = 1.0
+PARAM_STEPS = 20             # cached solutions per decade of the dimensionless parameter
+_TAU = np.concatenate(([0.0], np.geomspace(1e-3, 1e6, 700)))
+
+_SOLUTIONS: Dict[Tuple[str, float], Dict[str, np.ndarray]] = {}
+_SOLUTIONS_LOCK = threading.Lock()
+
+
+def is_dense(gas_density_kg_m3: float, air_density_kg_m3: float = AIR_DENSITY_KG_M3) -> bool:
+    return gas_density_kg_m3 > air_density_kg_m3
+
+
+def _quantise(param) -> np.ndarray:
+    return np.round(np.log10(np.asarray(param, dtype=float)) * PARAM_STEPS) / PARAM_STEPS
+
+
+def _puff_rates(state, param):
+    """d(r, v)/dtau for the cylinder; param = u* / sqrt(g0' L)."""
+    r, v = state
+    h = v / (math.pi * r * r)
+    g = 1.0 / v
+    ri = g * h / (param * param)
+    dr = FRONT_FROUDE * np.sqrt(g * h)
+    dv = 2 * math.pi * r * h * EDGE_ENTRAINMENT * dr + math.pi * r * r * VON_KARMAN * param / (1 + 0.8 * ri)
+    return np.stack([dr, dv]), ri
+
+
+def _plume_rates(state, param):
+    """d(b, phi)/dxi for the slab; param = g0' L / u^2."""
+    b, phi = state
+    h = phi / (2 * b)
+    g = param / phi
+    ri = g * h / (FRICTION_RATIO * FRICTION_RATIO)
+    db = FRONT_FROUDE * np.sqrt(g * h)
+    dphi = 2 * b * VON_KARMAN * FRICTION_RATIO / (1 + 0.8 * ri) + 2 * h * EDGE_ENTRAINMENT * db
+    return np.stack([db, dphi]), ri
+
+
+_MODELS = {
+    # kind: (rates, initial state (cylinder / slab with height = radius or half-width))
+    "puff": (_puff_rates, ((1 / math.pi) ** (1 / 3), 1.0)),
+    "plume": (_plume_rates, (math.sqrt(0.5), 1.0)),
+}
+
+
+def _integrate(kind: str, params: np.ndarray) -> Dict[str, np.ndarray]:
+    """RK4 for every parameter at once; columns freeze after the transition."""
+    rates, initial = _MODELS[kind]
+    state = np.repeat(np.array(initial, dtype=float)[:, None], len(params), axis=1)
+    history = np.empty((len(_TAU), 2, len(params)))
+    history[0] = state
+    ri = rates(state, params)[1]
+    transition = np.full(len(params), len(_TAU) - 1)
+    active = ri > TRANSITION_RI
+    transition[~active] = 0
+    for i in range(1, len(_TAU)):
+        dt = _TAU[i] - _TAU[i - 1]
+        k1 = rates(state, params)[0]
+        k2 = rates(state + 0.5 * dt * k1, params)[0]
+        k3 = rates(state + 0.5 * dt * k2, params)[0]
+        k4 = rates(state + dt * k3, params)[0]
+        state = np.where(active, state + dt / 6 * (k1 + 2 * k2 + 2 * k3 + k4), state)
+        history[i] = state
+        ri = rates(state, params)[1]
+        ended = active & (ri <= TRANSITION_RI)
+        transition[ended] = i
+        active &= ~ended
+        if not active.any():
+            history[i + 1:] = state
+            break
+    return {"history": history, "transition": transition}
+
+
+def solutions(kind: str, param) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Dimensionless solutions for each parameter value, from the cache where possible
+
+    Returns:
+        (history, transition): history has shape (time, 2, n) on the shared
+        dimensionless time grid _TAU; transition is the time index where Ri reaches 1
+    """
+    keys = _quantise(param).ravel()
+    with _SOLUTIONS_LOCK:
+        missing = sorted({float(k) for k in keys} - {k for (c, k) in _SOLUTIONS if c == kind})
+        if missing:
+            solved = _integrate(kind, 10.0 ** np.array(missing))
+            for j, key in enumerate(missing):
+                _SOLUTIONS[(kind, key)] = {
+                    "history": solved["history"][:, :, j],
+                    "transition": int(solved["transition"][j]),
+                }
+        entries = [_SOLUTIONS[(kind, float(k))] for k in keys]
+    history = np.stack([e["history"] for e in entries], axis=-1)
+    transition = np.array([e["transition"] for e in entries])
+    return history, transition
+
+
+def _at_time(history, tau):
+    """Interpolate every column of history (time, 2, n) at its own tau (n,)."""
+    idx = np.clip(np.searchsorted(_TAU, tau, side="right") - 1, 0, len(_TAU) - 2)
+    frac = np.clip((tau - _TAU[idx]) / (_TAU[idx + 1] - _TAU[idx]), 0.0, 1.0)
+    cols = np.arange(history.shape[2])
+    return history[idx, :, cols] * (1 - frac)[:, None] + history[idx + 1, :, cols] * frac[:, None]
+
+
+def _virtual_travel(target, stability_class):
+    """Travel distance at which a Gaussian sigma product reaches target (puff or plume form)."""
+    grid = np.geomspace(1e-2, 1e6, 4001)
+    sy, sz = sigma_yz_plume(grid, stability_class)
+    return np.interp(np.log(target), np.log(sy * sz), grid)
+
+
+def dense_plume_concentration(q_kg_s, gas_density_kg_m3, wind_speed_m_s, x_m, y_m, z_m,
+                              stability_class, air_density_kg_m3=AIR_DENSITY_KG_M3):
+    """Ground-release dense plume concentration (kg/m^3) for arrays of scenarios."""
+    q, rho, u, x, y, z = np.broadcast_arrays(*(np.atleast_1d(np.asarray(a, dtype=float))
+                                              for a in (q_kg_s, gas_density_kg_m3, wind_speed_m_s, x_m, y_m, z_m)))
+    out = np.zeros(q.shape)
+    ok = (q > 0) & (u > 0) & (x > 0) & (rho > air_density_kg_m3)
+    if not ok.any():
+        return out
+    q, rho, u, x, y, z = (a[ok] for a in (q, rho, u, x, y, z))
+    g0 = GRAVITY * (rho - air_density_kg_m3) / air_density_kg_m3
+    phi0 = q / rho
+    length = np.sqrt(phi0 / u)
+    history, transition = solutions("plume", g0 * length / (u * u))
+    # Slab variable xi = x / L (travel at the wind speed)
+    xi = x / length
+    tau_t = _TAU[transition]
+    dense = xi <= tau_t
+    b, phi = _at_time(history, np.minimum(xi, tau_t)).T
+    c_box = q / (phi * phi0)
+    result = np.where(dense & (np.abs(y) <= b * length) & (z <= phi / (2 * b) * length), c_box, 0.0)
+
+    passive = ~dense
+    if passive.any():
+        x_t = tau_t[passive] * length[passive]
+        # Ground-level Gaussian centre-line: q / (pi u sy sz) = box concentration at transition
+        x_v = _virtual_travel(phi[passive] * phi0[passive] / (math.pi * u[passive]), stability_class)
+        travel = x[passive] - x_t + x_v
+        sy, sz = sigma_yz_plume(travel, stability_class)
+        result[passive] = (q[passive] / (math.pi * u[passive] * sy * sz)
+                           * np.exp(-y[passive] ** 2 / (2 * sy ** 2)) * np.exp(-z[passive] ** 2 / (2 * sz ** 2)))
+    out[ok] = result
+    return out
+
+
+def dense_puff_concentration(mass_kg, gas_density_kg_m3, wind_speed_m_s, x_m, y_m, z_m, time_s,
+                             stability_class, air_density_kg_m3=AIR_DENSITY_KG_M3):
+    """Ground-release dense puff concentration (kg/m^3) for arrays of scenarios."""
+    m, rho, u, x, y, z, t = np.broadcast_arrays(*(np.atleast_1d(np.asarray(a, dtype=float))
+                                                 for a in (mass_kg, gas_density_kg_m3, wind_speed_m_s,
+                                                           x_m, y_m, z_m, time_s)))
+    out = np.zeros(m.shape)
+    ok = (m > 0) & (u > 0) & (t > 0) & (rho > air_density_kg_m3)
+    if not ok.any():
+        return out
+    stability_class = stability_code(stability_class)
+    m, rho, u, x, y, z, t = (a[ok] for a in (m, rho, u, x, y, z, t))
+    g0 = GRAVITY * (rho - air_density_kg_m3) / air_density_kg_m3
+    v0 = m / rho
+    length = np.cbrt(v0)
+    scale_t = np.sqrt(length / g0)
+    history, transition = solutions("puff", FRICTION_RATIO * u / np.sqrt(g0 * length))
+    tau = t / scale_t
+    tau_t = _TAU[transition]
+    dense = tau <= tau_t
+    r, v = _at_time(history, np.minimum(tau, tau_t)).T
+    radius, volume = r * length, v * v0
+    height = volume / (math.pi * radius * radius)
+    offset = np.hypot(x - u * t, y)
+    result = np.where(dense & (offset <= radius) & (z <= height), m / volume, 0.0)
+
+    passive = ~dense
+    if passive.any():
+        # Ground-level puff centre: 2 M / ((2 pi)^1.5 sxy^2 sz) = box concentration at transition
+        target = 2 * volume[passive] / (2 * math.pi) ** 1.5
+        grid = np.geomspace(1e-2, 1e6, 4001)
+        grid_xy, grid_z = sigma_puff(grid, stability_class)
+        d_v = np.interp(np.log(target), np.log(grid_xy * grid_xy * grid_z), grid)
+        travel = d_v + u[passive] * (t[passive] - tau_t[passive] * scale_t[passive])
+        sxy, sz = sigma_puff(travel, stability_class)
+        centre_x = u[passive] * t[passive]
+        result[passive] = (2 * m[passive] / ((2 * math.pi) ** 1.5 * sxy * sxy * sz)
+                           * np.exp(-((x[passive] - centre_x) ** 2 + y[passive] ** 2) / (2 * sxy ** 2))
+                           * np.exp(-z[passive] ** 2 / (2 * sz ** 2)))
+    out[ok] = result
+    return out
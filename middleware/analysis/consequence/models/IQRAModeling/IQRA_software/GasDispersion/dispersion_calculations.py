@@ -3,48 +3,13 @@
     Contains all functions required to perform dispersion calculations
     - Gas: Gaussian Plume Model
     - Gas: Gaussian Puff Model
-    TODO:
-    - Liquid Models
+    - Liquid: pools evaporate into the same models; the source term (evaporation
+      rate and mass per leak scenario) comes from pool_spread.simulate_pools
 """
 
 import math
-from typing import Tuple
 
-
-_PG_PARAMS = {
-    "A": {"a_xy": 0.18, "b_xy": 0.92, "a_z": 0.60, "b_z": 0.75},
-    "B": {"a_xy": 0.14, "b_xy": 0.92, "a_z": 0.53, "b_z": 0.73},
-    "C": {"a_xy": 0.10, "b_xy": 0.92, "a_z": 0.34, "b_z": 0.71},
-    "D": {"a_xy": 0.06, "b_xy": 0.92, "a_z": 0.15, "b_z": 0.70},
-    "E": {"a_xy": 0.04, "b_xy": 0.92, "a_z": 0.10, "b_z": 0.65},
-    "F": {"a_xy": 0.02, "b_xy": 0.89, "a_z": 0.05, "b_z": 0.61},
-}
-
-
-def sigma_yz_plume(x: float, stability_class: str) -> Tuple[float, float]:
-    """Return plume sigma_y, sigma_z from CCPS/ALCHe correlations."""
-    if stability_class == "A":
-        sigma_y = 0.22 * x * (1 + 0.0001 * x) ** -0.5
-        sigma_z = 0.20 * x
-    elif stability_class == "B":
-        sigma_y = 0.16 * x * (1 + 0.0001 * x) ** -0.5
-        sigma_z = 0.12 * x
-    elif stability_class == "C":
-        sigma_y = 0.11 * x * (1 + 0.0001 * x) ** -0.5
-        sigma_z = 0.08 * x * (1 + 0.0002 * x) ** -0.5
-    elif stability_class == "D":
-        sigma_y = 0.08 * x * (1 + 0.0001 * x) ** -0.5
-        sigma_z = 0.06 * x * (1 + 0.0015 * x) ** -0.5
-    elif stability_class == "E":
-        sigma_y = 0.06 * x * (1 + 0.0001 * x) ** -0.5
-        sigma_z = 0.03 * x * (1 + 0.0003 * x) ** -1
-    elif stability_class == "F":
-        sigma_y = 0.04 * x * (1 + 0.0001 * x) ** -0.5
-        sigma_z = 0.016 * x * (1 + 0.0003 * x) ** -1
-    else:
-        raise ValueError("Invalid stability class")
-
-    return sigma_y, sigma_z
+from stability_params import sigma_puff, sigma_yz_plume
 
 
 def gaussian_plume_concentration(
@@ -80,14 +45,8 @@ def gaussian_puff_concentration(
     """Return Gaussian puff concentration (kg/m^3) at a point."""
     if time_s <= 0:
         return 0.0
-    stability_class = stability_class.upper()
-    if stability_class not in _PG_PARAMS:
-        raise ValueError("Invalid stability class")
-
-    params = _PG_PARAMS[stability_class]
-    sigma_x = params["a_xy"] * (wind_speed_m_s * time_s) ** params["b_xy"]
-    sigma_y = params["a_xy"] * (wind_speed_m_s * time_s) ** params["b_xy"]
-    sigma_z = params["a_z"] * (wind_speed_m_s * time_s) ** params["b_z"]
+    sigma_x, sigma_z = sigma_puff(wind_speed_m_s * time_s, stability_class)
+    sigma_y = sigma_x
 
     term_exp = math.exp(-((x_m - wind_speed_m_s * time_s) ** 2) / (2 * sigma_x**2))
     term_exp *= math.exp(-(y_m**2) / (2 * sigma_y**2))
@@ -0,0 +1,205 @@
+"""
+    Flammable cloud mass: the part of a dispersed release whose concentration
+    lies between the lower and upper flammability limits (kg/m^3).
+
+    A Gaussian cloud holds a known share of its mass above any concentration
+    level c: for an n-dimensional Gaussian with peak C0 it is the chi-square
+    CDF with n degrees of freedom at s = 2 ln(C0 / c). The flammable mass is
+    the difference between the shares above LFL and above UFL, so:
+
+    - ground-level or well-elevated releases (ground reflection absent or
+      exact) are closed form: dof 2 per plume cross-section, dof 3 for a puff;
+    - otherwise each horizontal slice is still Gaussian and closed form, and
+      only the height is integrated numerically;
+    - the plume is integrated downwind (in log x) up to where its peak drops
+      below LFL or the cloud ends (wind speed x release duration).
+
+    Numerical integrals use vectorised trapezoid grids that are doubled until
+    the estimate settles (relative tolerance RTOL).
+"""
+
+import math
+
+import numpy as np
+
+from stability_params import sigma_puff, sigma_yz_plume, stability_code
+
+RTOL = 1e-3
+# Ground reflection is ignored (closed form) when the release height exceeds
+# this many sigma_z: the reflected term is then below exp(-0.5 * 8**2) ~ 1e-14.
+_REFLECTION_SIGMAS = 8.0
+
+
+
+def _erf(x):
+    """Vectorised erf for x >= 0 (Abramowitz & Stegun 7.1.26, |error| < 1.5e-7)."""
+    t = 1.0 / (1.0 + 0.3275911 * x)
+    poly = t * (0.254829592 + t * (-0.284496736 + t * (1.421413741 + t * (-1.453152027 + t * 1.061405429))))
+    return 1.0 - poly * np.exp(-x * x)
+
+
+def _share_above(peak, level, dof):
+    """Share of a dof-dimensional Gaussian's mass where concentration >= level."""
+    peak = np.asarray(peak, dtype=float)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        s = np.where(peak > level, 2.0 * np.log(peak / level), 0.0)
+    if dof == 1:
+        return _erf(np.sqrt(s / 2.0))
+    if dof == 2:
+        return -np.expm1(-s / 2.0)
+    if dof == 3:
+        return _erf(np.sqrt(s / 2.0)) - np.sqrt(2.0 * s / math.pi) * np.exp(-s / 2.0)
+    raise ValueError("dof must be 1, 2 or 3")
+
+
+def _share_between(peak, lfl, ufl, dof):
+    return _share_above(peak, lfl, dof) - _share_above(peak, ufl, dof)
+
+
+def _adaptive_trapezoid(f, a, b, n=64, max_n=1 << 14):
+    """Integrate a vectorised f over [a, b] (f may return an extra leading axis)."""
+    estimate = None
+    while True:
+        x = np.linspace(a, b, n + 1)
+        value = np.trapezoid(f(x), x, axis=-1)
+        if estimate is not None:
+            # Tolerance relative to the largest integral, so near-zero entries
+            # (sections at the cloud edge) do not force extra refinement.
+            if np.all(np.abs(value - estimate) <= RTOL * np.max(np.abs(value))) or n >= max_n:
+                return value
+        estimate = value
+        n *= 2
+
+
+def _reflected_profile(z, height, sigma_z):
+    """Vertical profile with ground reflection (not normalised by sigma_z)."""
+    return np.exp(-((z - height) ** 2) / (2 * sigma_z ** 2)) + np.exp(-((z + height) ** 2) / (2 * sigma_z ** 2))
+
+
+def plume_section_mass(q_kg_s, wind_speed_m_s, height_m, x_m, stability_class, lfl, ufl):
+    """Flammable mass per metre downwind (kg/m) of a steady plume at distances x_m."""
+    x = np.atleast_1d(np.asarray(x_m, dtype=float))
+    sigma_y, sigma_z = sigma_yz_plume(x, stability_class)
+    sigma_y, sigma_z = np.broadcast_arrays(np.asarray(sigma_y, dtype=float), np.asarray(sigma_z, dtype=float))
+    line_density = q_kg_s / wind_speed_m_s
+    base_peak = q_kg_s / (2 * math.pi * wind_speed_m_s * sigma_y * sigma_z)
+
+    result = np.zeros_like(x)
+    ground = height_m <= 0
+    free = height_m >= _REFLECTION_SIGMAS * sigma_z
+    closed = free | ground
+    if ground:
+        result[:] = line_density * _share_between(2 * base_peak, lfl, ufl, 2)
+        return result
+    result[free] = line_density * _share_between(base_peak[free], lfl, ufl, 2)
+
+    mixed = ~closed
+    if mixed.any():
+        sy, sz, peak = sigma_y[mixed], sigma_z[mixed], base_peak[mixed]
+        top = height_m + _REFLECTION_SIGMAS * sz
+
+        def slices(u):
+            # u in [0, 1] maps to z in [0, top] for every x at once
+            z = u[None, :] * top[:, None]
+            amplitude = peak[:, None] * _reflected_profile(z, height_m, sz[:, None])
+            return amplitude * sy[:, None] * math.sqrt(2 * math.pi) * _share_between(amplitude, lfl, ufl, 1) * top[:, None]
+
+        result[mixed] = _adaptive_trapezoid(slices, 0.0, 1.0)
+    return result
+
+
+def plume_flammable_mass(
+    q_kg_s: float,
+    wind_speed_m_s: float,
+    height_m: float,
+    stability_class: str,
+    lfl_kg_m3: float,
+    ufl_kg_m3: float,
+    duration_s: float = 0.0,
+) -> float:
+    """Flammable mass (kg) of a steady Gaussian plume, optionally cut at wind x duration."""
+    if q_kg_s <= 0 or wind_speed_m_s <= 0 or lfl_kg_m3 <= 0 or ufl_kg_m3 <= lfl_kg_m3:
+        return 0.0
+    stability_class = stability_code(stability_class)
+
+    # Where the peak of any cross-section (ground-level, so an upper bound) drops below LFL
+    grid = np.geomspace(1e-3, 1e5, 2001)
+    sigma_y, sigma_z = sigma_yz_plume(grid, stability_class)
+    upper_peak = q_kg_s / (math.pi * wind_speed_m_s * sigma_y * sigma_z)
+    above = np.flatnonzero(upper_peak >= lfl_kg_m3)
+    if not len(above):
+        return 0.0
+    x_end = grid[min(above[-1] + 1, len(grid) - 1)]
+    if duration_s > 0:
+        x_end = min(x_end, wind_speed_m_s * duration_s)
+    x_start = 1e-3
+    if x_end <= x_start:
+        return 0.0
+
+    def integrand(s):
+        x = np.exp(s)
+        return plume_section_mass(q_kg_s, wind_speed_m_s, height_m, x, stability_class, lfl_kg_m3, ufl_kg_m3) * x
+
+    return float(_adaptive_trapezoid(integrand, math.log(x_start), math.log(x_end)))
+
+
+def puff_flammable_mass(
+    mass_kg: float,
+    wind_speed_m_s: float,
+    height_m: float,
+    time_s: float,
+    stability_class: str,
+    lfl_kg_m3: float,
+    ufl_kg_m3: float,
+) -> float:
+    """Flammable mass (kg) of a Gaussian puff time_s after release."""
+    if mass_kg <= 0 or time_s <= 0 or wind_speed_m_s <= 0 or lfl_kg_m3 <= 0 or ufl_kg_m3 <= lfl_kg_m3:
+        return 0.0
+    sigma_xy, sigma_z = sigma_puff(wind_speed_m_s * time_s, stability_class)
+    base_peak = mass_kg / ((2 * math.pi) ** 1.5 * sigma_xy * sigma_xy * sigma_z)
+
+    if height_m <= 0:
+        return float(mass_kg * _share_between(2 * base_peak, lfl_kg_m3, ufl_kg_m3, 3))
+    if height_m >= _REFLECTION_SIGMAS * sigma_z:
+        return float(mass_kg * _share_between(base_peak, lfl_kg_m3, ufl_kg_m3, 3))
+
+    top = height_m + _REFLECTION_SIGMAS * sigma_z
+
+    def slices(z):
+        amplitude = base_peak * _reflected_profile(z, height_m, sigma_z)
+        return amplitude * 2 * math.pi * sigma_xy * sigma_xy * _share_between(amplitude, lfl_kg_m3, ufl_kg_m3, 2)
+
+    return float(_adaptive_trapezoid(slices, 0.0, top))
+
+
+def flammable_mass(
+    model: str,
+    leak_rate_kg_s: float,
+    wind_speed_m_s: float,
+    height_m: float,
+    stability_class: str,
+    lfl_kg_m3: float,
+    ufl_kg_m3: float,
+    puff_time_s: float = 0.0,
+    release_duration_s: float = 0.0,
+) -> float:
+    """Flammable mass (kg) for one release, using the same model choice as the dispersion stage."""
+    if str(model).lower() == "puff":
+        return puff_flammable_mass(
+            leak_rate_kg_s * max(release_duration_s, 0.0),
+            wind_speed_m_s,
+            height_m,
+            puff_time_s,
+            stability_class,
+            lfl_kg_m3,
+            ufl_kg_m3,
+        )
+    return plume_flammable_mass(
+        leak_rate_kg_s,
+        wind_speed_m_s,
+        height_m,
+        stability_class,
+        lfl_kg_m3,
+        ufl_kg_m3,
+        release_duration_s,
+    )
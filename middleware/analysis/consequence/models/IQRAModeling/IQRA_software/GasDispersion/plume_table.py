@@ -0,0 +1,256 @@
+"""
+    Precomputed Gaussian plume lookup tables
+
+    For a stability class the plume concentration scaled by Q/u depends only
+    on the receptor position and the effective height H:
+
+        C u / Q = g(x, y, z - H) + g(x, y, z + H)
+        g(x, y, d) = exp(-y^2 / 2 sy^2 - d^2 / 2 sz^2) / (2 pi sy sz)
+
+    The ground reflection is the same term about -H, so PlumeTable tabulates
+    ln g once per stability class on a grid of (ln x, |y| / sy, |d| / sz) and
+    serves every effective height: a query looks the table up at the direct
+    and at the reflected offset and adds the two. In these plume-following
+    coordinates every cross-section spans the same cells and ln g is nearly
+    quadratic, so trilinear interpolation of ln g stays within a fraction of
+    a percent. Points beyond the table's x range, or with either offset
+    beyond ETA_MAX / ZETA_MAX, are evaluated exactly.
+
+    Error bounds: ln g = A(ln x) - eta^2 / 2 - zeta^2 / 2 is a sum of one-
+    dimensional terms, so the trilinear error is the linear interpolation
+    error of A (sampled finely across each x cell) plus deta^2 / 8 and
+    dzeta^2 / 8 for the quadratics, plus the float32 rounding of the stored
+    nodes. The resulting relative bound per x cell is returned for each
+    query point with return_error=True (0 for points evaluated exactly).
+
+    Speed: in NumPy a lookup costs about three times the exact field (a log,
+    two exps and 16 gathers per point against a few transcendentals), so the
+    plotting code evaluates the field exactly. The table serves repeated
+    queries that want a persisted field with a known error bound.
+
+    PlumeTableCache keeps one table per stability class and, given a
+    directory, saves it as .npy files that later sessions open as read-only
+    memory maps.
+
+USAGE:
+    cache = PlumeTableCache("~/.risk_cache/plume")
+    c = cache.concentration(q, u, H, x, y, z, "D")               # arrays, any shape
+    c, err = cache.table("D").concentration(q, u, H, x, y, z, return_error=True)
+"""
+
+import json
+import math
+import os
+import threading
+from typing import Dict, Optional, Tuple
+
+import numpy as np
+
+from stability_params import sigma_yz_plume
+
+TABLE_VERSION = 3
+X_RANGE_M = (1.0, 1e5)
+ETA_MAX = 8.0          # |y| / sigma_y beyond which the term is taken as 0
+ZETA_MAX = 8.0         # |z -/+ H| / sigma_z beyond which the term is taken as 0
+GRID_SHAPE = (256, 65, 65)
+_BLOCK = 1 << 20
+# Samples per x cell when bounding the interpolation error of A(ln x)
+_ERROR_SAMPLES = 32
+
+
+def normalised_plume(x, y, z, height_m, stability_class: str):
+    """Exact C u / Q (1/m^2), broadcast over arrays; 0 for x <= 0."""
+    x, y, z, h = np.broadcast_arrays(*(np.asarray(a, dtype=float) for a in (x, y, z, height_m)))
+    out = np.zeros(x.shape)
+    ok = x > 0
+    sy, sz = sigma_yz_plume(x[ok], stability_class)
+    out[ok] = (
+        np.exp(-y[ok] ** 2 / (2 * sy ** 2))
+        * (np.exp(-((z[ok] - h[ok]) ** 2) / (2 * sz ** 2)) + np.exp(-((z[ok] + h[ok]) ** 2) / (2 * sz ** 2)))
+        / (2 * math.pi * sy * sz)
+    )
+    return out
+
+
+class PlumeTable:
+    """ln g on a (ln x, |y|/sy, |d|/sz) grid for one stability class."""
+
+    def __init__(self, stability_class: str, values: np.ndarray, error: np.ndarray,
+                 x_range: Tuple[float, float] = X_RANGE_M):
+        self.stability_class = stability_class
+        self.values = values
+        self._flat = values.reshape(-1)
+        self.error = error
+        self.x_range = (float(x_range[0]), float(x_range[1]))
+        nx, ny, nz = values.shape
+        self._s0 = math.log(self.x_range[0])
+        self._ds = (math.log(self.x_range[1]) - self._s0) / (nx - 1)
+        self._deta = ETA_MAX / (ny - 1)
+        self._dzeta = ZETA_MAX / (nz - 1)
+
+    @classmethod
+    def build(cls, stability_class: str, shape=GRID_SHAPE, x_range=X_RANGE_M) -> 'PlumeTable':
+        stability_class = stability_class.upper()
+        nx, ny, nz = shape
+        axes = (
+            np.linspace(math.log(x_range[0]), math.log(x_range[1]), nx),
+            np.linspace(0.0, ETA_MAX, ny),
+            np.linspace(0.0, ZETA_MAX, nz),
+        )
+        exact = cls._ln_term(stability_class, *np.meshgrid(*axes, indexing="ij"))
+        values = exact.astype(np.float32)
+
+        # Linear interpolation error of A(s) across each x cell
+        s_nodes = axes[0]
+        a_nodes = cls._ln_amplitude(stability_class, s_nodes)
+        t = np.linspace(0.0, 1.0, _ERROR_SAMPLES + 1)[1:-1]
+        s_fine = s_nodes[:-1, None] + t[None, :] * np.diff(s_nodes)[:, None]
+        a_linear = a_nodes[:-1, None] * (1 - t) + a_nodes[1:, None] * t
+        a_error = np.abs(a_linear - cls._ln_amplitude(stability_class, s_fine)).max(axis=1)
+        # The quadratics in eta and zeta: h^2 / 8 for a unit second derivative
+        quadratic_error = (axes[1][1] ** 2 + axes[2][1] ** 2) / 8
+        # float32 storage: the worst rounding of the nodes on either side of the cell
+        rounding = np.abs(values - exact).max(axis=(1, 2))
+        rounding = np.maximum(rounding[:-1], rounding[1:])
+        error = np.expm1(a_error + quadratic_error + rounding)
+        return cls(stability_class, values, error, x_range)
+
+    @staticmethod
+    def _ln_amplitude(stability_class, s):
+        sy, sz = sigma_yz_plume(np.exp(s), stability_class)
+        return -np.log(2 * math.pi * sy * sz)
+
+    @classmethod
+    def _ln_term(cls, stability_class, s, eta, zeta):
+        return cls._ln_amplitude(stability_class, s) - (eta * eta + zeta * zeta) / 2
+
+    def _cell(self, s):
+        """Index of the x cell holding each ln x (as _interpolate picks it)."""
+        nx = self.values.shape[0]
+        fi = np.clip((s - self._s0) / self._ds, 0, nx - 1)
+        return np.minimum(fi.astype(np.intp), nx - 2)
+
+    def _interpolate(self, s, eta, zeta):
+        """Trilinear interpolation of ln g at grid coordinates."""
+        nx, ny, nz = self.values.shape
+        fi = np.clip((s - self._s0) / self._ds, 0, nx - 1)
+        fj = np.clip(eta / self._deta, 0, ny - 1)
+        fk = np.clip(zeta / self._dzeta, 0, nz - 1)
+        i = self._cell(s)
+        j = np.minimum(fj.astype(np.intp), ny - 2)
+        k = np.minimum(fk.astype(np.intp), nz - 2)
+        tx, ty, tz = fi - i, fj - j, fk - k
+        # Gathers on the flat array: corner (a, b, c) sits at base + a*ny*nz + b*nz + c
+        v = self._flat
+        base = (i * ny + j) * nz + k
+        stride = ny * nz
+
+        def edge(offset):
+            return np.take(v, base + offset) * (1 - tz) + np.take(v, base + offset + 1) * tz
+
+        c00, c01, c10, c11 = edge(0), edge(nz), edge(stride), edge(stride + nz)
+        return (c00 * (1 - ty) + c01 * ty) * (1 - tx) + (c10 * (1 - ty) + c11 * ty) * tx
+
+    def normalised(self, height_m, x, y, z, return_error: bool = False):
+        """C u / Q at each point (and the relative error bound with return_error)."""
+        x, y, z, h = np.broadcast_arrays(*(np.asarray(a, dtype=float) for a in (x, y, z, height_m)))
+        shape = x.shape
+        x, y, z, h = x.ravel(), y.ravel(), z.ravel(), h.ravel()
+        out = np.zeros(x.shape)
+        err = np.zeros(x.shape)
+        for start in range(0, len(x), _BLOCK):
+            xb, yb, zb, hb = (a[start:start + _BLOCK] for a in (x, y, z, h))
+            inside = (xb >= self.x_range[0]) & (xb <= self.x_range[1]) & (zb >= 0)
+            result = np.zeros(xb.shape)
+            bound = np.zeros(xb.shape)
+            if inside.any():
+                index = np.flatnonzero(inside)
+                sy, sz = sigma_yz_plume(xb[index], self.stability_class)
+                eta = np.abs(yb[index]) / sy
+                zeta = np.abs(zb[index] - hb[index]) / sz
+                zeta_r = (zb[index] + hb[index]) / sz
+                # Both terms inside the table; a term beyond it is not 0 to
+                # the point's relative accuracy, so those points go exact.
+                covered = (eta <= ETA_MAX) & (zeta <= ZETA_MAX) & (zeta_r <= ZETA_MAX)
+                inside[index[~covered]] = False
+                index, s = index[covered], np.log(xb[index[covered]])
+                eta, zeta, zeta_r = eta[covered], zeta[covered], zeta_r[covered]
+                result[index] = np.exp(self._interpolate(s, eta, zeta)) + np.exp(self._interpolate(s, eta, zeta_r))
+                if return_error:
+                    bound[index] = self.error[self._cell(s)]
+            outside = ~inside & (zb >= 0)
+            if outside.any():
+                result[outside] = normalised_plume(xb[outside], yb[outside], zb[outside], hb[outside],
+                                                   self.stability_class)
+            out[start:start + len(xb)] = result
+            err[start:start + len(xb)] = bound
+        if return_error:
+            return out.reshape(shape), err.reshape(shape)
+        return out.reshape(shape)
+
+    def concentration(self, q_kg_s, wind_speed_m_s, height_m, x, y, z, return_error: bool = False):
+        """Plume concentration (kg/m^3): Q / u times the normalised field."""
+        scale = np.asarray(q_kg_s, dtype=float) / np.asarray(wind_speed_m_s, dtype=float)
+        if return_error:
+            f, err = self.normalised(height_m, x, y, z, return_error=True)
+            return scale * f, err
+        return scale * self.normalised(height_m, x, y, z)
+
+    # -----------------------------
+    # Persistence
+    # -----------------------------
+    def save(self, directory: str, name: str) -> None:
+        os.makedirs(directory, exist_ok=True)
+        np.save(os.path.join(directory, f"{name}.values.npy"), np.asarray(self.values))
+        np.save(os.path.join(directory, f"{name}.error.npy"), np.asarray(self.error))
+        meta = {
+            "version": TABLE_VERSION,
+            "stability_class": self.stability_class,
+            "x_range": list(self.x_range),
+            "shape": list(self.values.shape),
+        }
+        with open(os.path.join(directory, f"{name}.json"), "w", encoding="utf-8") as f:
+            json.dump(meta, f)
+
+    @classmethod
+    def load(cls, directory: str, name: str) -> Optional['PlumeTable']:
+        """Open a saved table as a read-only memory map; None if missing or outdated."""
+        try:
+            with open(os.path.join(directory, f"{name}.json"), encoding="utf-8") as f:
+                meta = json.load(f)
+            if meta.get("version") != TABLE_VERSION:
+                return None
+            values = np.load(os.path.join(directory, f"{name}.values.npy"), mmap_mode="r")
+            error = np.load(os.path.join(directory, f"{name}.error.npy"))
+        except (OSError, ValueError):
+            return None
+        return cls(meta["stability_class"], values, error, tuple(meta["x_range"]))
+
+
+class PlumeTableCache:
+    """One PlumeTable per stability class, optionally persisted to a directory."""
+
+    def __init__(self, directory: Optional[str] = None, shape=GRID_SHAPE):
+        self.directory = os.path.expanduser(directory) if directory else None
+        self.shape = tuple(shape)
+        self._tables: Dict[str, PlumeTable] = {}
+        self._lock = threading.Lock()
+
+    def table(self, stability_class: str) -> PlumeTable:
+        key = stability_class.upper()
+        with self._lock:
+            table = self._tables.get(key)
+            if table is None:
+                name = f"plume_{key}_{'x'.join(map(str, self.shape))}"
+                if self.directory:
+                    table = PlumeTable.load(self.directory, name)
+                if table is None:
+                    table = PlumeTable.build(key, self.shape)
+                    if self.directory:
+                        table.save(self.directory, name)
+                        table = PlumeTable.load(self.directory, name) or table
+                self._tables[key] = table
+            return table
+
+    def concentration(self, q_kg_s, wind_speed_m_s, height_m, x, y, z, stability_class, return_error=False):
+        return self.table(stability_class).concentration(q_kg_s, wind_speed_m_s, height_m, x, y, z, return_error)
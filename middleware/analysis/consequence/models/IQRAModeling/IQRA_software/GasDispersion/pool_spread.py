@@ -0,0 +1,173 @@
+"""
+    Pool spread and evaporation for liquid releases
+
+    A liquid leak of rate q (kg/s) for a release duration fills an unconfined
+    circular pool on land. Every scenario is integrated at once: the state
+    (radius r, volume V) of all pools is held in arrays and advanced together
+    by a Heun (RK2) step on a shared geometric time grid, so a whole study is
+    one batch.
+
+        dV/dt = (q * [t < duration] - w * pi r^2) / rho
+        dr/dt = sqrt(2 g (h - h_min))   while the depth h = V / (pi r^2) > h_min
+
+    Gravity spreading stops at the minimum thickness h_min, and a shrinking
+    pool retracts to keep r <= sqrt(V / (pi h_min)). The removal flux w
+    (kg/m^2/s) is either:
+
+    - evaporation, Mackay & Matsugu mass transfer
+      w = k_m * Pv * M / (R T),  k_m = 0.0048 u^(7/9) D^(-1/9) Sc^(-2/3)
+      giving the dispersion source term (peak rate and evaporated mass);
+    - burning, a constant burning rate m'', giving the pool fire diameter and
+      heat release Q = m'' * A * Hc.
+
+    The whole leak is assumed to reach the pool (no flash or rainout).
+"""
+
+import math
+from typing import Dict
+
+import numpy as np
+
+GRAVITY = 9.81
+GAS_CONSTANT_J_KMOL_K = 8314.46
+SCHMIDT_NUMBER = 0.8
+INITIAL_RADIUS_M = 0.1
+TIME_STEPS = 600
+
+
+def mass_transfer_coefficient(wind_speed_m_s, diameter_m):
+    """Mackay & Matsugu mass transfer coefficient k_m (m/s), broadcast over arrays."""
+    d = np.maximum(np.asarray(diameter_m, dtype=float), 1e-3)
+    return 0.0048 * np.asarray(wind_speed_m_s, dtype=float) ** (7.0 / 9.0) * d ** (-1.0 / 9.0) * SCHMIDT_NUMBER ** (-2.0 / 3.0)
+
+
+def _time_grid(horizon_s: float, steps: int) -> np.ndarray:
+    return np.concatenate(([0.0], np.geomspace(min(1e-2, horizon_s), horizon_s, steps)))
+
+
+def integrate_pools(
+    leak_rate_kg_s,
+    release_duration_s,
+    liquid_density_kg_m3,
+    removal_flux,
+    min_thickness_m: float = 0.01,
+    horizon_s: float = 600.0,
+    steps: int = TIME_STEPS,
+) -> Dict[str, np.ndarray]:
+    """
+    Integrate many pools at once
+
+    Args:
+        leak_rate_kg_s, release_duration_s, liquid_density_kg_m3: per-scenario arrays (or scalars)
+        removal_flux: w(radius) -> kg/m^2/s per scenario, evaluated on the current radii
+        min_thickness_m: Depth at which spreading stops
+        horizon_s: Simulated time after the start of the release
+
+    Returns:
+        Dict of (time,) and (time, scenario) arrays: time_s, radius_m, volume_m3, removal_kg_s
+    """
+    q, duration, rho = np.broadcast_arrays(
+        np.asarray(leak_rate_kg_s, dtype=float),
+        np.asarray(release_duration_s, dtype=float),
+        np.asarray(liquid_density_kg_m3, dtype=float),
+    )
+    q, duration, rho = q.ravel(), duration.ravel(), rho.ravel()
+    times = _time_grid(float(horizon_s), steps)
+    h_min = float(min_thickness_m)
+
+    def derivatives(t, r, v):
+        area = math.pi * r * r
+        wetted = v > 0
+        removal = np.where(wetted, removal_flux(r) * area, 0.0)
+        inflow = np.where(t < duration, q, 0.0)
+        depth = np.where(wetted, v / area, 0.0)
+        dr = np.sqrt(2.0 * GRAVITY * np.maximum(depth - h_min, 0.0))
+        return dr, (inflow - removal) / rho, removal
+
+    def constrain(r, v):
+        v = np.maximum(v, 0.0)
+        r = np.minimum(np.maximum(r, INITIAL_RADIUS_M), np.sqrt(v / (math.pi * h_min)))
+        return np.where(v > 0, np.maximum(r, INITIAL_RADIUS_M), 0.0), v
+
+    n = len(q)
+    radius = np.zeros((len(times), n))
+    volume = np.zeros((len(times), n))
+    removal = np.zeros((len(times), n))
+    r = np.full(n, INITIAL_RADIUS_M)
+    v = np.zeros(n)
+    for i in range(1, len(times)):
+        t0, dt = times[i - 1], times[i] - times[i - 1]
+        dr1, dv1, removal[i - 1] = derivatives(t0, r, v)
+        r_pred, v_pred = constrain(r + dt * dr1, v + dt * dv1)
+        r_pred = np.where(v_pred > 0, r_pred, INITIAL_RADIUS_M)
+        dr2, dv2, _ = derivatives(t0 + dt, r_pred, v_pred)
+        r, v = constrain(r + 0.5 * dt * (dr1 + dr2), v + 0.5 * dt * (dv1 + dv2))
+        r_keep = np.where(v > 0, r, INITIAL_RADIUS_M)
+        radius[i], volume[i] = r, v
+        r = r_keep
+    removal[-1] = derivatives(times[-1], r, volume[-1])[2]
+    return {"time_s": times, "radius_m": radius, "volume_m3": volume, "removal_kg_s": removal}
+
+
+def _summary(result: Dict[str, np.ndarray]) -> Dict[str, np.ndarray]:
+    times, removal = result["time_s"], result["removal_kg_s"]
+    peak = removal.argmax(axis=0)
+    columns = np.arange(removal.shape[1])
+    return {
+        "max_diameter_m": 2.0 * result["radius_m"].max(axis=0),
+        "peak_removal_kg_s": removal[peak, columns],
+        "peak_time_s": times[peak],
+        "removed_mass_kg": np.trapezoid(removal, times, axis=0),
+    }
+
+
+def simulate_pools(
+    leak_rate_kg_s,
+    release_duration_s,
+    liquid_density_kg_m3,
+    wind_speed_m_s: float,
+    vapour_pressure_pa: float,
+    molecular_weight_kg_kmol: float,
+    temperature_k: float,
+    burning_rate_kg_m2_s: float,
+    heat_combustion_kj_kg: float,
+    min_thickness_m: float = 0.01,
+    horizon_s: float = 600.0,
+) -> Dict[str, np.ndarray]:
+    """
+    Evaporating and burning pools for every liquid scenario in one batch
+
+    Returns:
+        Per-scenario arrays: max_diameter_m, peak_evaporation_kg_s, peak_evaporation_time_s,
+        evaporated_mass_kg (evaporating pool) and fire_diameter_m, fire_heat_release_kw
+        (burning pool at its largest)
+    """
+    q = np.atleast_1d(np.asarray(leak_rate_kg_s, dtype=float))
+    n = len(q)
+    vapour_flux = vapour_pressure_pa * molecular_weight_kg_kmol / (GAS_CONSTANT_J_KMOL_K * temperature_k)
+
+    # Evaporating and burning variants run as one stacked batch of 2n pools.
+    def removal_flux(r):
+        flux = np.empty_like(r)
+        flux[:n] = mass_transfer_coefficient(wind_speed_m_s, 2.0 * r[:n]) * vapour_flux
+        flux[n:] = burning_rate_kg_m2_s
+        return flux
+
+    stacked = integrate_pools(
+        np.concatenate([q, q]),
+        np.concatenate([np.broadcast_to(release_duration_s, (n,))] * 2),
+        np.concatenate([np.broadcast_to(liquid_density_kg_m3, (n,))] * 2),
+        removal_flux,
+        min_thickness_m,
+        horizon_s,
+    )
+    summary = _summary(stacked)
+    fire_diameter = summary["max_diameter_m"][n:]
+    return {
+        "max_diameter_m": summary["max_diameter_m"][:n],
+        "peak_evaporation_kg_s": summary["peak_removal_kg_s"][:n],
+        "peak_evaporation_time_s": summary["peak_time_s"][:n],
+        "evaporated_mass_kg": summary["removed_mass_kg"][:n],
+        "fire_diameter_m": fire_diameter,
+        "fire_heat_release_kw": burning_rate_kg_m2_s * math.pi * fire_diameter ** 2 / 4.0 * heat_combustion_kj_kg,
+    }
@@ -0,0 +1,104 @@
+"""
+Ad-hoc test driver for flammable_mass: closed forms against brute-force grid sums.
+Run: python test_flammable_mass.py
+"""
+import math
+import os
+import sys
+
+import numpy as np
+
+# Ensure local imports work when executed directly
+CURRENT_DIR = os.path.dirname(os.path.abspath(__file__))
+if CURRENT_DIR not in sys.path:
+    sys.path.insert(0, CURRENT_DIR)
+
+from flammable_mass import plume_flammable_mass, plume_section_mass, puff_flammable_mass
+from stability_params import sigma_puff, sigma_yz_plume
+
+STABILITY = 'D'
+RTOL = 1e-2
+
+
+def midpoints(lower, upper, n):
+    """Cell centres and cell width of n cells over [lower, upper]."""
+    step = (upper - lower) / n
+    return lower + step * (np.arange(n) + 0.5), step
+
+
+def reflected(z, height, sigma_z):
+    return np.exp(-((z - height) ** 2) / (2 * sigma_z ** 2)) + np.exp(-((z + height) ** 2) / (2 * sigma_z ** 2))
+
+
+def flammable_sum(concentration, cell, lfl, ufl):
+    return float(np.sum(np.where((concentration >= lfl) & (concentration <= ufl), concentration, 0.0)) * cell)
+
+
+def brute_force_section(q, u, height, x, lfl, ufl, n=800):
+    """Mass per metre downwind between LFL and UFL, summed over a (y, z) grid."""
+    sigma_y, sigma_z = (float(s) for s in sigma_yz_plume(x, STABILITY))
+    y, dy = midpoints(-6 * sigma_y, 6 * sigma_y, n)
+    z, dz = midpoints(0.0, height + 8 * sigma_z, n)
+    Y, Z = np.meshgrid(y, z, indexing='ij')
+    c = q / (2 * math.pi * u * sigma_y * sigma_z) * np.exp(-Y ** 2 / (2 * sigma_y ** 2)) * reflected(Z, height, sigma_z)
+    return flammable_sum(c, dy * dz, lfl, ufl)
+
+
+def brute_force_puff(mass, u, height, time_s, lfl, ufl, n=160):
+    """Puff mass between LFL and UFL, summed over an (x, y, z) grid around the centre."""
+    sigma_xy, sigma_z = (float(s) for s in sigma_puff(u * time_s, STABILITY))
+    xy, dxy = midpoints(-6 * sigma_xy, 6 * sigma_xy, n)
+    z, dz = midpoints(0.0, height + 8 * sigma_z, n)
+    X, Y, Z = np.meshgrid(xy, xy, z, indexing='ij', sparse=True)
+    c = (mass / ((2 * math.pi) ** 1.5 * sigma_xy ** 2 * sigma_z)
+         * np.exp(-(X ** 2 + Y ** 2) / (2 * sigma_xy ** 2)) * reflected(Z, height, sigma_z))
+    return flammable_sum(c, dxy * dxy * dz, lfl, ufl)
+
+
+def check_plume_sections():
+    q, u, x = 5.0, 3.0, 200.0
+    sigma_y, sigma_z = (float(s) for s in sigma_yz_plume(x, STABILITY))
+    peak = q / (2 * math.pi * u * sigma_y * sigma_z)
+    lfl, ufl = 0.05 * peak, 0.6 * peak
+    for label, height in (('ground', 0.0), ('mixed', sigma_z), ('elevated', 10 * sigma_z)):
+        closed = float(plume_section_mass(q, u, height, x, STABILITY, lfl, ufl)[0])
+        brute = brute_force_section(q, u, height, x, lfl, ufl)
+        print(f"Plume section {label}: closed {closed:.6g} kg/m, grid {brute:.6g} kg/m")
+        assert brute > 0
+        assert math.isclose(closed, brute, rel_tol=RTOL), (label, closed, brute)
+
+
+def check_puff():
+    mass, u, time_s = 100.0, 3.0, 60.0
+    sigma_xy, sigma_z = (float(s) for s in sigma_puff(u * time_s, STABILITY))
+    peak = mass / ((2 * math.pi) ** 1.5 * sigma_xy ** 2 * sigma_z)
+    lfl, ufl = 0.05 * peak, 0.6 * peak
+    for label, height in (('ground', 0.0), ('mixed', sigma_z), ('elevated', 10 * sigma_z)):
+        closed = puff_flammable_mass(mass, u, height, time_s, STABILITY, lfl, ufl)
+        brute = brute_force_puff(mass, u, height, time_s, lfl, ufl)
+        print(f"Puff {label}: closed {closed:.6g} kg, grid {brute:.6g} kg")
+        assert brute > 0
+        assert math.isclose(closed, brute, rel_tol=RTOL), (label, closed, brute)
+
+
+def check_plume_bounds():
+    """The whole plume never holds more than its line density times its length."""
+    q, u, duration = 5.0, 3.0, 5.0
+    lfl, ufl = 0.02, 0.2
+    full = plume_flammable_mass(q, u, 2.0, STABILITY, lfl, ufl)
+    cut = plume_flammable_mass(q, u, 2.0, STABILITY, lfl, ufl, duration_s=duration)
+    print(f"Plume total: {full:.6g} kg, cut at {duration:g} s: {cut:.6g} kg")
+    assert 0 < cut < full
+    assert cut <= q * duration
+    assert plume_flammable_mass(q, u, 2.0, STABILITY, ufl, lfl) == 0.0
+
+
+def main():
+    check_plume_sections()
+    check_puff()
+    check_plume_bounds()
+    print("OK")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,68 @@
+"""
+Ad-hoc test driver for plume_table: interpolated field against the exact one.
+Run: python test_plume_table.py
+"""
+import os
+import sys
+import tempfile
+
+import numpy as np
+
+# Ensure local imports work when executed directly
+CURRENT_DIR = os.path.dirname(os.path.abspath(__file__))
+if CURRENT_DIR not in sys.path:
+    sys.path.insert(0, CURRENT_DIR)
+
+from plume_table import PlumeTable, PlumeTableCache, normalised_plume
+
+
+def random_points(n, seed=0):
+    """Receptors over and beyond the table's x range, inside and outside its eta/zeta range."""
+    rng = np.random.default_rng(seed)
+    x = 10 ** rng.uniform(-0.5, 5.5, n)
+    y = rng.uniform(-1.0, 1.0, n) * 0.3 * x
+    z = rng.uniform(0.0, 1.0, n) * 0.3 * x
+    h = rng.uniform(0.0, 50.0, n)
+    return x, y, z, h
+
+
+def check_error_bound():
+    x, y, z, h = random_points(200_000)
+    for stability_class in 'ABCDEF':
+        table = PlumeTable.build(stability_class)
+        value, bound = table.normalised(h, x, y, z, return_error=True)
+        exact = normalised_plume(x, y, z, h, stability_class)
+        positive = exact > 0
+        relative = np.abs(value[positive] - exact[positive]) / exact[positive]
+        worst = (relative / np.where(bound[positive] > 0, bound[positive], np.inf)).max()
+        print(f"{stability_class}: max bound {table.error.max():.4f}, worst error / bound {worst:.3f}")
+        assert np.all(relative <= bound[positive]), stability_class
+        assert np.all(value[~positive] == 0.0), stability_class
+
+
+def check_below_ground():
+    table = PlumeTable.build('D')
+    value = table.normalised(10.0, [50.0, 2e5], [0.0, 0.0], [-1.0, -1.0])
+    assert np.all(value == 0.0), value
+
+
+def check_persistence():
+    x, y, z, h = random_points(10_000, seed=1)
+    with tempfile.TemporaryDirectory() as directory:
+        built = PlumeTableCache(directory).table('d')
+        loaded = PlumeTableCache(directory).table('D')
+        assert isinstance(loaded.values, np.memmap)
+        assert np.array_equal(built.error, loaded.error)
+        assert np.array_equal(built.normalised(h, x, y, z), loaded.normalised(h, x, y, z))
+    print("Saved table reopens as a memory map with the same values and bounds")
+
+
+def main():
+    check_error_bound()
+    check_below_ground()
+    check_persistence()
+    print("OK")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,63 @@
+"""
+Ad-hoc test driver for pool_spread.
+Run: python test_pool_spread.py
+"""
+import os
+import sys
+
+import numpy as np
+
+# Ensure local imports work when executed directly
+CURRENT_DIR = os.path.dirname(os.path.abspath(__file__))
+if CURRENT_DIR not in sys.path:
+    sys.path.insert(0, CURRENT_DIR)
+
+from pool_spread import integrate_pools, simulate_pools
+
+# Leak rate (kg/s), release duration (s): short, long and beyond the horizon
+LEAK_RATES = np.array([0.5, 2.0, 10.0])
+DURATIONS = np.array([30.0, 300.0, 1200.0])
+DENSITY = 700.0
+HORIZON = 600.0
+
+
+def check_mass_balance():
+    """Released mass = liquid left in the pool + mass removed from its surface."""
+    for label, flux in (('evaporating', lambda r: np.full_like(r, 0.002)), ('burning', lambda r: np.full_like(r, 0.05))):
+        result = integrate_pools(LEAK_RATES, DURATIONS, DENSITY, flux, horizon_s=HORIZON)
+        released = LEAK_RATES * np.minimum(DURATIONS, HORIZON)
+        pooled = DENSITY * result['volume_m3'][-1]
+        removed = np.trapezoid(result['removal_kg_s'], result['time_s'], axis=0)
+        print(f"{label}: released {released}, pooled {pooled.round(2)}, removed {removed.round(2)}")
+        assert np.all(result['volume_m3'] >= 0)
+        assert np.allclose(pooled + removed, released, rtol=2e-2), (label, pooled + removed, released)
+
+
+def check_batch_independence():
+    """A scenario gives the same pool alone as inside a batch."""
+    kwargs = dict(
+        wind_speed_m_s=3.0,
+        vapour_pressure_pa=5000.0,
+        molecular_weight_kg_kmol=86.0,
+        temperature_k=298.15,
+        burning_rate_kg_m2_s=0.05,
+        heat_combustion_kj_kg=45000.0,
+    )
+    batch = simulate_pools(LEAK_RATES, DURATIONS, DENSITY, **kwargs)
+    for i in range(len(LEAK_RATES)):
+        single = simulate_pools(LEAK_RATES[i], DURATIONS[i], DENSITY, **kwargs)
+        for key, values in batch.items():
+            assert np.isclose(values[i], single[key][0]), (key, i)
+    print("Max diameters (m):", batch['max_diameter_m'].round(2))
+    assert np.all(np.diff(batch['max_diameter_m']) > 0)
+    assert np.all(batch['evaporated_mass_kg'] <= LEAK_RATES * np.minimum(DURATIONS, HORIZON))
+
+
+def main():
+    check_mass_balance()
+    check_batch_independence()
+    print("OK")
+
+
+if __name__ == "__main__":
+    main()
@@ -59,15 +59,31 @@ def compute_leak_profiles(
     frequency_results: Dict[int, Dict[str, Any]],
     density_overrides: Optional[Dict[int, Dict[str, Any]]] = None,
     hole_diametres_mm: Optional[Dict[str, float]] = None,
+    job=None,
 ) -> Dict[int, Dict[str, Any]]:
-    """For each group and leak category, compute leak rates using derived hole diametre."""
+    """For each group and leak category, compute leak rates using derived hole diametre.
+
+    job: optional job_control.Job; checked once per group, partial results are
+    the groups completed so far.
+    """
     gas_calc = GasLeakCalculator()
     liq_calc = LiquidLeakCalculator()
     two_calc = TwoPhaseLeakCalculator()
 
     results: Dict[int, Dict[str, Any]] = {}
 
+    if job is not None:
+        job.start(
+            sum(
+                len([c for c in g.get("frequencies", {}) if c != "Total"])
+                for g in frequency_results.values()
+            ),
+            "Leak scenarios",
+        )
+
     for group_num, group_data in frequency_results.items():
+        if job is not None:
+            job.checkpoint(results)
         env = group_data.get("operational_conditions", {})
         phase = str(env.get("fuel_phase", "")).lower()
         pressure = float(env.get("pressure", env.get("pressure_bar_g", 0.0)))
@@ -112,6 +128,8 @@ def compute_leak_profiles(
             "operational_conditions": env,
             "categories": categories,
         }
+        if job is not None:
+            job.advance(len(categories))
 
     return results
 
@@ -1,18 +1,19 @@
+import os
+import sys
 import tkinter as tk
 from tkinter import ttk, messagebox
 import math
 
 # --------------------------
-# Briggs (1973) σy, σz 계수
+# Briggs (1973) σy, σz 계수 (stability_params)
 # --------------------------
-coeffs_briggs = {
-    "A": (0.18, 0.92, 0.60, 0.75),
-    "B": (0.14, 0.92, 0.53, 0.73),
-    "C": (0.10, 0.92, 0.34, 0.71),
-    "D": (0.06, 0.92, 0.15, 0.70),
-    "E": (0.04, 0.92, 0.10, 0.65),
-    "F": (0.02, 0.89, 0.05, 0.61),
-}
+_gas_dispersion_path = os.path.join(
+    os.path.dirname(os.path.abspath(__file__)), "IQRAModeling", "IQRA_software", "GasDispersion"
+)
+if _gas_dispersion_path not in sys.path:
+    sys.path.insert(0, _gas_dispersion_path)
+
+from stability_params import STABILITY_CLASSES, sigma_puff  # noqa: E402
 
 
 # --------------------------
@@ -27,7 +28,7 @@ def calculate_concentration():
         stability = combo_stability.get().strip()
         x_values = entry_x.get().split(",")  # 여러 x 값 가능 (쉼표로 구분)
 
-        if stability not in coeffs_briggs:
+        if stability not in STABILITY_CLASSES:
             messagebox.showerror("Error", "Please select a valid stability class (A–F).")
             return
 
@@ -35,16 +36,13 @@ def calculate_concentration():
         for row in tree.get_children():
             tree.delete(row)
 
-        a, b, c, d = coeffs_briggs[stability]
-
         for x_str in x_values:
             try:
                 x = float(x_str.strip())
             except ValueError:
                 continue
 
-            sigma_y = a * (x ** b)
-            sigma_z = c * (x ** d)
+            sigma_y, sigma_z = sigma_puff(x, stability)
 
             # Gaussian Puff 농도 계산식
             C = (Q / ((2 * math.pi) ** 1.5 * sigma_y * sigma_y * sigma_z)) * \
@@ -91,7 +89,7 @@ entry_z = add_input("Z (m)")
 frm_stab = ttk.Frame(frame)
 frm_stab.pack(pady=5)
 ttk.Label(frm_stab, text="Stability class (A–F): ", width=22).pack(side="left")
-combo_stability = ttk.Combobox(frm_stab, values=["A", "B", "C", "D", "E", "F"], width=5)
+combo_stability = ttk.Combobox(frm_stab, values=list(STABILITY_CLASSES), width=5)
 combo_stability.pack(side="left")
 
 # 계산 버튼
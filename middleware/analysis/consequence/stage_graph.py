@@ -0,0 +1,676 @@
+"""
+Stage dependency graph for the consequence pipeline.
+
+The pipeline is frequency -> leak -> dispersion, with the explosion summary
+as a side stage and the per-scenario flammable cloud explosion stage fed by
+the leak rates. Liquid leaks go through the pool stage (spread and
+evaporation), which feeds the dispersion source term and the per-scenario
+pool fires. Each stage declares the inputs it reads and the
+upstream stages it consumes; its output is cached and only recomputed when one
+of those inputs, or an upstream output, changes. A what-if edit to the
+receptor position therefore reruns only the dispersion stage; a wind speed
+edit also reruns pool (evaporation), pool_fire and flammable_explosion, which
+all depend on the wind, but never frequency, leak or explosion.
+
+Usage:
+    pipeline = ConsequencePipeline()
+    results = pipeline.run(get_params(), group_manager=FrequencyGroupManager())
+    pipeline.last_recomputed  # e.g. ['dispersion'] after moving the receptor
+
+    for group_num, result in pipeline.iter_groups(get_params(), groups=groups):
+        ...  # render each group as soon as it is computed
+"""
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import sys
+from dataclasses import dataclass, fields
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+
+import numpy as np
+
+
+def _ensure_path(path: str) -> None:
+    if path not in sys.path:
+        sys.path.insert(0, path)
+
+
+_BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+_ensure_path(_BASE_DIR)
+_ensure_path(
+    os.path.abspath(os.path.join(_BASE_DIR, "models/IQRAModeling/IQRA_software/ExplosionModel"))
+)
+_ensure_path(
+    os.path.abspath(os.path.join(_BASE_DIR, "models/IQRAModeling/IQRA_software/FireModel"))
+)
+
+from calculate_consequence import (
+    attach_dispersion,
+    calculate_all_group_frequencies,
+    compute_leak_profiles,
+)
+from calculate_freq import load_groups_from_cache
+import BlastEngine
+from flammable_mass import flammable_mass
+from pool_spread import GAS_CONSTANT_J_KMOL_K, simulate_pools
+from PoolFire import calculate_radiant_heat_flux
+from RadiationEngine import point_source_distances, point_source_flux
+
+
+@dataclass(frozen=True)
+class Stage:
+    """A pipeline stage: a function of named inputs and upstream stage outputs."""
+
+    name: str
+    func: Callable[..., Any]
+    inputs: Tuple[str, ...] = ()
+    depends_on: Tuple[str, ...] = ()
+    # Stages that loop over groups take a `job` keyword for progress/cancellation.
+    uses_job: bool = False
+
+
+def _fingerprint(values: Dict[str, Any]) -> str:
+    payload = json.dumps(values, sort_keys=True, default=repr)
+    return hashlib.sha1(payload.encode("utf-8")).hexdigest()
+
+
+class StageGraph:
+    """Runs stages in dependency order, reusing cached outputs where possible."""
+
+    def __init__(self, stages: Iterable[Stage]):
+        self.stages: Dict[str, Stage] = {}
+        for stage in stages:
+            if stage.name in self.stages:
+                raise ValueError(f"Duplicate stage '{stage.name}'")
+            self.stages[stage.name] = stage
+        self.order = self._topological_order()
+
+        # name -> (input fingerprint, upstream versions, output)
+        self._cache: Dict[str, Tuple[str, Tuple[int, ...], Any]] = {}
+        # Bumped every time a stage recomputes so dependants see the change.
+        self._versions: Dict[str, int] = {name: 0 for name in self.stages}
+        self.last_recomputed: List[str] = []
+
+    def _topological_order(self) -> List[str]:
+        order: List[str] = []
+        state: Dict[str, str] = {}
+
+        def visit(name: str, trail: Tuple[str, ...]):
+            if state.get(name) == "done":
+                return
+            if state.get(name) == "visiting":
+                raise ValueError(f"Stage cycle detected: {' -> '.join(trail + (name,))}")
+            if name not in self.stages:
+                raise ValueError(f"Unknown upstream stage '{name}'")
+            state[name] = "visiting"
+            for dep in self.stages[name].depends_on:
+                visit(dep, trail + (name,))
+            state[name] = "done"
+            order.append(name)
+
+        for name in self.stages:
+            visit(name, ())
+        return order
+
+    def _required(self, targets: Optional[Iterable[str]]) -> List[str]:
+        if targets is None:
+            return list(self.order)
+        needed = set()
+        pending = list(targets)
+        while pending:
+            name = pending.pop()
+            if name not in self.stages:
+                raise ValueError(f"Unknown stage '{name}'")
+            if name not in needed:
+                needed.add(name)
+                pending.extend(self.stages[name].depends_on)
+        return [name for name in self.order if name in needed]
+
+    def run(
+        self,
+        inputs: Dict[str, Any],
+        targets: Optional[Iterable[str]] = None,
+        progress: Optional[Callable[[int, int, str], None]] = None,
+        job=None,
+    ) -> Dict[str, Any]:
+        """Run the graph (or only what targets need) and return stage outputs by name.
+
+        progress, if given, is called as progress(stages_done, stages_total, stage_name)
+        after each stage finishes or is served from cache. job (job_control.Job) is
+        checked between stages and handed to stages with uses_job set; a cancelled
+        stage leaves its previous cache entry untouched.
+        """
+        outputs: Dict[str, Any] = {}
+        self.last_recomputed = []
+        required = self._required(targets)
+
+        for index, name in enumerate(required, start=1):
+            stage = self.stages[name]
+            stage_inputs = {key: inputs.get(key) for key in stage.inputs}
+            key = _fingerprint(stage_inputs)
+            upstream = tuple(self._versions[dep] for dep in stage.depends_on)
+
+            cached = self._cache.get(name)
+            if cached is not None and cached[0] == key and cached[1] == upstream:
+                outputs[name] = cached[2]
+                if progress is not None:
+                    progress(index, len(required), name)
+                continue
+
+            if job is not None:
+                job.checkpoint(outputs)
+            kwargs = dict(stage_inputs)
+            kwargs.update({dep: outputs[dep] for dep in stage.depends_on})
+            if stage.uses_job:
+                kwargs["job"] = job
+            result = stage.func(**kwargs)
+
+            self._versions[name] += 1
+            self._cache[name] = (key, upstream, result)
+            outputs[name] = result
+            self.last_recomputed.append(name)
+            if progress is not None:
+                progress(index, len(required), name)
+
+        return outputs
+
+    def stale(self, inputs: Dict[str, Any], targets: Optional[Iterable[str]] = None) -> List[str]:
+        """Return the stages run() would recompute for these inputs, in order."""
+        stale: List[str] = []
+        for name in self._required(targets):
+            stage = self.stages[name]
+            cached = self._cache.get(name)
+            key = _fingerprint({key: inputs.get(key) for key in stage.inputs})
+            upstream = tuple(self._versions[dep] for dep in stage.depends_on)
+            if (
+                cached is None
+                or cached[0] != key
+                or cached[1] != upstream
+                or any(dep in stale for dep in stage.depends_on)
+            ):
+                stale.append(name)
+        return stale
+
+    def store(self, name: str, inputs: Dict[str, Any], result: Any) -> None:
+        """Cache a stage output computed outside run() (e.g. assembled group by group).
+
+        Store upstream stages first so the recorded upstream versions match.
+        """
+        stage = self.stages[name]
+        key = _fingerprint({key: inputs.get(key) for key in stage.inputs})
+        upstream = tuple(self._versions[dep] for dep in stage.depends_on)
+        self._versions[name] += 1
+        self._cache[name] = (key, upstream, result)
+
+    def invalidate(self, name: Optional[str] = None) -> None:
+        """Drop cached output for one stage (and so its dependants), or all stages."""
+        names = [name] if name is not None else list(self.stages)
+        for stage_name in names:
+            if self._cache.pop(stage_name, None) is not None:
+                self._versions[stage_name] += 1
+
+
+# -----------------------------
+# Consequence pipeline stages
+# -----------------------------
+def _frequency_stage(groups, cache_file_path, job=None):
+    return calculate_all_group_frequencies(
+        cache_file_path=cache_file_path,
+        groups=groups,
+        job=job,
+    )
+
+
+def _leak_stage(density_overrides, hole_diametres_mm, frequency, job=None):
+    if not frequency:
+        return {}
+    return compute_leak_profiles(
+        frequency,
+        density_overrides=density_overrides,
+        hole_diametres_mm=hole_diametres_mm,
+        job=job,
+    )
+
+
+def _pool_stage(pool_params, leak, job=None):
+    scenarios = [
+        (group_num, category, float(cat_data.get("leak_rate_kg_s") or 0.0))
+        for group_num, group_data in leak.items()
+        if group_data.get("phase") == "liquid"
+        for category, cat_data in group_data.get("categories", {}).items()
+    ]
+    results: Dict[int, Dict[str, Any]] = {}
+    if not scenarios:
+        return results
+    if job is not None:
+        job.start(1, "Pool spread")
+    pools = simulate_pools(
+        [leak_rate for _, _, leak_rate in scenarios],
+        pool_params["release_duration_s"],
+        pool_params["liquid_density_kg_m3"],
+        pool_params["wind_speed_m_s"],
+        pool_params["vapour_pressure_pa"],
+        pool_params["molecular_weight_kg_kmol"],
+        pool_params["temperature_k"],
+        pool_params["burning_rate_kg_m2_s"],
+        pool_params["heat_combustion_kj_kg"],
+        min_thickness_m=pool_params["min_thickness_m"],
+        horizon_s=pool_params["simulation_time_s"],
+    )
+    for i, (group_num, category, _) in enumerate(scenarios):
+        results.setdefault(group_num, {})[category] = {key: float(values[i]) for key, values in pools.items()}
+    if job is not None:
+        job.advance()
+    return results
+
+
+def _dispersion_stage(dispersion_params, leak, pool=None, job=None):
+    return attach_dispersion(leak, dispersion_params, job=job, pools=pool)
+
+
+ATMOSPHERIC_PRESSURE_PA = 101325.0
+# Temperature a released gas is taken to reach once it has expanded.
+AMBIENT_TEMPERATURE_K = 288.15
+
+# Side-on overpressures (bar) reported as hazard distances: 0.3, 1 and 3 psi.
+DEFAULT_OVERPRESSURE_THRESHOLDS_BAR = (0.0207, 0.069, 0.207)
+# Heat fluxes (kW/m2) reported as hazard distances: pain, process equipment damage, plant damage.
+DEFAULT_HEAT_FLUX_THRESHOLDS_KW_M2 = (4.0, 12.5, 37.5)
+
+
+def _explosion_stage(explosion_params):
+    eta = explosion_params.get("eta")
+    mass = explosion_params.get("mass_kg")
+    heat = explosion_params.get("heat_combustion_kj_kg")
+    tnt_heat = explosion_params.get("tnt_heat_combustion_kj_kg")
+    distance = explosion_params.get("distance_m")
+    p0 = explosion_params.get("ambient_pressure_bar")
+    thresholds = explosion_params.get("overpressure_thresholds_bar") or DEFAULT_OVERPRESSURE_THRESHOLDS_BAR
+
+    result = {"tnt_mass_kg": None, "scaled_distance": None, "overpressure_bar": None,
+              "tno_overpressure_bar": None, "bst_overpressure_bar": None,
+              "threshold_distances_m": {}}
+    try:
+        if not mass or mass <= 0 or not tnt_heat or tnt_heat <= 0 or not distance or distance <= 0:
+            return result
+        w_mass = float(BlastEngine.tnt_equivalent_mass(float(eta), float(mass), float(heat), float(tnt_heat)))
+        if w_mass <= 0:
+            return result
+        tnt_scale = BlastEngine.tnt_scale(w_mass)
+        result.update(
+            tnt_mass_kg=w_mass,
+            scaled_distance=float(BlastEngine.scaled_distance(distance, tnt_scale)),
+            overpressure_bar=float(BlastEngine.overpressure("tnt", distance, tnt_scale)),
+        )
+        energy_kj = None
+        if p0 and p0 > 0 and heat > 0:
+            energy_kj = mass * heat
+            energy_scale = BlastEngine.energy_scale(energy_kj, p0)
+            result["tno_overpressure_bar"] = float(BlastEngine.overpressure("tno", distance, energy_scale))
+            result["bst_overpressure_bar"] = float(BlastEngine.overpressure("bst", distance, energy_scale))
+        # Every model x threshold in one closed-form evaluation.
+        distances = BlastEngine.threshold_distances(thresholds, w_mass, energy_kj, p0 if energy_kj else None)
+        result["threshold_distances_m"] = {
+            model: dict(zip(map(float, thresholds), values.tolist())) for model, values in distances.items()
+        }
+    except (TypeError, ValueError):
+        pass
+    return result
+
+
+def _flammable_explosion_stage(flammability_params, blast_params, leak, job=None):
+    """Flammable cloud mass and blast hazard distances for every gas scenario.
+
+    The cloud between LFL and UFL replaces the hand-entered explosion mass: it
+    sets the TNT equivalent mass and the TNO/BST energy of each group and leak
+    category, and all scenarios x thresholds are evaluated in one blast call.
+    """
+    lfl = flammability_params.get("lfl_kg_m3") or 0.0
+    ufl = flammability_params.get("ufl_kg_m3") or 0.0
+    eta = blast_params.get("eta") or 0.0
+    heat = blast_params.get("heat_combustion_kj_kg") or 0.0
+    tnt_heat = blast_params.get("tnt_heat_combustion_kj_kg") or 0.0
+    p0 = blast_params.get("ambient_pressure_bar") or 0.0
+    thresholds = blast_params.get("overpressure_thresholds_bar") or DEFAULT_OVERPRESSURE_THRESHOLDS_BAR
+
+    scenarios = [
+        (group_num, category, float(cat_data.get("leak_rate_kg_s") or 0.0))
+        for group_num, group_data in leak.items()
+        if group_data.get("phase") == "gas"
+        for category, cat_data in group_data.get("categories", {}).items()
+    ]
+    results: Dict[int, Dict[str, Any]] = {}
+    if job is not None:
+        job.start(len(scenarios), "Flammable cloud")
+    masses = []
+    for group_num, category, leak_rate in scenarios:
+        if job is not None:
+            job.checkpoint(results)
+        try:
+            mass = flammable_mass(
+                flammability_params.get("model", "plume"),
+                leak_rate,
+                float(flammability_params.get("wind_speed_m_s", 0.0)),
+                float(flammability_params.get("release_height_m", 0.0)),
+                str(flammability_params.get("stability_class", "D")),
+                lfl,
+                ufl,
+                float(flammability_params.get("puff_time_s", 0.0)),
+                float(flammability_params.get("release_duration_s", 0.0)),
+            )
+        except (TypeError, ValueError):
+            mass = 0.0
+        masses.append(mass)
+        if job is not None:
+            job.advance()
+    if not scenarios:
+        return results
+
+    masses = np.asarray(masses)
+    # Without a heat of combustion there is no blast energy: report the TNT
+    # results as None (as the explosion stage does), not as a 0 kg charge.
+    tnt_mass = None
+    if tnt_heat > 0 and heat > 0:
+        tnt_mass = BlastEngine.tnt_equivalent_mass(eta, masses, heat, tnt_heat)
+    energy_kj = masses * heat if heat > 0 and p0 > 0 else None
+    distances = BlastEngine.threshold_distances(
+        thresholds, tnt_mass, energy_kj, p0 if energy_kj is not None else None
+    )
+    for i, (group_num, category, _) in enumerate(scenarios):
+        results.setdefault(group_num, {})[category] = {
+            "flammable_mass_kg": float(masses[i]),
+            "tnt_mass_kg": float(tnt_mass[i]) if tnt_mass is not None else None,
+            "energy_kj": float(energy_kj[i]) if energy_kj is not None else None,
+            "threshold_distances_m": {
+                model: dict(zip(map(float, thresholds), values[i].tolist()))
+                for model, values in distances.items()
+            },
+        }
+    return results
+
+
+def _pool_fire_scenarios(pool_fire_params, pool, thresholds):
+    """Radiation from each liquid scenario's burning pool (point source)."""
+    keys = [(g, c) for g, categories in pool.items() for c in categories]
+    f = float(pool_fire_params.get("radiative_fraction") or 0.0)
+    tau = float(pool_fire_params.get("atmospheric_transmissivity") or 0.0)
+    if not keys or not 0 <= f <= 1 or not 0 <= tau <= 1:
+        return {}
+    q_kw = np.array([pool[g][c]["fire_heat_release_kw"] for g, c in keys])
+    d_m = np.array([pool[g][c]["fire_diameter_m"] for g, c in keys])
+    distance = float(pool_fire_params.get("distance_m") or 0.0)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        flux = np.where(d_m > 0, point_source_flux(q_kw, d_m, distance, f, tau), 0.0)
+        distances = point_source_distances(q_kw[:, None], d_m[:, None], f, tau, thresholds)
+    results: Dict[int, Dict[str, Any]] = {}
+    for i, (group_num, category) in enumerate(keys):
+        results.setdefault(group_num, {})[category] = {
+            "diameter_m": float(d_m[i]),
+            "heat_release_rate_kw": float(q_kw[i]),
+            "radiant_heat_flux_kw_m2": float(flux[i]),
+            "threshold_distances_m": dict(zip(map(float, thresholds), distances[i].tolist())),
+        }
+    return results
+
+
+def _pool_fire_stage(pool_fire_params, pool=None):
+    thresholds = pool_fire_params.get("heat_flux_thresholds_kw_m2") or DEFAULT_HEAT_FLUX_THRESHOLDS_KW_M2
+    scenarios = _pool_fire_scenarios(pool_fire_params, pool or {}, thresholds)
+    q_kw = pool_fire_params.get("heat_release_rate_kw")
+    d_m = pool_fire_params.get("diameter_m")
+    f = pool_fire_params.get("radiative_fraction")
+    tau = pool_fire_params.get("atmospheric_transmissivity")
+    try:
+        flux = calculate_radiant_heat_flux(q_kw, d_m, pool_fire_params.get("distance_m"), f, tau)
+    except (TypeError, ValueError):
+        return {"radiant_heat_flux_kw_m2": None, "threshold_distances_m": None, "scenarios": scenarios}
+    distances = point_source_distances(float(q_kw), float(d_m), float(f), float(tau), thresholds)
+    return {
+        "radiant_heat_flux_kw_m2": flux,
+        "threshold_distances_m": dict(zip(map(float, thresholds), distances.tolist())),
+        "scenarios": scenarios,
+    }
+
+
+def build_consequence_graph() -> StageGraph:
+    """Return the standard frequency -> leak -> dispersion (+ fire/explosion) graph."""
+    return StageGraph(
+        [
+            Stage(
+                "frequency",
+                _frequency_stage,
+                inputs=("groups", "cache_file_path"),
+                uses_job=True,
+            ),
+            Stage(
+                "leak",
+                _leak_stage,
+                inputs=("density_overrides", "hole_diametres_mm"),
+                depends_on=("frequency",),
+                uses_job=True,
+            ),
+            Stage(
+                "pool",
+                _pool_stage,
+                inputs=("pool_params",),
+                depends_on=("leak",),
+                uses_job=True,
+            ),
+            Stage(
+                "dispersion",
+                _dispersion_stage,
+                inputs=("dispersion_params",),
+                depends_on=("leak", "pool"),
+                uses_job=True,
+            ),
+            Stage("explosion", _explosion_stage, inputs=("explosion_params",)),
+            Stage(
+                "flammable_explosion",
+                _flammable_explosion_stage,
+                inputs=("flammability_params", "blast_params"),
+                depends_on=("leak",),
+                uses_job=True,
+            ),
+            Stage("pool_fire", _pool_fire_stage, inputs=("pool_fire_params",), depends_on=("pool",)),
+        ]
+    )
+
+
+def stage_inputs_from_params(
+    params,
+    groups: Optional[Dict[int, Dict[str, Any]]] = None,
+    cache_file_path: Optional[str] = None,
+    hole_diametres_mm: Optional[Dict[str, float]] = None,
+) -> Dict[str, Any]:
+    """Split a ConsequenceParams object into the per-stage input dicts."""
+    values = {f.name: getattr(params, f.name) for f in fields(params)}
+    groups = groups or {}
+    # gas_density_kg_m3 is the upstream density the leak model uses; the cloud
+    # is at ambient conditions.
+    ambient_gas_density = (
+        ATMOSPHERIC_PRESSURE_PA * values["gas_molecular_weight_kg_kmol"]
+        / (GAS_CONSTANT_J_KMOL_K * AMBIENT_TEMPERATURE_K)
+    )
+
+    return {
+        "groups": groups,
+        "cache_file_path": cache_file_path,
+        "hole_diametres_mm": hole_diametres_mm,
+        "density_overrides": {
+            group_id: {
+                "gas_density": values["gas_density_kg_m3"],
+                "liquid_density": values["liquid_density_kg_m3"],
+                "gor": values["gor"],
+            }
+            for group_id in groups
+        },
+        "dispersion_params": {
+            "model": values["model"],
+            "wind_speed_m_s": values["wind_speed_m_s"],
+            "release_height_m": values["release_height_m"],
+            "stability_class": values["stability_class"],
+            "x_m": values["x_m"],
+            "y_m": values["y_m"],
+            "z_m": values["z_m"],
+            "puff_time_s": values["puff_time_s"],
+            "release_duration_s": values["release_duration_s"],
+            "gas_vapour_density_kg_m3": ambient_gas_density,
+            "air_density_kg_m3": values["air_density_kg_m3"],
+            "pool_vapour_density_kg_m3": (
+                ATMOSPHERIC_PRESSURE_PA * values["pool_molecular_weight_kg_kmol"]
+                / (GAS_CONSTANT_J_KMOL_K * values["pool_temperature_k"])
+            ),
+        },
+        "flammability_params": {
+            "lfl_kg_m3": values["explosion_lfl_vol_pct"] / 100.0 * ambient_gas_density,
+            "ufl_kg_m3": values["explosion_ufl_vol_pct"] / 100.0 * ambient_gas_density,
+            "model": values["model"],
+            "wind_speed_m_s": values["wind_speed_m_s"],
+            "release_height_m": values["release_height_m"],
+            "stability_class": values["stability_class"],
+            "puff_time_s": values["puff_time_s"],
+            "release_duration_s": values["release_duration_s"],
+        },
+        "explosion_params": {
+            "eta": values["explosion_eta"],
+            "mass_kg": values["explosion_mass_kg"],
+            "heat_combustion_kj_kg": values["explosion_heat_combustion_kj_kg"],
+            "tnt_heat_combustion_kj_kg": values["explosion_tnt_heat_combustion_kj_kg"],
+            "distance_m": values["explosion_distance_m"],
+            "ambient_pressure_bar": values["explosion_ambient_pressure_bar"],
+        },
+        # The explosion_params the flammable cloud stage reads (not mass or distance)
+        "blast_params": {
+            "eta": values["explosion_eta"],
+            "heat_combustion_kj_kg": values["explosion_heat_combustion_kj_kg"],
+            "tnt_heat_combustion_kj_kg": values["explosion_tnt_heat_combustion_kj_kg"],
+            "ambient_pressure_bar": values["explosion_ambient_pressure_bar"],
+        },
+        "pool_params": {
+            "liquid_density_kg_m3": values["liquid_density_kg_m3"],
+            "wind_speed_m_s": values["wind_speed_m_s"],
+            "release_duration_s": values["release_duration_s"],
+            "min_thickness_m": values["pool_min_thickness_m"],
+            "vapour_pressure_pa": values["pool_vapour_pressure_pa"],
+            "molecular_weight_kg_kmol": values["pool_molecular_weight_kg_kmol"],
+            "temperature_k": values["pool_temperature_k"],
+            "burning_rate_kg_m2_s": values["pool_burning_rate_kg_m2_s"],
+            "heat_combustion_kj_kg": values["pool_heat_combustion_kj_kg"],
+            "simulation_time_s": values["pool_simulation_time_s"],
+        },
+        "pool_fire_params": {
+            "heat_release_rate_kw": values["pool_fire_heat_release_rate_kw"],
+            "diameter_m": values["pool_fire_diameter_m"],
+            "distance_m": values["pool_fire_distance_m"],
+            "radiative_fraction": values["pool_fire_radiative_fraction"],
+            "atmospheric_transmissivity": values["pool_fire_atmospheric_transmissivity"],
+        },
+    }
+
+
+class ConsequencePipeline:
+    """Cached consequence pipeline driven by ConsequenceParams."""
+
+    def __init__(self, graph: Optional[StageGraph] = None):
+        self.graph = graph or build_consequence_graph()
+
+    @property
+    def last_recomputed(self) -> List[str]:
+        return self.graph.last_recomputed
+
+    def run_stages(
+        self,
+        params,
+        *,
+        group_manager=None,
+        groups: Optional[Dict[int, Dict[str, Any]]] = None,
+        cache_file_path: Optional[str] = None,
+        hole_diametres_mm: Optional[Dict[str, float]] = None,
+        targets: Optional[Iterable[str]] = None,
+        progress: Optional[Callable[[int, int, str], None]] = None,
+        job=None,
+    ) -> Dict[str, Any]:
+        """Run the graph and return every requested stage output by name."""
+        if groups is None and group_manager is not None:
+            groups = group_manager.get_all_group_data()
+        inputs = stage_inputs_from_params(
+            params,
+            groups=groups,
+            cache_file_path=cache_file_path,
+            hole_diametres_mm=hole_diametres_mm,
+        )
+        return self.graph.run(inputs, targets=targets, progress=progress, job=job)
+
+    def run(self, params, **kwargs) -> Dict[int, Dict[str, Any]]:
+        """Return the same structure as calculate_group_consequence."""
+        outputs = self.run_stages(params, targets=("dispersion",), **kwargs)
+        return outputs["dispersion"]
+
+    def iter_groups(
+        self,
+        params,
+        *,
+        group_manager=None,
+        groups: Optional[Dict[int, Dict[str, Any]]] = None,
+        cache_file_path: Optional[str] = None,
+        hole_diametres_mm: Optional[Dict[str, float]] = None,
+        job=None,
+    ) -> Iterator[Tuple[int, Dict[str, Any]]]:
+        """Yield (group number, consequence result) as each group completes.
+
+        The first result arrives after one group's frequency, leak and
+        dispersion work instead of after the whole study. If the frequency
+        and leak stages are already cached (a what-if rerun), the cached graph
+        runs as usual and its groups are yielded from the result. Once every
+        group has been computed the assembled stage outputs are cached, so a
+        later run() or iter_groups() with the same inputs is served from cache.
+        """
+        if groups is None and group_manager is not None:
+            groups = group_manager.get_all_group_data()
+        inputs = stage_inputs_from_params(
+            params,
+            groups=groups,
+            cache_file_path=cache_file_path,
+            hole_diametres_mm=hole_diametres_mm,
+        )
+        graph = self.graph
+        stale = graph.stale(inputs, targets=("dispersion",))
+        if "frequency" not in stale and "leak" not in stale:
+            outputs = graph.run(inputs, targets=("dispersion",), job=job)
+            for group_num in sorted(outputs["dispersion"]):
+                yield group_num, outputs["dispersion"][group_num]
+            return
+
+        resolved = inputs["groups"] or load_groups_from_cache(cache_file_path)
+        frequency: Dict[int, Dict[str, Any]] = {}
+        leak: Dict[int, Dict[str, Any]] = {}
+        pool: Dict[int, Dict[str, Any]] = {}
+        dispersion: Dict[int, Dict[str, Any]] = {}
+        graph.last_recomputed = []
+        if job is not None:
+            job.start(len(resolved), "Consequence")
+        for group_num in sorted(resolved):
+            if job is not None:
+                job.checkpoint(dispersion)
+            group_frequency = _frequency_stage({group_num: resolved[group_num]}, cache_file_path)
+            group_leak = _leak_stage(
+                inputs["density_overrides"], inputs["hole_diametres_mm"], group_frequency
+            )
+            group_pool = _pool_stage(inputs["pool_params"], group_leak)
+            group_dispersion = _dispersion_stage(inputs["dispersion_params"], group_leak, group_pool)
+            frequency.update(group_frequency)
+            leak.update(group_leak)
+            pool.update(group_pool)
+            dispersion.update(group_dispersion)
+            if job is not None:
+                job.advance()
+            if group_num in group_dispersion:
+                yield group_num, group_dispersion[group_num]
+
+        graph.store("frequency", inputs, frequency)
+        graph.store("leak", inputs, leak)
+        graph.store("pool", inputs, pool)
+        graph.store("dispersion", inputs, dispersion)
+        graph.last_recomputed = ["frequency", "leak", "pool", "dispersion"]
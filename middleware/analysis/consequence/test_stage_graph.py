@@ -0,0 +1,155 @@
+"""
+Ad-hoc test driver for stage_graph.
+Run: python test_stage_graph.py
+"""
+import os
+import sys
+from dataclasses import replace
+
+import numpy as np
+
+os.environ.setdefault('RISK_FAILURE_RATE_BACKEND', 'csv')
+
+# Ensure local imports work when executed directly
+CURRENT_DIR = os.path.dirname(os.path.abspath(__file__))
+MIDDLEWARE_DIR = os.path.abspath(os.path.join(CURRENT_DIR, '../..'))
+for _path in (CURRENT_DIR, MIDDLEWARE_DIR):
+    if _path not in sys.path:
+        sys.path.insert(0, _path)
+
+from run_study import load_params
+from stage_graph import ConsequencePipeline, stage_inputs_from_params
+
+
+def build_mock_groups():
+    """One gas group and one liquid group, so the pool stages have work to do."""
+    return {
+        1: {
+            'operational_conditions': {'fuel_phase': 'Gas', 'pressure': 10.0, 'temperature': 25.0, 'size': 50.0},
+            'equipments': [{'name': '10. Process Pipe', 'size': '50A', 'ea': 1}],
+        },
+        2: {
+            'operational_conditions': {'fuel_phase': 'Liquid', 'pressure': 10.0, 'temperature': 25.0, 'size': 50.0},
+            'equipments': [{'name': '10. Process Pipe', 'size': '50A', 'ea': 1}],
+        },
+    }
+
+
+def assert_same(a, b, path='outputs'):
+    """Recursive equality of stage outputs (dicts, lists, arrays, floats with NaN)."""
+    if isinstance(a, dict):
+        assert isinstance(b, dict) and set(a) == set(b), path
+        for key in a:
+            assert_same(a[key], b[key], f"{path}[{key!r}]")
+    elif isinstance(a, (list, tuple)):
+        assert len(a) == len(b), path
+        for index, (x, y) in enumerate(zip(a, b)):
+            assert_same(x, y, f"{path}[{index}]")
+    elif isinstance(a, (np.ndarray, float, np.floating)):
+        assert np.array_equal(np.asarray(a), np.asarray(b), equal_nan=True), path
+    else:
+        assert a == b, path
+
+
+def check_invalidation():
+    groups = build_mock_groups()
+    pipeline = ConsequencePipeline()
+    params = load_params(None)
+
+    outputs = pipeline.run_stages(params, groups=groups)
+    print("First run:", pipeline.last_recomputed)
+    assert pipeline.last_recomputed == pipeline.graph.order, pipeline.last_recomputed
+    assert list(outputs['pool']) == [2], outputs['pool'].keys()
+
+    pipeline.run_stages(params, groups=groups)
+    print("Identical rerun:", pipeline.last_recomputed)
+    assert pipeline.last_recomputed == [], pipeline.last_recomputed
+
+    pipeline.run_stages(replace(params, x_m=params.x_m + 25.0), groups=groups)
+    print("x_m edit:", pipeline.last_recomputed)
+    assert pipeline.last_recomputed == ['dispersion'], pipeline.last_recomputed
+
+    pipeline.run_stages(replace(params, x_m=params.x_m + 25.0, wind_speed_m_s=params.wind_speed_m_s + 1.0),
+                        groups=groups)
+    print("Wind edit:", pipeline.last_recomputed)
+    assert pipeline.last_recomputed == ['pool', 'dispersion', 'flammable_explosion', 'pool_fire'], \
+        pipeline.last_recomputed
+
+    pipeline.run_stages(replace(params, x_m=params.x_m + 25.0, wind_speed_m_s=params.wind_speed_m_s + 1.0,
+                                explosion_distance_m=50.0, explosion_mass_kg=20.0), groups=groups)
+    print("Explosion distance and mass edit:", pipeline.last_recomputed)
+    assert pipeline.last_recomputed == ['explosion'], pipeline.last_recomputed
+
+
+def check_cached_matches_uncached():
+    """A pipeline walked through edits must end where a fresh pipeline starts."""
+    groups = build_mock_groups()
+    params = load_params(None)
+    edited = replace(params, x_m=params.x_m + 25.0, wind_speed_m_s=params.wind_speed_m_s + 1.0)
+
+    cached = ConsequencePipeline()
+    cached.run_stages(params, groups=groups)
+    cached.run_stages(replace(params, x_m=edited.x_m), groups=groups)
+    warm = cached.run_stages(edited, groups=groups)
+
+    cold = ConsequencePipeline().run_stages(edited, groups=groups)
+    assert_same(warm, cold)
+    print("Cached and uncached outputs match for stages:", sorted(warm))
+
+
+def check_flammable_limits():
+    """LFL/UFL in kg/m3 use the gas at ambient conditions, not the upstream leak density."""
+    params = load_params(None)
+    stored = stage_inputs_from_params(replace(params, gas_density_kg_m3=45.0))['flammability_params']
+    ambient = stage_inputs_from_params(params)['flammability_params']
+    print("Methane LFL/UFL (kg/m3):", ambient['lfl_kg_m3'], ambient['ufl_kg_m3'])
+    assert stored['lfl_kg_m3'] == ambient['lfl_kg_m3'] and stored['ufl_kg_m3'] == ambient['ufl_kg_m3']
+    # Methane at 15 C and 1 atm: 0.68 kg/m3, so 5-15 vol % is about 0.034-0.10 kg/m3
+    assert np.isclose(ambient['lfl_kg_m3'], 0.05 * 0.6784, rtol=1e-3), ambient
+    assert np.isclose(ambient['ufl_kg_m3'], 0.15 * 0.6784, rtol=1e-3), ambient
+
+
+def check_dense_switch():
+    """Dense-gas dispersion follows the gas at ambient conditions, however dense it is upstream."""
+    groups = build_mock_groups()
+    params = replace(load_params(None), gas_density_kg_m3=45.0)
+    models = {}
+    for label, weight in (('methane', 16.04), ('propane', 44.1)):
+        outputs = ConsequencePipeline().run_stages(
+            replace(params, gas_molecular_weight_kg_kmol=weight), groups=groups, targets=('dispersion',)
+        )
+        models[label] = {cat['dispersion']['model'] for cat in outputs['dispersion'][1]['categories'].values()}
+    print("Gas group dispersion models:", models)
+    assert models == {'methane': {'plume'}, 'propane': {'dense_plume'}}, models
+
+
+def check_streamed_summary():
+    """After iter_groups, a summary with the same hole sizes reuses its stages (api_service "done" event)."""
+    groups = build_mock_groups()
+    params = load_params(None)
+    holes = {'1-3mm': 1.0, '3-10mm': 1.0, '10-50mm': 1.0, '50-150mm': 1.0, '>150mm': 1.0}
+    targets = ('explosion', 'flammable_explosion', 'pool', 'pool_fire')
+
+    pipeline = ConsequencePipeline()
+    streamed = dict(pipeline.iter_groups(params, groups=groups, hole_diametres_mm=holes))
+    summary = pipeline.run_stages(params, groups=groups, hole_diametres_mm=holes, targets=targets)
+    print("Summary after streaming:", pipeline.last_recomputed)
+    assert pipeline.last_recomputed == ['explosion', 'flammable_explosion', 'pool_fire'], pipeline.last_recomputed
+
+    fresh = ConsequencePipeline().run_stages(params, groups=groups, hole_diametres_mm=holes)
+    assert_same(streamed, fresh['dispersion'])
+    for name in targets:
+        assert_same(summary[name], fresh[name], name)
+
+
+def main():
+    check_invalidation()
+    check_cached_matches_uncached()
+    check_flammable_limits()
+    check_dense_switch()
+    check_streamed_summary()
+    print("OK")
+
+
+if __name__ == "__main__":
+    main()
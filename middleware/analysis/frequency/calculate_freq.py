@@ -9,7 +9,13 @@ from dataclasses import dataclass
 from typing import Dict, Any, Optional, List
 from collections import defaultdict
 
-from frequency_database import get_equipment_failure_rates
+from frequency_database import get_backend, get_equipment_failure_rates, get_failure_rates_for_pairs
+from frequency_database_async import (
+    DEFAULT_MAX_CONCURRENCY,
+    equipment_pairs,
+    fetch_failure_rates,
+    prefetch_failure_rates,
+)
 
 # Leak adapter import (used only when enriching with leak profiles)
 _LEAK_ADAPTER_PATH = os.path.abspath(
@@ -133,7 +139,19 @@ def load_groups_from_manager(group_manager) -> dict:
         return {}
 
 
-def calculate_group_frequencies(group_data: dict):
+def _prefetched_lookup(prefetched: dict):
+    """Rate lookup over prefetch_failure_rates output; failed pairs re-raise their error."""
+    def lookup(equipment_name, equipment_size):
+        rows = prefetched.get((equipment_name, equipment_size))
+        if rows is None:
+            return get_equipment_failure_rates(equipment_name, equipment_size)
+        if isinstance(rows, Exception):
+            raise rows
+        return rows
+    return lookup
+
+
+def calculate_group_frequencies(group_data: dict, rate_lookup=None):
     """
     Calculate total frequencies for a single group by summing all equipment failure rates
     
@@ -141,6 +159,8 @@ def calculate_group_frequencies(group_data: dict):
         group_data: Dictionary containing:
             - operational_conditions: dict with fuel_phase, pressure, temperature, size
             - equipments: list of equipment dicts with name, size, ea
+        rate_lookup: Optional callable (equipment_name, equipment_size) -> failure rate rows;
+            defaults to get_equipment_failure_rates
     
     Returns:
         Dictionary with aggregated failure rates by category:
@@ -160,11 +180,14 @@ def calculate_group_frequencies(group_data: dict):
         'zero_pressure': 0.0
     })
     
+    if rate_lookup is None:
+        rate_lookup = get_equipment_failure_rates
+
     # Process each equipment in the group
     for equipment in group_data['equipments']:
         try:
             # Get failure rates from database
-            failure_rates = get_equipment_failure_rates(
+            failure_rates = rate_lookup(
                 equipment['name'],
                 equipment['size']
             )
@@ -188,12 +211,21 @@ def calculate_all_group_frequencies(
     cache_file_path: str = None,
     group_manager=None,
     groups: Optional[Dict[int, Dict[str, Any]]] = None,
+    job=None,
+    max_concurrency: int = DEFAULT_MAX_CONCURRENCY,
+    size_interpolation: Optional[str] = None,
 ):
     """
     Calculate frequencies for all groups in the cache
     
     Args:
         cache_file_path: Optional path to cache file
+        job: Optional job_control.Job for progress reporting and cancellation
+        max_concurrency: Failure-rate queries issued concurrently before aggregating
+            (1 queries sequentially, equipment by equipment). Backends with batched
+            lookups resolve the whole study in one query instead.
+        size_interpolation: None to look up equipment sizes as exact table rows, or
+            'bin' / 'log' to accept any diameter (see size_interpolation.py)
     
     Returns:
         Dictionary with group numbers as keys:
@@ -219,19 +251,68 @@ def calculate_all_group_frequencies(
     if not groups:
         groups = load_groups_from_cache(cache_file_path)
     
+    # Resolve every distinct (name, size) pair up front: one batched query or
+    # gather where the backend supports it, otherwise concurrent queries
+    rate_lookup = None
+    group_lookups = {}
+    if groups and size_interpolation:
+        from size_interpolation import interpolated_lookups
+        group_lookups = interpolated_lookups(groups, size_interpolation)
+    elif groups and get_backend().batched:
+        rate_lookup = _prefetched_lookup(get_failure_rates_for_pairs(equipment_pairs(groups)))
+    elif max_concurrency > 1 and groups:
+        rate_lookup = _prefetched_lookup(
+            prefetch_failure_rates(equipment_pairs(groups), max_concurrency)
+        )
+
     # Calculate frequencies for each group
     results = {}
+    if job is not None:
+        job.start(len(groups), "Frequency")
     for group_num, group_data in groups.items():
-        frequencies = calculate_group_frequencies(group_data)
+        if job is not None:
+            job.checkpoint(results)
+        frequencies = calculate_group_frequencies(group_data, group_lookups.get(group_num, rate_lookup))
         results[group_num] = {
             'operational_conditions': group_data['operational_conditions'],
             'equipments': group_data['equipments'],
             'frequencies': frequencies
         }
+        if job is not None:
+            job.advance()
     
     return results
 
 
+async def calculate_all_group_frequencies_async(
+    cache_file_path: str = None,
+    group_manager=None,
+    groups: Optional[Dict[int, Dict[str, Any]]] = None,
+    max_concurrency: int = DEFAULT_MAX_CONCURRENCY,
+):
+    """
+    Async variant of calculate_all_group_frequencies for callers already in an event loop
+
+    All distinct table queries are awaited concurrently (at most max_concurrency at a
+    time), then aggregated with calculate_group_frequencies.
+    """
+    if groups is None:
+        groups = load_groups_from_manager(group_manager)
+    if not groups:
+        groups = load_groups_from_cache(cache_file_path)
+
+    prefetched = await fetch_failure_rates(equipment_pairs(groups), max_concurrency)
+    rate_lookup = _prefetched_lookup(prefetched)
+    return {
+        group_num: {
+            'operational_conditions': group_data['operational_conditions'],
+            'equipments': group_data['equipments'],
+            'frequencies': calculate_group_frequencies(group_data, rate_lookup),
+        }
+        for group_num, group_data in groups.items()
+    }
+
+
 def calculate_all_group_frequencies_with_leaks(
     cache_file_path: str = None,
     density_overrides: dict | None = None,
@@ -0,0 +1,227 @@
+"""
+FILE: equipment_resolver.py
+DESCRIPTION:
+    Equipment name and size resolver
+    Compiles the equipment alias table once at import and maps the labels used
+    by the app ('8. Tube Side Heat Exchanger', '≥100mm') to the integer ids of
+    the normalised failure-rate schema (database/schema/failure_rates.sql) and
+    to the legacy table name / size formats. Tables, aliases and size ids all
+    come from failure_rate_schema, so they match what normalize_rows loads. Single lookups are memoised; a
+    whole equipment register is checked in one vectorised pass over its
+    distinct values, including whether the backend holds failure rates for
+    each distinct (equipment, size) pair.
+
+CLASSES:
+    - ResolveError (ValueError with close-match suggestions)
+    - RegisterCheck (equipment_ids, size_ids, errors, sizes_mm, missing_pairs for a register)
+
+FUNCTIONS:
+    - equipment_id(name: str) -> int
+    - size_id(size: str) -> int
+    - table_name(name: str) -> str ('8. Tube Side Heat Exchanger' -> '8_Tube_Side_Heat_Exchanger')
+    - db_size(size: str) -> str ('≥100mm' -> '100A')
+    - suggest_equipment(name: str, n=3) -> list
+    - validate_register(names, sizes, size_classes_only=True, rate_table=None) -> RegisterCheck
+"""
+import difflib
+import os
+import re
+import sys
+from dataclasses import dataclass, field
+from functools import lru_cache
+from typing import Dict, List, Sequence, Tuple
+
+import numpy as np
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '../../../database'))
+from failure_rate_schema import (
+    EQUIPMENT_TABLES,
+    SIZE_LABELS,
+    UI_EQUIPMENT_NAMES,
+    alias_key,
+    equipment_aliases,
+    equipment_dimension,
+    size_dimension,
+)
+
+# Size classes of the reference data; ids are the size_class ids normalize_rows assigns.
+_SIZE_CLASSES = size_dimension(SIZE_LABELS)
+SIZE_CLASSES_MM = tuple(mm for _, _, mm in _SIZE_CLASSES)
+
+_SIZE_RE = re.compile(r'^(?:≥|>=)?\s*(\d+(?:\.\d+)?)\s*(?:mm|a)?$', re.IGNORECASE)
+
+
+def _key(name: str) -> str:
+    return alias_key(str(name).replace('_', ' '))
+
+
+def _compile_aliases() -> Dict[str, int]:
+    aliases = {}
+    for table in EQUIPMENT_TABLES.values():
+        type_id, _, display_name = equipment_dimension(table)
+        for name in equipment_aliases(type_id, table, display_name):
+            aliases[sys.intern(_key(name))] = type_id
+    return aliases
+
+
+_ALIASES = _compile_aliases()
+_ALIAS_KEYS = list(_ALIASES)
+_SIZE_IDS = {mm: size_id for size_id, _, mm in _SIZE_CLASSES}
+
+
+class ResolveError(ValueError):
+    """Unknown equipment name or size; suggestions holds close matches."""
+
+    def __init__(self, message: str, suggestions: Sequence[str] = ()):
+        self.suggestions = list(suggestions)
+        if self.suggestions:
+            message = f"{message} (did you mean: {', '.join(self.suggestions)}?)"
+        super().__init__(message)
+
+
+def suggest_equipment(name: str, n: int = 3) -> List[str]:
+    """UI labels of the equipment whose aliases most resemble name."""
+    matches = difflib.get_close_matches(_key(name), _ALIAS_KEYS, n=n * 3, cutoff=0.6)
+    labels = dict.fromkeys(UI_EQUIPMENT_NAMES[_ALIASES[m]] for m in matches)
+    return list(labels)[:n]
+
+
+@lru_cache(maxsize=1024)
+def equipment_id(name: str) -> int:
+    """Equipment type id for a UI label, table name or other alias."""
+    type_id = _ALIASES.get(_key(name))
+    if type_id is None:
+        raise ResolveError(f"Unknown equipment '{name}'", suggest_equipment(name))
+    return type_id
+
+
+@lru_cache(maxsize=256)
+def size_mm(size: str) -> float:
+    """'≥100mm', '100mm', '100' or '100A' -> 100.0"""
+    match = _SIZE_RE.match(str(size).strip())
+    if not match or not float(match.group(1)) > 0:
+        raise ResolveError(f"Unrecognised equipment size '{size}'")
+    return float(match.group(1))
+
+
+@lru_cache(maxsize=256)
+def size_id(size: str) -> int:
+    """Size class id for an equipment size in any accepted format."""
+    mm = size_mm(size)
+    sid = _SIZE_IDS.get(mm)
+    if sid is None:
+        nearest = min(SIZE_CLASSES_MM, key=lambda s: abs(s - mm))
+        raise ResolveError(f"No size class for '{size}'", [f'{nearest:g}mm'])
+    return sid
+
+
+@lru_cache(maxsize=1024)
+def table_name(name: str) -> str:
+    """Database table name for an equipment name"""
+    return EQUIPMENT_TABLES[equipment_id(name)]
+
+
+@lru_cache(maxsize=256)
+def db_size(size: str) -> str:
+    """Database size label for an equipment size: '≥100mm' -> '100A'"""
+    return sys.intern(f'{size_mm(size):g}A')
+
+
+@dataclass
+class RegisterCheck:
+    equipment_ids: np.ndarray                      # 0 where the name did not resolve
+    size_ids: np.ndarray                           # 0 where the size is not a size class
+    errors: List[Tuple[int, str]] = field(default_factory=list)   # (row index, message)
+    sizes_mm: np.ndarray = None                    # diameter per row, 0 where unreadable
+    missing_pairs: List[Tuple[int, float]] = field(default_factory=list)  # (equipment id, mm) without rates
+
+    @property
+    def ok(self) -> bool:
+        return not self.errors
+
+
+def _resolve_unique(values, resolve, dtype=int) -> Tuple[np.ndarray, Dict[int, str]]:
+    """Resolve each distinct value once; ids per row plus {row: message} for failures."""
+    uniques, inverse = np.unique(np.asarray(values, dtype=str), return_inverse=True)
+    ids = np.zeros(len(uniques), dtype=dtype)
+    messages = {}
+    for i, value in enumerate(uniques):
+        try:
+            ids[i] = resolve(str(value))
+        except ResolveError as e:
+            messages[i] = str(e)
+    row_ids = ids[inverse.reshape(-1)]
+    failed = {int(row): messages[int(inverse.reshape(-1)[row])] for row in np.flatnonzero(row_ids == 0)}
+    return row_ids, failed
+
+
+def _missing_rates(equipment_ids: np.ndarray, sizes_mm: np.ndarray, resolved: np.ndarray,
+                   size_classes_only: bool, rate_table) -> Tuple[List[Tuple[int, float]], Dict[int, str]]:
+    """
+    (equipment id, mm) pairs of resolved rows the rate table cannot serve, plus {row: message}
+
+    Exact lookups need the size class itself in the equipment's table; interpolated
+    lookups need data at or above the diameter, since larger sizes would only repeat
+    the equipment's largest class.
+    """
+    rows = np.flatnonzero(resolved)
+    if not len(rows):
+        return [], {}
+    pairs, inverse = np.unique(
+        np.column_stack((equipment_ids[rows], sizes_mm[rows])), axis=0, return_inverse=True
+    )
+    missing, messages = [], {}
+    for i, (eq, mm) in enumerate(pairs.tolist()):
+        eq = int(eq)
+        available = rate_table.breakpoints(eq)
+        if size_classes_only:
+            covered = bool(np.any(available == mm))
+        else:
+            covered = bool(len(available)) and mm <= available.max()
+        if covered:
+            continue
+        missing.append((eq, mm))
+        sizes = ', '.join(f'{s:g}' for s in available) or 'none'
+        messages[i] = f"No failure-rate data for {UI_EQUIPMENT_NAMES[eq]} at {mm:g}mm (sizes with data: {sizes})"
+    failed = {int(row): messages[int(i)] for row, i in zip(rows, inverse.reshape(-1)) if int(i) in messages}
+    return missing, failed
+
+
+def validate_register(names: Sequence[str], sizes: Sequence[str], size_classes_only: bool = True,
+                      rate_table=None) -> RegisterCheck:
+    """
+    Resolve an equipment register in one pass
+
+    Args:
+        names: Equipment name per row
+        sizes: Equipment size per row
+        size_classes_only: Reject sizes that are not a reference size class; with False
+            any readable diameter ('30mm') passes, for size_interpolation lookups
+        rate_table: size_interpolation.SizeRateTable the (equipment, size) pairs are checked
+            against (default: get_size_rate_table(), the configured backend). A pair the
+            equipment's table does not hold is a row error, not a zero frequency.
+
+    Returns:
+        RegisterCheck with the id arrays and every row error, sorted by row
+    """
+    if len(names) != len(sizes):
+        raise ValueError(f'{len(names)} names but {len(sizes)} sizes')
+    if not len(names):
+        return RegisterCheck(np.zeros(0, dtype=int), np.zeros(0, dtype=int), sizes_mm=np.zeros(0))
+    equipment_ids, name_errors = _resolve_unique(names, equipment_id)
+    sizes_mm, size_errors = _resolve_unique(sizes, size_mm, dtype=float)
+    if size_classes_only:
+        size_ids, size_errors = _resolve_unique(sizes, size_id)
+    else:
+        size_ids = np.array([_SIZE_IDS.get(mm, 0) for mm in sizes_mm.tolist()], dtype=int)
+    if rate_table is None:
+        from size_interpolation import get_size_rate_table   # imports this module
+        rate_table = get_size_rate_table()
+    resolved = (equipment_ids > 0) & ((size_ids > 0) if size_classes_only else (sizes_mm > 0))
+    missing_pairs, data_errors = _missing_rates(equipment_ids, sizes_mm, resolved, size_classes_only, rate_table)
+    errors = sorted(
+        [(row, message) for row, message in name_errors.items()]
+        + [(row, message) for row, message in size_errors.items()]
+        + [(row, message) for row, message in data_errors.items()]
+    )
+    return RegisterCheck(equipment_ids, size_ids, errors, sizes_mm, missing_pairs)
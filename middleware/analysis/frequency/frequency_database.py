@@ -8,60 +8,29 @@ FUNCTIONS:
     - convert_equipment_name_to_table(equipment_name: str) -> str (Converts the app's equipment name to the matching database table name)
     - convert_equipment_size_to_db_format(equipment_size: str) -> str (Converts the app's equipment size format to the database's format mm -> A)
     - get_equipment_failure_rates(equipment_name: str, equipment_size: str) -> list
+    - clear_failure_rate_cache() -> None (Drops cached failure rates so the next lookup hits the database)
+    - get_failure_rates_for_pairs(pairs) -> dict (Resolves a whole study, batched where the backend supports it)
     - get_group_failure_rates(group_data: dict) -> dict
     - calculate_adjusted_failure_rates(failure_rates_data: dict) -> dict
 """
 import sys
 import os
+import threading
 
 # Add database module to path
 sys.path.append(os.path.join(os.path.dirname(__file__), '../../../database'))
-from supabase_connect import supabase
+# Configured failure rate source (see database/failure_rate_backends.py)
+from failure_rate_backends import get_backend
+# Precompiled name / size aliases (memoised)
+import equipment_resolver
 
 def convert_equipment_name_to_table(equipment_name: str) -> str:
     """
     Convert equipment name to database table name format
     Example: '8. Tube Side Heat Exchanger' -> '8_Tube_Side_Heat_Exchanger'
-    Note: Database tables use underscores with each word capitalized
+    Raises ResolveError (a ValueError listing close matches) for unknown names
     """
-    # Remove number prefix and clean the name
-    parts = equipment_name.split('.', 1)
-    if len(parts) > 1:
-        number = parts[0].strip()
-        name = parts[1].strip()
-    else:
-        number = ""
-        name = equipment_name.strip()
-    
-    # Handle special cases and replacements for exact database table names
-    name_mapping = {
-        "Tube Side Heat Exchanger": "Tube_Side_Heat_Exchanger",
-        "Shell Side Heat Exchanger": "Shell_Side_Heat_Exchanger",
-        "Fin Fan Heat Exchanger": "Fin_Fan_Heat_Exchanger",
-        "Plate Heat Exchanger": "Plate_Heat_Exchanger",
-        "Centrifugal Compressor": "Centrifugal_Compressors",
-        "Reciprocating Compressor": "Reciprocating_Compressors",
-        "Centrifugal Pump": "Centrifugal_Pump",
-        "Reciprocating Pump": "Reciprocating_Pump",
-        "Process Pipe": "Process_Pipe",
-        "Process Vessel": "Process_Vessel",
-        "Atmospheric Storage Vessel": "Atmospheric_Storage_Vessel",
-        "Small Bore Fitting": "Small_Bore_Fittings",
-        "Actuated Valve": "Actuated_Valves",
-        "Manual Valve": "Manual_Valves",
-        "Pig Trap": "Pig_Trap",
-        "Flange": "Flange",
-        "Filter": "Filters"
-    }
-    
-    # Apply mapping (convert spaces to underscores, capitalize each word)
-    table_name = name_mapping.get(name, name.replace(" ", "_"))
-    
-    # Add number prefix if present
-    if number:
-        table_name = f"{number}_{table_name}"
-    
-    return table_name
+    return equipment_resolver.table_name(equipment_name)
 
 
 def convert_equipment_size_to_db_format(equipment_size: str) -> str:
@@ -69,20 +38,30 @@ def convert_equipment_size_to_db_format(equipment_size: str) -> str:
     Convert equipment size from UI format to database format
     Example: '≥100mm' -> '100A'
     """
-    # Remove '≥' and 'mm' from the size string
-    size = equipment_size.replace('≥', '').replace('mm', '').strip()
-    
-    # Add 'A' suffix for database format
-    return f"{size}A"
+    return equipment_resolver.db_size(equipment_size)
+
+
+# Process-wide cache of failure rate rows keyed by (backend, table name, db size).
+# Reference data changes rarely, so long-lived processes (the UI, the API
+# service) keep it warm; call clear_failure_rate_cache() after a data update.
+_FAILURE_RATE_CACHE = {}
+_FAILURE_RATE_CACHE_LOCK = threading.Lock()
+
+
+def clear_failure_rate_cache():
+    """Drop all cached failure rate rows."""
+    with _FAILURE_RATE_CACHE_LOCK:
+        _FAILURE_RATE_CACHE.clear()
 
 
-def get_equipment_failure_rates(equipment_name: str, equipment_size: str):
+def get_equipment_failure_rates(equipment_name: str, equipment_size: str, use_cache: bool = True):
     """
     Retrieve failure rate data for a specific equipment and size from the database
     
     Args:
         equipment_name: Name of the equipment (e.g., '8. Tube Side Heat Exchanger')
         equipment_size: Size of the equipment (e.g., '≥100mm')
+        use_cache: Serve repeated lookups from the process-wide cache
     
     Returns:
         List of dictionaries containing failure rate data with keys:
@@ -109,18 +88,70 @@ def get_equipment_failure_rates(equipment_name: str, equipment_size: str):
           # .eq()
           # .execute()
 
+        backend = get_backend()
+        cache_key = (backend.name, table_name, db_size)
+        if use_cache:
+            with _FAILURE_RATE_CACHE_LOCK:
+                cached = _FAILURE_RATE_CACHE.get(cache_key)
+            if cached is not None:
+                return [dict(row) for row in cached]
+
         # Query the database
-        response = supabase.table(table_name).select(
-            "category, total, full_pressure, zero_pressure"
-        ).eq("equipment_size", db_size).execute()
+        rows = backend.get_failure_rates(table_name, db_size)
         
-        return response.data
+        with _FAILURE_RATE_CACHE_LOCK:
+            _FAILURE_RATE_CACHE[cache_key] = [dict(row) for row in rows]
+        return rows
     
     except Exception as e:
         print(f"Error retrieving failure rates for {equipment_name} (size: {equipment_size}): {str(e)}")
         raise
 
 
+def get_failure_rates_for_pairs(pairs, use_cache: bool = True):
+    """
+    Resolve many (equipment name, equipment size) pairs at once
+
+    Backends with batched lookups (csv, sqlite) answer all uncached pairs with one
+    gather or query; others fall back to one lookup per pair.
+
+    Returns:
+        {(equipment_name, equipment_size): rows}, where pairs without data map to a
+        KeyError, and unrecognised names or sizes to a ResolveError, instead of rows
+    """
+    backend = get_backend()
+    results = {}
+    missing = {}
+    for equipment_name, equipment_size in dict.fromkeys(pairs):
+        try:
+            key = (backend.name,
+                   convert_equipment_name_to_table(equipment_name),
+                   convert_equipment_size_to_db_format(equipment_size))
+        except equipment_resolver.ResolveError as e:
+            results[(equipment_name, equipment_size)] = e
+            continue
+        cached = None
+        if use_cache:
+            with _FAILURE_RATE_CACHE_LOCK:
+                cached = _FAILURE_RATE_CACHE.get(key)
+        if cached is not None:
+            results[(equipment_name, equipment_size)] = [dict(row) for row in cached]
+        else:
+            missing[(equipment_name, equipment_size)] = key[1:]
+
+    if missing:
+        fetched = backend.get_many(missing.values())
+        for pair, db_key in missing.items():
+            rows = fetched.get(db_key) or []
+            if not rows:
+                results[pair] = KeyError(f"No failure rates for {pair[0]} (size: {pair[1]})")
+                continue
+            with _FAILURE_RATE_CACHE_LOCK:
+                _FAILURE_RATE_CACHE[(backend.name,) + db_key] = [dict(row) for row in rows]
+            results[pair] = rows
+    return results
+
+
 # NOTE: The main function to be used by other modules
 def get_group_failure_rates(group_data: dict):
     """
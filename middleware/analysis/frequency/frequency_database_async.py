@@ -0,0 +1,81 @@
+"""
+FILE: frequency_database_async.py
+DESCRIPTION:
+    Asyncio variant of the frequency data layer.
+    Issues the failure-rate queries for all distinct (equipment name, size)
+    pairs of a study concurrently, limited by a semaphore, so a remote-backed
+    study load takes about as long as its slowest query instead of the sum of
+    all of them. Each query runs the blocking get_equipment_failure_rates in a
+    thread, so results land in the same process-wide cache.
+
+FUNCTIONS:
+    - get_equipment_failure_rates_async(equipment_name, equipment_size, semaphore=None) -> list
+    - fetch_failure_rates(pairs, max_concurrency=8) -> dict (async; {(name, size): rows or Exception})
+    - prefetch_failure_rates(pairs, max_concurrency=8) -> dict (sync wrapper around fetch_failure_rates)
+    - equipment_pairs(groups: dict) -> list (distinct (name, size) pairs used by the groups)
+"""
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from frequency_database import get_equipment_failure_rates
+
+DEFAULT_MAX_CONCURRENCY = 8
+
+Pair = Tuple[str, str]
+
+
+async def get_equipment_failure_rates_async(
+    equipment_name: str,
+    equipment_size: str,
+    semaphore: Optional[asyncio.Semaphore] = None,
+):
+    """Awaitable get_equipment_failure_rates; the query runs on a worker thread."""
+    if semaphore is None:
+        return await asyncio.to_thread(get_equipment_failure_rates, equipment_name, equipment_size)
+    async with semaphore:
+        return await asyncio.to_thread(get_equipment_failure_rates, equipment_name, equipment_size)
+
+
+async def fetch_failure_rates(
+    pairs: Iterable[Pair],
+    max_concurrency: int = DEFAULT_MAX_CONCURRENCY,
+) -> Dict[Pair, object]:
+    """
+    Query every distinct (name, size) pair concurrently
+
+    Returns:
+        {(equipment_name, equipment_size): rows} where rows is the list returned by
+        get_equipment_failure_rates, or the Exception raised for that pair
+    """
+    unique = list(dict.fromkeys(pairs))
+    semaphore = asyncio.Semaphore(max(1, max_concurrency))
+    results = await asyncio.gather(
+        *(get_equipment_failure_rates_async(name, size, semaphore) for name, size in unique),
+        return_exceptions=True,
+    )
+    return dict(zip(unique, results))
+
+
+def prefetch_failure_rates(
+    pairs: Iterable[Pair],
+    max_concurrency: int = DEFAULT_MAX_CONCURRENCY,
+) -> Dict[Pair, object]:
+    """Blocking wrapper around fetch_failure_rates, usable from any thread."""
+    pairs = list(pairs)
+    try:
+        asyncio.get_running_loop()
+    except RuntimeError:
+        return asyncio.run(fetch_failure_rates(pairs, max_concurrency))
+    # Called from inside an event loop: run on a separate thread's loop.
+    with ThreadPoolExecutor(max_workers=1) as pool:
+        return pool.submit(asyncio.run, fetch_failure_rates(pairs, max_concurrency)).result()
+
+
+def equipment_pairs(groups: Dict[int, dict]) -> List[Pair]:
+    """Distinct (name, size) pairs across all groups, in first-seen order."""
+    pairs = {}
+    for group_data in groups.values():
+        for equipment in group_data.get('equipments', []):
+            pairs[(equipment['name'], equipment['size'])] = None
+    return list(pairs)
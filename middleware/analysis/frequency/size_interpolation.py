@@ -0,0 +1,205 @@
+"""
+FILE: size_interpolation.py
+DESCRIPTION:
+    Failure rates for arbitrary equipment diameters
+    The reference tables only hold discrete size classes (12.5A, 25A, ... 500A)
+    and not every equipment type has every class. SizeRateTable loads all of
+    them once into a dense array and precomputes each equipment type's size
+    breakpoints, so a whole register of continuous diameters resolves in one
+    np.searchsorted call over all equipment types (breakpoints are offset per
+    type and concatenated into one sorted array).
+
+    Methods:
+        'bin'  use the largest size class at or below the diameter (the
+               smallest class for diameters below the table)
+        'log'  interpolate log(rate) linearly in diameter between the two
+               neighbouring classes; rows with a zero rate at either end
+               are interpolated linearly. Diameters outside the table take
+               the nearest class.
+
+CLASSES:
+    - SizeRateTable
+
+FUNCTIONS:
+    - get_size_rate_table() -> SizeRateTable (built from the configured backend, cached)
+    - interpolated_lookups(groups, method='log', table=None) -> per-group callables for calculate_group_frequencies
+"""
+import threading
+from typing import Dict, List, Optional, Sequence
+
+import numpy as np
+
+import equipment_resolver
+from equipment_resolver import EQUIPMENT_TABLES, SIZE_CLASSES_MM
+from failure_rate_schema import CATEGORIES, RATE_FIELDS
+from frequency_database import get_failure_rates_for_pairs
+
+METHODS = ('bin', 'log')
+CATEGORY_LABELS = [label for label, _, _ in CATEGORIES]
+
+
+class SizeRateTable:
+    """Dense rates[equipment_id, size_index, category, field] with per-type breakpoints."""
+
+    def __init__(self, rates: np.ndarray, sizes_mm: Sequence[float] = SIZE_CLASSES_MM):
+        self.rates = np.asarray(rates, dtype=float)
+        self.sizes_mm = np.asarray(sizes_mm, dtype=float)
+        n_equipment, n_sizes = self.rates.shape[:2]
+
+        # Breakpoints: sizes with data for each equipment type, concatenated in
+        # equipment order with an offset so one searchsorted serves every type.
+        present = ~np.isnan(self.rates[..., 0]).all(axis=2)
+        self._span = float(self.sizes_mm.max()) * 4.0 + 1.0
+        eq_idx, size_idx = np.nonzero(present)
+        self._bp_size_index = size_idx
+        self._bp_mm = self.sizes_mm[size_idx]
+        self._bp_keys = eq_idx * self._span + self._bp_mm
+        counts = np.bincount(eq_idx, minlength=n_equipment)
+        self._first = np.concatenate(([0], np.cumsum(counts)[:-1]))
+        self._count = counts
+
+    @classmethod
+    def from_pairs(cls, resolve) -> 'SizeRateTable':
+        """Build from resolve(pairs) -> {(table, size): rows or Exception}, e.g. get_failure_rates_for_pairs."""
+        pairs = [(table, f'{mm:g}A') for table in EQUIPMENT_TABLES.values() for mm in SIZE_CLASSES_MM]
+        fetched = resolve(pairs)
+        rates = np.full(
+            (max(EQUIPMENT_TABLES) + 1, len(SIZE_CLASSES_MM), len(CATEGORY_LABELS), len(RATE_FIELDS)),
+            np.nan,
+        )
+        category_index = {label: i for i, label in enumerate(CATEGORY_LABELS)}
+        size_index = {f'{mm:g}A': i for i, mm in enumerate(SIZE_CLASSES_MM)}
+        for (table, size), rows in fetched.items():
+            if isinstance(rows, Exception) or not rows:
+                continue
+            eq = equipment_resolver.equipment_id(table)
+            for row in rows:
+                c = category_index.get(row['category'])
+                if c is not None:
+                    rates[eq, size_index[size], c] = [float(row[f] or 0.0) for f in RATE_FIELDS]
+        return cls(rates)
+
+    def breakpoints(self, equipment_id: int) -> np.ndarray:
+        """Size classes (mm) with data for one equipment type."""
+        first, count = self._first[equipment_id], self._count[equipment_id]
+        return self._bp_mm[first:first + count]
+
+    def lookup(self, equipment_ids, diameters_mm, method: str = 'log') -> np.ndarray:
+        """
+        Rates for many (equipment type, diameter) rows at once
+
+        Returns:
+            Array of shape (n, categories, fields); NaN for equipment types without data
+            and for categories a size class does not list
+        """
+        if method not in METHODS:
+            raise ValueError(f"Unknown interpolation method '{method}' (expected one of {METHODS})")
+        eq = np.asarray(equipment_ids, dtype=int)
+        d = np.asarray(diameters_mm, dtype=float)
+        eq, d = np.broadcast_arrays(eq, d)
+        eq, d = eq.ravel(), d.ravel()
+        out = np.full((len(eq), len(CATEGORY_LABELS), len(RATE_FIELDS)), np.nan)
+        known = (eq > 0) & (eq < len(self._count))
+        known[known] = self._count[eq[known]] > 0
+        if not known.any():
+            return out
+        eq_k, d_k = eq[known], d[known]
+        first = self._first[eq_k]
+        last = first + self._count[eq_k] - 1
+
+        # Largest breakpoint at or below d, clamped into this type's breakpoints.
+        lo = np.searchsorted(self._bp_keys, eq_k * self._span + d_k, side='right') - 1
+        lo = np.clip(lo, first, last)
+        lo_rates = self.rates[eq_k, self._bp_size_index[lo]]
+        if method == 'bin':
+            out[known] = lo_rates
+            return out
+
+        hi = np.minimum(lo + 1, last)
+        hi_rates = self.rates[eq_k, self._bp_size_index[hi]]
+        width = self._bp_mm[hi] - self._bp_mm[lo]
+        t = np.divide(d_k - self._bp_mm[lo], width, out=np.zeros_like(d_k), where=width > 0)
+        t = np.clip(t, 0.0, 1.0)[:, None, None]
+        with np.errstate(divide='ignore', invalid='ignore'):
+            log_mix = np.exp((1 - t) * np.log(lo_rates) + t * np.log(hi_rates))
+        linear_mix = (1 - t) * lo_rates + t * hi_rates
+        mixed = np.where((lo_rates > 0) & (hi_rates > 0), log_mix, linear_mix)
+        # Diameters on a size class return that table row exactly.
+        out[known] = np.where(t == 0, lo_rates, np.where(t == 1, hi_rates, mixed))
+        return out
+
+    def lookup_register(self, names: Sequence[str], diameters_mm, method: str = 'log') -> np.ndarray:
+        """lookup() for equipment names; unresolvable names raise ResolveError."""
+        uniques, inverse = np.unique(np.asarray(names, dtype=str), return_inverse=True)
+        ids = np.array([equipment_resolver.equipment_id(str(name)) for name in uniques], dtype=int)
+        return self.lookup(ids[inverse.reshape(-1)], diameters_mm, method)
+
+    @staticmethod
+    def as_rows(block: np.ndarray) -> List[dict]:
+        """One row of lookup() output in the get_equipment_failure_rates format."""
+        return [
+            {'category': CATEGORY_LABELS[c], **dict(zip(RATE_FIELDS, map(float, block[c])))}
+            for c in range(block.shape[0])
+            if not np.isnan(block[c, 0])
+        ]
+
+
+_TABLE = None
+_TABLE_LOCK = threading.Lock()
+
+
+def get_size_rate_table(reload: bool = False) -> SizeRateTable:
+    """SizeRateTable for the configured backend, built on first use."""
+    global _TABLE
+    with _TABLE_LOCK:
+        if _TABLE is None or reload:
+            _TABLE = SizeRateTable.from_pairs(get_failure_rates_for_pairs)
+        return _TABLE
+
+
+def interpolated_lookups(groups: Dict[int, dict], method: str = 'log', table: Optional[SizeRateTable] = None):
+    """
+    Per-group rate lookups for calculate_group_frequencies that accept any diameter
+
+    Every equipment row of every group is resolved in one lookup() call. Equipment
+    sizes are read as diameters ('30mm', '≥100mm', '100A' or a number); an empty
+    size falls back to the group's operational size, so rates are keyed by
+    (name, resolved diameter) and each group gets its own lookup.
+
+    Returns:
+        {group_key: callable (equipment_name, equipment_size) -> failure rate rows}
+    """
+    table = table or get_size_rate_table()
+    resolved = {}      # (group_key, name, size) -> (name, diameter_mm) or Exception
+    valid = {}         # (name, diameter_mm) -> (equipment_id, diameter_mm)
+    for group_key, group_data in groups.items():
+        group_size = group_data.get('operational_conditions', {}).get('size')
+        for equipment in group_data.get('equipments', []):
+            name, size = equipment['name'], equipment['size']
+            if (group_key, name, size) in resolved:
+                continue
+            try:
+                diameter = float(group_size if size in (None, '') else equipment_resolver.size_mm(str(size)))
+                key = (name, diameter)
+                if key not in valid:
+                    valid[key] = (equipment_resolver.equipment_id(name), diameter)
+                resolved[(group_key, name, size)] = key
+            except (equipment_resolver.ResolveError, TypeError, ValueError) as e:
+                resolved[(group_key, name, size)] = e
+    blocks = {}
+    if valid:
+        ids, diameters = zip(*valid.values())
+        rates = table.lookup(ids, diameters, method)
+        blocks = {key: table.as_rows(rates[i]) for i, key in enumerate(valid)}
+
+    def group_lookup(group_key):
+        def lookup(equipment_name, equipment_size):
+            key = resolved.get((group_key, equipment_name, equipment_size))
+            if isinstance(key, Exception):
+                raise key
+            rows = blocks.get(key)
+            if not rows:
+                raise KeyError(f"No failure rates for {equipment_name} (size: {equipment_size})")
+            return rows
+        return lookup
+    return {group_key: group_lookup(group_key) for group_key in groups}
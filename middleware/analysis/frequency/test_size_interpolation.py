@@ -0,0 +1,89 @@
+"""
+Ad-hoc test driver for size_interpolation.
+Run: python test_size_interpolation.py
+"""
+import os
+import sys
+
+import numpy as np
+
+# Ensure local imports work when executed directly
+CURRENT_DIR = os.path.dirname(os.path.abspath(__file__))
+if CURRENT_DIR not in sys.path:
+    sys.path.insert(0, CURRENT_DIR)
+
+from calculate_freq import calculate_group_frequencies
+from equipment_resolver import EQUIPMENT_TABLES, SIZE_CLASSES_MM, validate_register
+from failure_rate_schema import RATE_FIELDS
+from size_interpolation import CATEGORY_LABELS, SizeRateTable, interpolated_lookups
+
+
+def build_mock_table():
+    """Every equipment type at every size class; rate = diameter * 1e-6 so sizes are told apart."""
+    rates = np.empty((max(EQUIPMENT_TABLES) + 1, len(SIZE_CLASSES_MM), len(CATEGORY_LABELS), len(RATE_FIELDS)))
+    rates[:] = np.asarray(SIZE_CLASSES_MM)[None, :, None, None] * 1e-6
+    rates[0] = np.nan
+    return SizeRateTable(rates)
+
+
+def build_mock_groups():
+    """Two groups with the same equipment and an empty size: only the operational size differs."""
+    equipment = {'name': '10. Process Pipe', 'size': '', 'ea': 1}
+    return {
+        1: {'operational_conditions': {'size': 12.5}, 'equipments': [dict(equipment)]},
+        2: {'operational_conditions': {'size': 500.0}, 'equipments': [dict(equipment)]},
+    }
+
+
+def check_group_size_fallback():
+    groups = build_mock_groups()
+    lookups = interpolated_lookups(groups, 'log', table=build_mock_table())
+    totals = {
+        group: calculate_group_frequencies(data, lookups[group])[CATEGORY_LABELS[0]]['total']
+        for group, data in groups.items()
+    }
+    print("Totals per group:", totals)
+    assert np.isclose(totals[1], 12.5e-6), totals
+    assert np.isclose(totals[2], 500e-6), totals
+
+
+def check_interpolation():
+    table = build_mock_table()
+    eq = 10
+    on_class = table.lookup([eq], [100.0], 'log')[0, 0, 0]
+    between = table.lookup([eq], [112.5], 'log')[0, 0, 0]
+    binned = table.lookup([eq], [112.5], 'bin')[0, 0, 0]
+    print("100mm / 112.5mm log / 112.5mm bin:", on_class, between, binned)
+    assert np.isclose(on_class, 100e-6)
+    assert np.isclose(between, np.sqrt(100e-6 * 125e-6))
+    assert np.isclose(binned, 100e-6)
+
+
+def check_register_coverage():
+    """Pairs the table has no rows for are row errors, for exact and interpolated lookups alike."""
+    rates = build_mock_table().rates
+    rates[1, SIZE_CLASSES_MM.index(500.0)] = np.nan      # compressors stop below 500mm
+    table = SizeRateTable(rates)
+    names = ['1. Centrifugal Compressor', '1. Centrifugal Compressor', '10. Process Pipe', 'Centrifugal Compressor']
+    sizes = ['500mm', '100mm', '500mm', '500A']
+
+    exact = validate_register(names, sizes, rate_table=table)
+    print("Exact lookups:", exact.errors)
+    assert [row for row, _ in exact.errors] == [0, 3], exact.errors
+    assert exact.missing_pairs == [(1, 500.0)], exact.missing_pairs
+
+    interpolated = validate_register(names + ['1. Centrifugal Compressor'], sizes + ['300mm'],
+                                     size_classes_only=False, rate_table=table)
+    assert [row for row, _ in interpolated.errors] == [0, 3], interpolated.errors
+    assert interpolated.missing_pairs == [(1, 500.0)], interpolated.missing_pairs
+
+
+def main():
+    check_group_size_fallback()
+    check_interpolation()
+    check_register_coverage()
+    print("OK")
+
+
+if __name__ == "__main__":
+    main()
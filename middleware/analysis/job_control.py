@@ -0,0 +1,121 @@
+"""
+Progress reporting and cooperative cancellation for long computations.
+
+Pipeline functions accept an optional `job` argument and call
+`job.checkpoint(partial)` at chunk boundaries (per group, per grid slice) and
+`job.advance(n)` as work completes. Calculation modules only rely on those two
+methods, so they do not need to import this module.
+
+Usage:
+    token = CancelToken()
+    job = Job(on_progress=lambda p: print(p.done, p.total, p.eta_s), cancel_token=token)
+    try:
+        results = calculate_group_consequence(..., job=job)
+    except JobCancelled as exc:
+        results = exc.partial_result
+"""
+from __future__ import annotations
+
+import threading
+import time
+from dataclasses import dataclass
+from typing import Any, Callable, Optional
+
+
+class JobCancelled(Exception):
+    """Raised at a checkpoint once cancellation was requested."""
+
+    def __init__(self, partial_result: Any = None):
+        super().__init__("Job cancelled")
+        self.partial_result = partial_result
+
+
+class CancelToken:
+    """Thread-safe cancellation flag shared between the caller and the job."""
+
+    def __init__(self):
+        self._event = threading.Event()
+
+    def cancel(self) -> None:
+        self._event.set()
+
+    @property
+    def cancelled(self) -> bool:
+        return self._event.is_set()
+
+
+@dataclass
+class JobProgress:
+    """Snapshot of a job's progress within its current phase."""
+
+    label: str
+    done: int
+    total: int
+    elapsed_s: float
+    eta_s: Optional[float]
+
+    @property
+    def fraction(self) -> float:
+        return (self.done / self.total) if self.total else 0.0
+
+
+class Job:
+    """Progress counter and cancellation checkpoint handed to pipeline functions."""
+
+    def __init__(
+        self,
+        on_progress: Optional[Callable[[JobProgress], None]] = None,
+        cancel_token: Optional[CancelToken] = None,
+        min_interval_s: float = 0.1,
+    ):
+        self.on_progress = on_progress
+        self.cancel_token = cancel_token or CancelToken()
+        self.min_interval_s = min_interval_s
+        self.label = ""
+        self.done = 0
+        self.total = 0
+        self._started = time.monotonic()
+        self._last_report = 0.0
+
+    @property
+    def cancelled(self) -> bool:
+        return self.cancel_token.cancelled
+
+    def cancel(self) -> None:
+        self.cancel_token.cancel()
+
+    def start(self, total: int, label: str = "") -> None:
+        """Begin a new phase of `total` units (e.g. scenarios or grid slices)."""
+        self.label = label
+        self.total = int(total)
+        self.done = 0
+        self._started = time.monotonic()
+        self._report(force=True)
+
+    def advance(self, count: int = 1) -> None:
+        """Mark `count` more units as done."""
+        self.done += count
+        self._report(force=self.done >= self.total)
+
+    def checkpoint(self, partial_result: Any = None) -> None:
+        """Raise JobCancelled (carrying partial_result) if cancellation was requested."""
+        if self.cancel_token.cancelled:
+            raise JobCancelled(partial_result)
+
+    def progress(self) -> JobProgress:
+        elapsed = time.monotonic() - self._started
+        eta = None
+        if 0 < self.done < self.total:
+            eta = elapsed / self.done * (self.total - self.done)
+        elif self.total and self.done >= self.total:
+            eta = 0.0
+        return JobProgress(self.label, self.done, self.total, elapsed, eta)
+
+    def _report(self, force: bool = False) -> None:
+        if self.on_progress is None:
+            return
+        now = time.monotonic()
+        if not force and now - self._last_report < self.min_interval_s:
+            return
+        self._last_report = now
+        self.on_progress(self.progress())
@@ -0,0 +1,466 @@
+"""
+FILE: middleware/api_service.py
+DESCRIPTION:
+    Local HTTP API exposing the frequency, leak and consequence calculations to
+    the web UI (webui/) as JSON endpoints. It is a plain ASGI application, so
+    one long-lived process keeps the failure-rate cache warm and several
+    analysts can share it instead of each starting the Tk application.
+
+    Requests are handled asynchronously; the calculations themselves run on a
+    shared thread pool so slow Supabase queries and heavy grids never block the
+    event loop. Long runs can stream newline-delimited JSON progress events.
+
+USAGE:
+    uvicorn api_service:app --app-dir middleware --port 8000
+    python middleware/api_service.py [--host 127.0.0.1] [--port 8000] [--workers 4]
+
+ENDPOINTS:
+    GET  /api/health        -> {"status": "ok"}
+    GET  /api/groups        -> groups in the default group cache CSV
+    POST /api/frequency     -> frequency stage output per group
+    POST /api/leak          -> leak profiles per group and category
+    POST /api/consequence   -> leak + dispersion per group, explosion, pool fire
+    POST /api/consequence/events
+                            -> Server-Sent Events: "progress", one "group" event
+                               per finished group, then "done" (explosion and
+                               pool fire summaries); "error"/"cancelled" on failure
+
+    POST bodies are JSON objects, all keys optional:
+        {
+            "groups": { "1": {...group data...} },   # default: group cache CSV
+            "params": { "wind_speed_m_s": 5.0, ... },# ConsequenceParams fields
+            "hole_diametres_mm": { "1-3mm": 2.0 },
+            "stream": true                           # NDJSON progress + result
+        }
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import math
+import os
+import sys
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, Optional
+
+_BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+for _path in (
+    os.path.join(_BASE_DIR, "analysis"),
+    os.path.join(_BASE_DIR, "analysis/frequency"),
+    os.path.join(_BASE_DIR, "analysis/consequence"),
+    os.path.join(_BASE_DIR, "data-input/consequence"),
+):
+    if _path not in sys.path:
+        sys.path.insert(0, _path)
+
+from calculate_freq import load_groups_from_cache
+from job_control import Job, JobCancelled
+from run_study import load_params
+from stage_graph import ConsequencePipeline
+
+DEFAULT_WORKERS = int(os.environ.get("RISK_API_WORKERS", "4"))
+MAX_BODY_BYTES = 10 * 1024 * 1024
+
+_STAGE_TARGETS = {
+    "/api/frequency": ("frequency",),
+    "/api/leak": ("leak",),
+    "/api/consequence": ("dispersion", "explosion", "flammable_explosion", "pool", "pool_fire"),
+}
+
+
+class ApiError(Exception):
+    """Error returned to the client as {"error": message} with an HTTP status."""
+
+    def __init__(self, status: int, message: str):
+        super().__init__(message)
+        self.status = status
+        self.message = message
+
+
+def _json_default(value):
+    # numpy scalars/arrays and other non-JSON types coming out of the models
+    if hasattr(value, "tolist"):
+        return value.tolist()
+    if hasattr(value, "item"):
+        return value.item()
+    return str(value)
+
+
+def _sanitize(value):
+    """Replace NaN/inf (invalid JSON) with None, recursively."""
+    if isinstance(value, float):
+        return value if math.isfinite(value) else None
+    if isinstance(value, dict):
+        return {str(k): _sanitize(v) for k, v in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [_sanitize(v) for v in value]
+    return value
+
+
+def _encode(payload: Any) -> bytes:
+    return json.dumps(_sanitize(payload), default=_json_default).encode("utf-8")
+
+
+def _ndjson_frame(event: Dict[str, Any]) -> bytes:
+    return _encode(event) + b"\n"
+
+
+def _sse_frame(event: Dict[str, Any]) -> bytes:
+    payload = {key: value for key, value in event.items() if key != "event"}
+    return b"event: " + event["event"].encode("ascii") + b"\ndata: " + _encode(payload) + b"\n\n"
+
+
+def _number(value: Any, field: str) -> float:
+    if isinstance(value, bool):
+        raise ApiError(400, f"'{field}' must be a number")
+    try:
+        number = float(value)
+    except (TypeError, ValueError):
+        raise ApiError(400, f"'{field}' must be a number")
+    if not math.isfinite(number):
+        raise ApiError(400, f"'{field}' must be a finite number")
+    return number
+
+
+def _parse_group(key: int, raw: Any) -> Dict[str, Any]:
+    """Check one group's shape and numeric fields, naming the offending field."""
+    prefix = f"groups.{key}"
+    if not isinstance(raw, dict):
+        raise ApiError(400, f"'{prefix}' must be an object")
+    conditions = raw.get("operational_conditions", {})
+    if not isinstance(conditions, dict):
+        raise ApiError(400, f"'{prefix}.operational_conditions' must be an object")
+    conditions = dict(conditions)
+    for field in ("pressure", "temperature", "size"):
+        if conditions.get(field) is not None:
+            conditions[field] = _number(conditions[field], f"{prefix}.operational_conditions.{field}")
+    equipments = raw.get("equipments", [])
+    if not isinstance(equipments, list):
+        raise ApiError(400, f"'{prefix}.equipments' must be a list")
+    parsed = []
+    for i, equipment in enumerate(equipments):
+        field = f"{prefix}.equipments.{i}"
+        if not isinstance(equipment, dict) or not isinstance(equipment.get("name"), str):
+            raise ApiError(400, f"'{field}' must be an object with a 'name'")
+        ea = _number(equipment.get("ea", 1), f"{field}.ea")
+        parsed.append(dict(equipment, size="" if equipment.get("size") is None else str(equipment["size"]), ea=ea))
+    return dict(raw, operational_conditions=conditions, equipments=parsed)
+
+
+def _parse_groups(raw: Any) -> Dict[int, Dict[str, Any]]:
+    """Groups arrive with string keys from JSON; the pipeline expects ints."""
+    if not isinstance(raw, dict):
+        raise ApiError(400, "'groups' must be an object keyed by group number")
+    try:
+        keys = [int(key) for key in raw]
+    except (TypeError, ValueError):
+        raise ApiError(400, "'groups' keys must be group numbers")
+    return {key: _parse_group(key, value) for key, value in zip(keys, raw.values())}
+
+
+def _parse_hole_diametres(raw: Any) -> Optional[Dict[str, float]]:
+    if raw is None:
+        return None
+    if not isinstance(raw, dict):
+        raise ApiError(400, "'hole_diametres_mm' must be an object keyed by leak category")
+    return {str(key): _number(value, f"hole_diametres_mm.{key}") for key, value in raw.items()}
+
+
+class RiskApi:
+    """ASGI application; one instance shares its worker pool across requests."""
+
+    def __init__(self, max_workers: int = DEFAULT_WORKERS, group_cache_path: Optional[str] = None):
+        self.max_workers = max_workers
+        self.group_cache_path = group_cache_path
+        self._executor: Optional[ThreadPoolExecutor] = None
+
+    @property
+    def executor(self) -> ThreadPoolExecutor:
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="risk-api")
+        return self._executor
+
+    def shutdown(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] == "lifespan":
+            await self._lifespan(receive, send)
+            return
+        if scope["type"] != "http":
+            return
+
+        try:
+            await self._route(scope, receive, send)
+        except ApiError as exc:
+            await self._send_json(send, exc.status, {"error": exc.message})
+        except Exception as exc:
+            await self._send_json(send, 500, {"error": f"{type(exc).__name__}: {exc}"})
+
+    async def _lifespan(self, receive, send):
+        while True:
+            message = await receive()
+            if message["type"] == "lifespan.startup":
+                await send({"type": "lifespan.startup.complete"})
+            elif message["type"] == "lifespan.shutdown":
+                self.shutdown()
+                await send({"type": "lifespan.shutdown.complete"})
+                return
+
+    # -----------------------------
+    # Routing
+    # -----------------------------
+    async def _route(self, scope, receive, send):
+        method = scope["method"]
+        path = scope["path"].rstrip("/") or "/"
+
+        if path == "/api/health":
+            if method != "GET":
+                raise ApiError(405, "Method not allowed")
+            await self._send_json(send, 200, {"status": "ok", "workers": self.max_workers})
+            return
+
+        if path == "/api/groups":
+            if method != "GET":
+                raise ApiError(405, "Method not allowed")
+            groups = await self._run_in_pool(load_groups_from_cache, self.group_cache_path)
+            await self._send_json(send, 200, {"groups": groups})
+            return
+
+        events = path == "/api/consequence/events"
+        targets = _STAGE_TARGETS.get("/api/consequence" if events else path)
+        if targets is None:
+            raise ApiError(404, f"Not found: {path}")
+        if method != "POST":
+            raise ApiError(405, "Method not allowed")
+
+        body = await self._read_json(receive)
+        request = self._build_request(body)
+
+        if events:
+            await self._stream(send, receive, self._group_producer(request), b"text/event-stream", _sse_frame)
+        elif body.get("stream"):
+            await self._stream(
+                send, receive, self._stage_producer(request, targets), b"application/x-ndjson", _ndjson_frame
+            )
+        else:
+            outputs = await self._run_in_pool(self._run_stages, request, targets, None)
+            await self._send_json(send, 200, self._format_outputs(outputs, targets))
+
+    def _build_request(self, body: Dict[str, Any]) -> Dict[str, Any]:
+        raw_params = body.get("params") or {}
+        if not isinstance(raw_params, dict):
+            raise ApiError(400, "'params' must be an object of ConsequenceParams fields")
+        try:
+            params = load_params(None, raw_params)
+        except (TypeError, ValueError) as exc:
+            raise ApiError(400, str(exc))
+        groups = body.get("groups")
+        return {
+            "params": params,
+            "groups": _parse_groups(groups) if groups is not None else None,
+            "hole_diametres_mm": _parse_hole_diametres(body.get("hole_diametres_mm")),
+        }
+
+    def _run_stages(self, request: Dict[str, Any], targets, job):
+        # A fresh pipeline per request: the stage cache is per analyst session,
+        # the failure-rate cache underneath is shared process-wide.
+        groups = request["groups"]
+        if groups is None:
+            groups = load_groups_from_cache(self.group_cache_path)
+        return ConsequencePipeline().run_stages(
+            request["params"],
+            groups=groups,
+            hole_diametres_mm=request["hole_diametres_mm"],
+            targets=targets,
+            job=job,
+        )
+
+    @staticmethod
+    def _format_outputs(outputs: Dict[str, Any], targets) -> Dict[str, Any]:
+        return {name: outputs.get(name) for name in targets}
+
+    # -----------------------------
+    # Streaming
+    # -----------------------------
+    def _stage_producer(self, request, targets):
+        def produce(emit, job):
+            outputs = self._run_stages(request, targets, job)
+            return {"event": "result", **self._format_outputs(outputs, targets)}
+        return produce
+
+    def _group_producer(self, request):
+        """Emit one "group" event per finished group, then a "done" summary."""
+        def produce(emit, job):
+            pipeline = ConsequencePipeline()
+            groups = request["groups"]
+            if groups is None:
+                groups = load_groups_from_cache(self.group_cache_path)
+            count = 0
+            for group_num, result in pipeline.iter_groups(
+                request["params"],
+                groups=groups,
+                hole_diametres_mm=request["hole_diametres_mm"],
+                job=job,
+            ):
+                emit({"event": "group", "group": group_num, "result": result})
+                count += 1
+            # Same inputs as iter_groups, so frequency, leak and pool come from
+            # the cache it filled and only the explosion and fire stages run.
+            summary = pipeline.run_stages(
+                request["params"],
+                groups=groups,
+                hole_diametres_mm=request["hole_diametres_mm"],
+                targets=("explosion", "flammable_explosion", "pool", "pool_fire"),
+                job=job,
+            )
+            return {
+                "event": "done",
+                "groups": count,
+                "explosion": summary["explosion"],
+                "flammable_explosion": summary["flammable_explosion"],
+                "pool": summary["pool"],
+                "pool_fire": summary["pool_fire"],
+            }
+        return produce
+
+    async def _stream(self, send, receive, produce, content_type: bytes, frame: Callable[[Dict[str, Any]], bytes]):
+        """Run produce(emit, job) on the pool and stream its events as they arrive.
+
+        Progress from the job is streamed as "progress" events; the value
+        produce returns is sent last. A client disconnect cancels the job at
+        its next checkpoint.
+        """
+        loop = asyncio.get_running_loop()
+        events: asyncio.Queue = asyncio.Queue()
+
+        def emit(event):
+            loop.call_soon_threadsafe(events.put_nowait, event)
+
+        def on_progress(progress):
+            emit(
+                {
+                    "event": "progress",
+                    "label": progress.label,
+                    "done": progress.done,
+                    "total": progress.total,
+                    "eta_s": progress.eta_s,
+                }
+            )
+
+        job = Job(on_progress=on_progress)
+        future = loop.run_in_executor(self.executor, produce, emit, job)
+        future.add_done_callback(lambda _: loop.call_soon_threadsafe(events.put_nowait, None))
+        disconnect = asyncio.ensure_future(self._wait_disconnect(receive))
+
+        await send(
+            {
+                "type": "http.response.start",
+                "status": 200,
+                "headers": [
+                    (b"content-type", content_type),
+                    (b"cache-control", b"no-cache"),
+                ],
+            }
+        )
+        try:
+            while True:
+                event = await events.get()
+                if event is None:
+                    break
+                if disconnect.done():
+                    job.cancel()
+                    continue
+                await send({"type": "http.response.body", "body": frame(event), "more_body": True})
+
+            try:
+                final = future.result()
+            except JobCancelled:
+                final = {"event": "cancelled"}
+            except Exception as exc:
+                final = {"event": "error", "error": f"{type(exc).__name__}: {exc}"}
+            if not disconnect.done():
+                await send({"type": "http.response.body", "body": frame(final), "more_body": False})
+        finally:
+            disconnect.cancel()
+
+    @staticmethod
+    async def _wait_disconnect(receive):
+        while True:
+            message = await receive()
+            if message["type"] == "http.disconnect":
+                return
+
+    # -----------------------------
+    # Helpers
+    # -----------------------------
+    async def _run_in_pool(self, func: Callable, *args):
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self.executor, func, *args)
+
+    @staticmethod
+    async def _read_json(receive) -> Dict[str, Any]:
+        chunks = []
+        size = 0
+        while True:
+            message = await receive()
+            if message["type"] == "http.disconnect":
+                raise ApiError(400, "Client disconnected")
+            chunk = message.get("body", b"")
+            size += len(chunk)
+            if size > MAX_BODY_BYTES:
+                raise ApiError(413, "Request body too large")
+            chunks.append(chunk)
+            if not message.get("more_body", False):
+                break
+        raw = b"".join(chunks)
+        if not raw.strip():
+            return {}
+        try:
+            body = json.loads(raw)
+        except json.JSONDecodeError as exc:
+            raise ApiError(400, f"Invalid JSON: {exc}")
+        if not isinstance(body, dict):
+            raise ApiError(400, "Request body must be a JSON object")
+        return body
+
+    @staticmethod
+    async def _send_json(send, status: int, payload: Any):
+        body = _encode(payload)
+        await send(
+            {
+                "type": "http.response.start",
+                "status": status,
+                "headers": [
+                    (b"content-type", b"application/json"),
+                    (b"content-length", str(len(body)).encode("ascii")),
+                ],
+            }
+        )
+        await send({"type": "http.response.body", "body": body})
+
+
+app = RiskApi()
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Serve the risk calculations over HTTP for the web UI.")
+    parser.add_argument("--host", default="127.0.0.1", help="Bind address (default: 127.0.0.1)")
+    parser.add_argument("--port", type=int, default=8000, help="Port (default: 8000)")
+    parser.add_argument("--workers", type=int, default=DEFAULT_WORKERS, help="Calculation threads (default: 4)")
+    parser.add_argument("--group-cache", help="Group cache CSV used when a request sends no groups")
+    args = parser.parse_args(argv)
+
+    import uvicorn
+
+    app.max_workers = args.workers
+    app.group_cache_path = args.group_cache
+    uvicorn.run(app, host=args.host, port=args.port)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
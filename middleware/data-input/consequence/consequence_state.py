@@ -5,8 +5,13 @@ from dataclasses import dataclass
 @dataclass
 class ConsequenceParams:
     gas_density_kg_m3: float = 1.2
+    # Molecular weight of the released gas; gives its density once it has
+    # expanded to ambient conditions (default methane).
+    gas_molecular_weight_kg_kmol: float = 16.04
     liquid_density_kg_m3: float = 800.0
     gor: float = 5.0
+    # Ambient air density; gases (or pool vapours) denser than this use the dense-gas model.
+    air_density_kg_m3: float = 1.225
     wind_speed_m_s: float = 3.0
     release_height_m: float = 10.0
     stability_class: str = "D"
@@ -23,11 +28,23 @@ class ConsequenceParams:
     explosion_tnt_heat_combustion_kj_kg: float = 4680.0
     explosion_distance_m: float = 10.0
     explosion_ambient_pressure_bar: float = 1.013
+    # Flammability limits (vol %) for the flammable cloud mass of each scenario;
+    # converted to kg/m3 with the gas density at ambient conditions.
+    explosion_lfl_vol_pct: float = 5.0
+    explosion_ufl_vol_pct: float = 15.0
     pool_fire_heat_release_rate_kw: float = 1000.0
     pool_fire_diameter_m: float = 5.0
     pool_fire_distance_m: float = 20.0
     pool_fire_radiative_fraction: float = 0.35
     pool_fire_atmospheric_transmissivity: float = 1.0
+    # Liquid pool spread / evaporation (per liquid leak scenario)
+    pool_min_thickness_m: float = 0.01
+    pool_vapour_pressure_pa: float = 10000.0
+    pool_molecular_weight_kg_kmol: float = 100.0
+    pool_temperature_k: float = 288.15
+    pool_burning_rate_kg_m2_s: float = 0.055
+    pool_heat_combustion_kj_kg: float = 44000.0
+    pool_simulation_time_s: float = 600.0
 
 
 _PARAMS = ConsequenceParams()
@@ -0,0 +1,253 @@
+"""
+Equipment Register Import
+Builds frequency groups from a line list or parts-count spreadsheet (CSV or XLSX)
+
+The file is read in chunks, so memory stays bounded by the chunk size plus
+the aggregated groups. Each chunk is checked in one pass: equipment names and
+sizes through the precompiled resolver, which also rejects (equipment, size)
+pairs the failure-rate backend has no rows for, numeric columns with pandas. Valid
+rows are summed into groups keyed by (fuel phase, pressure, temperature,
+size), and identical (equipment, size) items within a group are merged by
+adding their EA. Every bad row is collected into one report instead of
+stopping at the first error.
+
+Column headers are matched case-insensitively against COLUMN_ALIASES, so
+'Equipment Name', 'equipment_name' and 'Equipment' all map to the name field.
+Operational columns missing from the file can be given as defaults.
+"""
+import os
+import sys
+from collections import defaultdict
+from dataclasses import dataclass, field
+from typing import Dict, Iterator, List, Optional, Set, Tuple
+
+import numpy as np
+import pandas as pd
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '../../analysis/frequency'))
+import equipment_resolver
+from failure_rate_schema import UI_EQUIPMENT_NAMES
+from frequency_group import FrequencyEquipment, FrequencyGroup, OperationalConditions
+
+DEFAULT_CHUNKSIZE = 10000
+
+# Field -> accepted column headers (compared after lower-casing and replacing spaces with '_')
+COLUMN_ALIASES = {
+    'name': ('equipment_name', 'equipment', 'equipment_type', 'item', 'name'),
+    'size': ('equipment_size', 'size', 'diameter', 'diameter_mm', 'nominal_size', 'dn'),
+    'ea': ('equipment_ea', 'ea', 'count', 'qty', 'quantity'),
+    'fuel_phase': ('fuel_phase', 'phase'),
+    'pressure': ('pressure_bar', 'pressure'),
+    'temperature': ('temperature_k', 'temperature'),
+    'group_size': ('size_mm', 'group_size', 'line_size', 'line_size_mm'),
+}
+REQUIRED_FIELDS = ('name', 'size')
+FUEL_PHASES = {'gas': 'Gas', 'liquid': 'Liquid'}
+
+
+@dataclass
+class ImportReport:
+    """Outcome of an import: row counts plus every rejected row."""
+    rows_read: int = 0
+    rows_imported: int = 0
+    errors: List[Tuple[int, str]] = field(default_factory=list)   # (file line number, message)
+    missing_pairs: Set[Tuple[str, float]] = field(default_factory=set)  # (equipment, mm) without failure rates
+
+    @property
+    def ok(self) -> bool:
+        return not self.errors
+
+    def summary(self, limit: int = 20) -> str:
+        lines = [f"Imported {self.rows_imported} of {self.rows_read} rows"]
+        if self.missing_pairs:
+            pairs = ", ".join(f"{name} {mm:g}mm" for name, mm in sorted(self.missing_pairs))
+            lines.append(f"No failure-rate data for: {pairs}")
+        for line_no, message in self.errors[:limit]:
+            lines.append(f"  line {line_no}: {message}")
+        if len(self.errors) > limit:
+            lines.append(f"  ... {len(self.errors) - limit} more error(s)")
+        return "\n".join(lines)
+
+
+def _normalise_header(header) -> str:
+    return str(header).strip().lower().replace(' ', '_')
+
+
+def map_columns(headers) -> Dict[str, str]:
+    """Field -> source column for the headers of a register file."""
+    normalised = {_normalise_header(h): h for h in headers}
+    mapping = {}
+    for field_name, aliases in COLUMN_ALIASES.items():
+        for alias in aliases:
+            if alias in normalised and normalised[alias] not in mapping.values():
+                mapping[field_name] = normalised[alias]
+                break
+    return mapping
+
+
+def _read_xlsx_chunks(path: str, chunksize: int, sheet_name=None) -> Iterator[pd.DataFrame]:
+    try:
+        from openpyxl import load_workbook
+    except ImportError as e:
+        raise RuntimeError("Reading .xlsx registers requires openpyxl (pip install openpyxl)") from e
+    workbook = load_workbook(path, read_only=True, data_only=True)
+    try:
+        sheet = workbook[sheet_name] if sheet_name else workbook.active
+        rows = sheet.iter_rows(values_only=True)
+        headers = [h if h is not None else '' for h in next(rows, ())]
+        batch = []
+        for row in rows:
+            batch.append(row[:len(headers)])
+            if len(batch) >= chunksize:
+                yield pd.DataFrame(batch, columns=headers)
+                batch = []
+        if batch:
+            yield pd.DataFrame(batch, columns=headers)
+    finally:
+        workbook.close()
+
+
+def read_register_chunks(path: str, chunksize: int = DEFAULT_CHUNKSIZE, sheet_name=None) -> Iterator[pd.DataFrame]:
+    """Yield the register as DataFrames of at most chunksize rows."""
+    ext = os.path.splitext(path)[1].lower()
+    if ext in ('.xlsx', '.xlsm'):
+        yield from _read_xlsx_chunks(path, chunksize, sheet_name)
+    elif ext in ('.csv', '.txt'):
+        yield from pd.read_csv(path, chunksize=chunksize, dtype=str, keep_default_na=False,
+                               skipinitialspace=True, encoding='utf-8-sig')
+    else:
+        raise ValueError(f"Unsupported register format '{ext}' (expected .csv or .xlsx)")
+
+
+def _numeric(chunk: pd.DataFrame, column: Optional[str], default) -> pd.Series:
+    if column is None:
+        return pd.Series(np.nan if default is None else float(default), index=chunk.index)
+    values = pd.to_numeric(chunk[column].replace('', np.nan), errors='coerce')
+    if default is not None:
+        values = values.fillna(float(default))
+    return values
+
+
+def _process_chunk(chunk: pd.DataFrame, columns: Dict[str, str], defaults: dict,
+                   line_numbers: np.ndarray, report: ImportReport, totals: dict,
+                   size_classes_only: bool = True, rate_table=None) -> None:
+    n = len(chunk)
+    names = chunk[columns['name']].astype(str).str.strip().to_numpy()
+    sizes = chunk[columns['size']].astype(str).str.strip().to_numpy()
+    check = equipment_resolver.validate_register(names, sizes, size_classes_only, rate_table)
+    report.missing_pairs.update((UI_EQUIPMENT_NAMES[eq], mm) for eq, mm in check.missing_pairs)
+    bad = np.zeros(n, dtype=bool)
+    for row, message in check.errors:
+        bad[row] = True
+        report.errors.append((int(line_numbers[row]), message))
+
+    size_mm = np.where(check.sizes_mm > 0, check.sizes_mm, np.nan)
+    ea = _numeric(chunk, columns.get('ea'), 1).to_numpy()
+    pressure = _numeric(chunk, columns.get('pressure'), defaults.get('pressure')).to_numpy()
+    temperature = _numeric(chunk, columns.get('temperature'), defaults.get('temperature')).to_numpy()
+    group_size = _numeric(chunk, columns.get('group_size'), None).to_numpy()
+    group_size = np.where(np.isnan(group_size), size_mm, group_size)
+    if 'fuel_phase' in columns:
+        phase_raw = chunk[columns['fuel_phase']].astype(str).str.strip().str.lower()
+        phase_raw = phase_raw.replace('', str(defaults.get('fuel_phase') or '').lower())
+    else:
+        phase_raw = pd.Series(str(defaults.get('fuel_phase') or '').lower(), index=chunk.index)
+    phase = phase_raw.map(FUEL_PHASES).to_numpy()
+
+    checks = (
+        (~bad & (np.isnan(ea) | (ea <= 0) | (ea != np.round(ea))), 'EA must be a positive whole number'),
+        (~bad & pd.isna(phase), "fuel phase must be 'Gas' or 'Liquid'"),
+        (~bad & np.isnan(pressure), 'missing or non-numeric pressure'),
+        (~bad & np.isnan(temperature), 'missing or non-numeric temperature'),
+    )
+    for mask, message in checks:
+        for row in np.flatnonzero(mask):
+            report.errors.append((int(line_numbers[row]), message))
+        bad |= mask
+
+    good = np.flatnonzero(~bad)
+    report.rows_imported += len(good)
+    if not len(good):
+        return
+    frame = pd.DataFrame({
+        'fuel_phase': phase[good],
+        'pressure': pressure[good],
+        'temperature': temperature[good],
+        'group_size': group_size[good],
+        'equipment_id': check.equipment_ids[good],
+        'size_mm': size_mm[good],
+        'ea': ea[good].astype(int),
+    })
+    summed = frame.groupby(
+        ['fuel_phase', 'pressure', 'temperature', 'group_size', 'equipment_id', 'size_mm'], sort=False
+    )['ea'].sum()
+    for (fuel_phase, p, t, gs, eq, mm), count in summed.items():
+        totals[(fuel_phase, float(p), float(t), float(gs))][(int(eq), float(mm))] += int(count)
+
+
+def import_register(
+    path: str,
+    group_manager=None,
+    defaults: Optional[dict] = None,
+    chunksize: int = DEFAULT_CHUNKSIZE,
+    sheet_name=None,
+    size_classes_only: bool = True,
+    rate_table=None,
+) -> Tuple[List[FrequencyGroup], ImportReport]:
+    """
+    Import an equipment register into frequency groups
+
+    Args:
+        path: .csv or .xlsx register file
+        group_manager: Optional FrequencyGroupManager; the new groups are appended to it
+            and numbered from its current_group_number
+        defaults: Values for operational columns the file does not have
+            (fuel_phase, pressure, temperature)
+        chunksize: Rows parsed per chunk
+        sheet_name: Worksheet for .xlsx files (default: the active sheet)
+        size_classes_only: Reject equipment sizes that are not a reference size class.
+            With False any diameter ('30mm') is imported; compute the frequencies of
+            such groups with size_interpolation ('log' or 'bin'), since exact table
+            lookups only know the size classes.
+        rate_table: size_interpolation.SizeRateTable whose rows each (equipment, size)
+            pair must exist in (default: the configured failure-rate backend)
+
+    Returns:
+        (groups, report); rows listed in report.errors are left out of the groups
+    """
+    defaults = defaults or {}
+    report = ImportReport()
+    totals = defaultdict(lambda: defaultdict(int))
+    columns = None
+    line = 2    # first data row below the header
+    for chunk in read_register_chunks(path, chunksize, sheet_name):
+        if columns is None:
+            columns = map_columns(chunk.columns)
+            missing = [f for f in REQUIRED_FIELDS if f not in columns]
+            if missing:
+                raise ValueError(
+                    f"Register has no column for {', '.join(missing)} "
+                    f"(accepted headers: {', '.join(a for f in missing for a in COLUMN_ALIASES[f])})"
+                )
+        line_numbers = np.arange(line, line + len(chunk))
+        line += len(chunk)
+        kept = chunk.replace('', np.nan).notna().any(axis=1).to_numpy()
+        chunk = chunk[kept]
+        report.rows_read += len(chunk)
+        if len(chunk):
+            _process_chunk(chunk, columns, defaults, line_numbers[kept], report, totals, size_classes_only,
+                           rate_table)
+
+    report.errors.sort()
+    first_number = group_manager.current_group_number if group_manager is not None else 1
+    groups = []
+    for number, ((fuel_phase, pressure, temperature, size), items) in enumerate(totals.items(), start=first_number):
+        group = FrequencyGroup(number, OperationalConditions(fuel_phase, pressure, temperature, size))
+        for (equipment_id, mm), ea in items.items():
+            group.add_equipment(FrequencyEquipment(UI_EQUIPMENT_NAMES[equipment_id], f'{mm:g}mm', ea))
+        groups.append(group)
+
+    if group_manager is not None and groups:
+        group_manager.groups.extend(groups)
+        group_manager.current_group_number = groups[-1].group_number + 1
+    return groups, report
@@ -0,0 +1,292 @@
+"""
+FILE: middleware/run_study.py
+DESCRIPTION:
+    Headless batch runner: frequency -> leak -> consequence -> risk for whole
+    studies without the Tk application. Imports no Tk or matplotlib modules, so
+    it can run on a display-less server.
+
+USAGE:
+    python middleware/run_study.py STUDY [STUDY ...] [--params params.json]
+        [--out results] [--format csv|json|parquet] [--jobs N] [--fail-fast]
+
+    STUDY is either a group cache CSV (the format written by the Frequency Data
+    tab, see group_cache.csv) or a project JSON file:
+        {
+            "group_cache": "groups.csv",          # relative to the project file
+            "params": { "wind_speed_m_s": 5.0, ... },
+            "hole_diametres_mm": { "1-3mm": 2.0 }  # optional
+        }
+    The --params file holds ConsequenceParams fields as JSON; project "params"
+    override it. Each study is written to <out>/<study name>.<format>.
+"""
+from __future__ import annotations
+
+import argparse
+import csv
+import json
+import math
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from dataclasses import asdict, fields, replace
+from typing import Any, Dict, List, Optional
+
+_BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+for _path in (
+    os.path.join(_BASE_DIR, "analysis"),
+    os.path.join(_BASE_DIR, "analysis/frequency"),
+    os.path.join(_BASE_DIR, "analysis/consequence"),
+    os.path.join(_BASE_DIR, "data-input/consequence"),
+):
+    if _path not in sys.path:
+        sys.path.insert(0, _path)
+
+from consequence_state import ConsequenceParams
+from calculate_freq import load_groups_from_cache
+from stage_graph import ConsequencePipeline
+
+OUTPUT_FORMATS = ("csv", "json", "parquet")
+
+ROW_COLUMNS = [
+    "study",
+    "group",
+    "phase",
+    "pressure_bar",
+    "temperature",
+    "category",
+    "hole_diametre_mm",
+    "leak_rate_kg_s",
+    "frequency_total",
+    "frequency_full_pressure",
+    "frequency_zero_pressure",
+    "dispersion_model",
+    "concentration_kg_m3",
+    "exceeds_critical",
+    "risk_frequency_per_year",
+]
+
+
+def load_params(path: Optional[str], overrides: Optional[Dict[str, Any]] = None) -> ConsequenceParams:
+    """Build ConsequenceParams from a JSON file plus overrides; unknown keys are errors."""
+    values: Dict[str, Any] = {}
+    if path:
+        with open(path, "r", encoding="utf-8") as f:
+            values.update(json.load(f))
+    if overrides:
+        values.update(overrides)
+
+    types = {f.name: f.type for f in fields(ConsequenceParams)}
+    unknown = sorted(set(values) - set(types))
+    if unknown:
+        raise ValueError(f"Unknown consequence parameter(s): {', '.join(unknown)}")
+    for name, value in values.items():
+        values[name] = _coerce_param(name, value, types[name])
+    return replace(ConsequenceParams(), **values)
+
+
+def _coerce_param(name: str, value: Any, annotation: Any) -> Any:
+    """Check one parameter against its ConsequenceParams type; numbers may be given as strings."""
+    if annotation in (float, "float"):
+        if not isinstance(value, bool):
+            try:
+                number = float(value)
+            except (TypeError, ValueError):
+                pass
+            else:
+                if math.isfinite(number):
+                    return number
+        raise ValueError(f"Consequence parameter '{name}' must be a number (got {value!r})")
+    if annotation in (str, "str") and not isinstance(value, str):
+        raise ValueError(f"Consequence parameter '{name}' must be a string (got {value!r})")
+    return value
+
+
+def load_study(study_path: str, params_path: Optional[str]) -> Dict[str, Any]:
+    """Resolve a study path into groups, params and optional hole sizes."""
+    name = os.path.splitext(os.path.basename(study_path))[0]
+    if study_path.lower().endswith(".json"):
+        with open(study_path, "r", encoding="utf-8") as f:
+            project = json.load(f)
+        cache_path = project.get("group_cache")
+        if not cache_path:
+            raise ValueError(f"{study_path}: project file needs a 'group_cache' entry")
+        if not os.path.isabs(cache_path):
+            cache_path = os.path.join(os.path.dirname(os.path.abspath(study_path)), cache_path)
+        params = load_params(params_path, project.get("params"))
+        hole_map = project.get("hole_diametres_mm")
+    else:
+        cache_path = study_path
+        params = load_params(params_path)
+        hole_map = None
+
+    if not os.path.exists(cache_path):
+        raise FileNotFoundError(f"Group cache not found: {cache_path}")
+    groups = load_groups_from_cache(cache_path)
+    if not groups:
+        raise ValueError(f"{cache_path}: no groups found")
+
+    return {
+        "name": name,
+        "groups": groups,
+        "params": params,
+        "hole_diametres_mm": hole_map,
+    }
+
+
+def scenario_risk_rows(study_name: str, consequence: Dict[int, Dict[str, Any]], critical_concentration: float) -> List[Dict[str, Any]]:
+    """Flatten consequence results into one row per group and leak category.
+
+    A scenario contributes its leak frequency to risk_frequency_per_year when its
+    concentration at the receptor reaches critical_concentration (> 0).
+    """
+    rows = []
+    for group_num, data in sorted(consequence.items()):
+        ops = data.get("operational_conditions", {})
+        for category, cat_data in data.get("categories", {}).items():
+            dispersion = cat_data.get("dispersion") or {}
+            concentration = dispersion.get("concentration_kg_m3")
+            exceeds = None
+            risk = None
+            if critical_concentration > 0 and concentration is not None:
+                exceeds = concentration >= critical_concentration
+                risk = float(cat_data.get("frequency_total", 0.0)) if exceeds else 0.0
+            rows.append(
+                {
+                    "study": study_name,
+                    "group": group_num,
+                    "phase": data.get("phase", ""),
+                    "pressure_bar": ops.get("pressure"),
+                    "temperature": ops.get("temperature"),
+                    "category": category,
+                    "hole_diametre_mm": cat_data.get("hole_diametre_mm"),
+                    "leak_rate_kg_s": cat_data.get("leak_rate_kg_s"),
+                    "frequency_total": cat_data.get("frequency_total"),
+                    "frequency_full_pressure": cat_data.get("frequency_full_pressure"),
+                    "frequency_zero_pressure": cat_data.get("frequency_zero_pressure"),
+                    "dispersion_model": dispersion.get("model"),
+                    "concentration_kg_m3": concentration,
+                    "exceeds_critical": exceeds,
+                    "risk_frequency_per_year": risk,
+                }
+            )
+    return rows
+
+
+def run_study(study_path: str, params_path: Optional[str] = None) -> Dict[str, Any]:
+    """Run one study end to end and return rows plus study-level summaries."""
+    study = load_study(study_path, params_path)
+    params = study["params"]
+
+    started = time.perf_counter()
+    outputs = ConsequencePipeline().run_stages(
+        params,
+        groups=study["groups"],
+        hole_diametres_mm=study["hole_diametres_mm"],
+    )
+    rows = scenario_risk_rows(
+        study["name"],
+        outputs["dispersion"],
+        float(params.critical_concentration_kg_m3 or 0.0),
+    )
+
+    return {
+        "study": study["name"],
+        "source": os.path.abspath(study_path),
+        "params": asdict(params),
+        "explosion": outputs["explosion"],
+        "flammable_explosion": outputs["flammable_explosion"],
+        "pool": outputs["pool"],
+        "pool_fire": outputs["pool_fire"],
+        "rows": rows,
+        "elapsed_s": time.perf_counter() - started,
+    }
+
+
+def write_result(result: Dict[str, Any], out_dir: str, fmt: str) -> str:
+    """Write one study result and return the output path."""
+    os.makedirs(out_dir, exist_ok=True)
+    path = os.path.join(out_dir, f"{result['study']}.{fmt}")
+
+    if fmt == "json":
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(result, f, indent=2, default=str)
+    elif fmt == "csv":
+        with open(path, "w", newline="", encoding="utf-8") as f:
+            writer = csv.DictWriter(f, fieldnames=ROW_COLUMNS)
+            writer.writeheader()
+            writer.writerows(result["rows"])
+    elif fmt == "parquet":
+        import pandas as pd
+
+        pd.DataFrame(result["rows"], columns=ROW_COLUMNS).to_parquet(path, index=False)
+    else:
+        raise ValueError(f"Unsupported output format '{fmt}'")
+    return path
+
+
+def _run_and_write(study_path: str, params_path: Optional[str], out_dir: str, fmt: str):
+    result = run_study(study_path, params_path)
+    return write_result(result, out_dir, fmt), len(result["rows"]), result["elapsed_s"]
+
+
+def build_arg_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(
+        description="Run frequency, leak, consequence and risk calculations for studies without the GUI."
+    )
+    parser.add_argument("studies", nargs="+", help="Group cache CSV or project JSON file(s)")
+    parser.add_argument("--params", help="JSON file with ConsequenceParams values")
+    parser.add_argument("--out", default="results", help="Output directory (default: results)")
+    parser.add_argument("--format", choices=OUTPUT_FORMATS, default="csv", help="Output format (default: csv)")
+    parser.add_argument(
+        "--jobs",
+        type=int,
+        default=1,
+        help="Number of studies to run in parallel worker processes (default: 1)",
+    )
+    parser.add_argument("--fail-fast", action="store_true", help="Stop at the first failing study")
+    return parser
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    args = build_arg_parser().parse_args(argv)
+    succeeded = 0
+    failures = 0
+
+    if args.jobs <= 1:
+        for study_path in args.studies:
+            try:
+                path, n_rows, elapsed = _run_and_write(study_path, args.params, args.out, args.format)
+                print(f"{study_path}: {n_rows} scenario(s) in {elapsed:.2f}s -> {path}")
+                succeeded += 1
+            except Exception as e:
+                failures += 1
+                print(f"{study_path}: FAILED: {e}", file=sys.stderr)
+                if args.fail_fast:
+                    break
+    else:
+        with ProcessPoolExecutor(max_workers=args.jobs) as pool:
+            futures = {
+                pool.submit(_run_and_write, study_path, args.params, args.out, args.format): study_path
+                for study_path in args.studies
+            }
+            for future in as_completed(futures):
+                study_path = futures[future]
+                try:
+                    path, n_rows, elapsed = future.result()
+                    print(f"{study_path}: {n_rows} scenario(s) in {elapsed:.2f}s -> {path}")
+                    succeeded += 1
+                except Exception as e:
+                    failures += 1
+                    print(f"{study_path}: FAILED: {e}", file=sys.stderr)
+                    if args.fail_fast:
+                        for pending in futures:
+                            pending.cancel()
+                        break
+
+    print(f"Done: {succeeded} succeeded, {failures} failed")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,182 @@
+"""
+FILE: analysis_worker.py
+DESCRIPTION:
+    Background job runner for the analysis panels.
+    Runs pipeline calls (including Supabase queries) on a worker thread and
+    posts progress and results back to the Tk main thread by polling a queue
+    with root.after, so the window stays responsive during long runs.
+CLASSES:
+    AnalysisJob: Handle for a submitted job (cancel, progress reporting).
+    AnalysisWorker: Executes one job at a time for a panel.
+"""
+import os
+import queue
+import sys
+import threading
+import traceback
+
+# Add middleware path (needed for job_control)
+_analysis_path = os.path.abspath(
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), '../../../middleware/analysis')
+)
+if _analysis_path not in sys.path:
+    sys.path.insert(0, _analysis_path)
+
+from job_control import CancelToken, Job, JobCancelled
+
+
+class AnalysisJob:
+    """Handle passed to the job function and returned to the caller.
+
+    `job` is a job_control.Job sharing this handle's cancel token; pass it to
+    middleware functions so they report progress and stop at checkpoints.
+    """
+
+    def __init__(self, job_id, events):
+        self.job_id = job_id
+        self._events = events
+        self._cancel_token = CancelToken()
+        self.job = Job(on_progress=self._post_job_progress, cancel_token=self._cancel_token)
+
+    @property
+    def cancelled(self) -> bool:
+        return self._cancel_token.cancelled
+
+    def cancel(self):
+        """Request cancellation; the job stops at its next checkpoint."""
+        self._cancel_token.cancel()
+
+    def _post_job_progress(self, progress):
+        message = progress.label
+        if progress.eta_s is not None and progress.done < progress.total:
+            message = f"{message}, ETA {progress.eta_s:.0f}s"
+        self.report_progress(progress.done, progress.total, message)
+
+    def report_progress(self, done, total, message=""):
+        """Post a progress update (callable from the worker thread)."""
+        self._events.put((self.job_id, "progress", (done, total, message)))
+
+    def emit(self, partial):
+        """Post an intermediate result, e.g. one finished group (worker thread)."""
+        self._events.put((self.job_id, "partial", partial))
+
+
+class AnalysisWorker:
+    """Runs one analysis job at a time on a daemon thread.
+
+    Callbacks are always invoked on the Tk main thread:
+        on_result(result), on_error(exc, formatted_traceback),
+        on_progress(done, total, message), on_partial(partial),
+        on_cancelled(partial_result)
+
+    on_cancelled also runs for a job replaced by a newer submit; `busy` is
+    then already True for the job that replaced it.
+    """
+
+    def __init__(self, root, poll_interval_ms=50):
+        self.root = root
+        self.poll_interval_ms = poll_interval_ms
+        self._events = queue.Queue()
+        self._callbacks = {}
+        self._jobs = {}
+        self._current = None
+        self._thread = None
+        self._next_id = 0
+        self._polling = False
+
+    @property
+    def busy(self) -> bool:
+        return self._current is not None
+
+    def submit(self, func, on_result, on_error=None, on_progress=None, on_cancelled=None, on_partial=None):
+        """Run func(job) on a worker thread and return the AnalysisJob handle.
+
+        A running job is cancelled first; the new thread waits for it to stop
+        before calling func, so jobs never overlap, and the cancelled job still
+        gets its on_cancelled callback.
+        """
+        if self._current is not None:
+            self._current.cancel()
+        previous = self._thread
+
+        self._next_id += 1
+        job = AnalysisJob(self._next_id, self._events)
+        self._callbacks[job.job_id] = {
+            "result": on_result,
+            "error": on_error,
+            "progress": on_progress,
+            "cancelled": on_cancelled,
+            "partial": on_partial,
+        }
+        self._jobs[job.job_id] = job
+        self._current = job
+
+        def run():
+            if previous is not None:
+                previous.join()
+            try:
+                job.job.checkpoint()
+                result = func(job)
+            except JobCancelled as exc:
+                self._events.put((job.job_id, "cancelled", exc.partial_result))
+            except Exception as exc:
+                self._events.put((job.job_id, "error", (exc, traceback.format_exc())))
+            else:
+                self._events.put((job.job_id, "result", result))
+
+        self._thread = threading.Thread(target=run, name=f"analysis-job-{job.job_id}", daemon=True)
+        self._thread.start()
+        self._schedule_poll()
+        return job
+
+    def cancel(self):
+        """Cancel the running job, if any."""
+        if self._current is not None:
+            self._current.cancel()
+
+    def _schedule_poll(self):
+        if not self._polling:
+            self._polling = True
+            self.root.after(self.poll_interval_ms, self._poll)
+
+    def _poll(self):
+        self._polling = False
+        try:
+            while True:
+                job_id, kind, payload = self._events.get_nowait()
+                self._dispatch(job_id, kind, payload)
+        except queue.Empty:
+            pass
+        if self._callbacks:
+            self._schedule_poll()
+
+    def _dispatch(self, job_id, kind, payload):
+        callbacks = self._callbacks.get(job_id)
+        if callbacks is None:
+            return
+        job = self._jobs[job_id]
+        cancelled = job.cancelled
+
+        if kind == "progress":
+            if not cancelled and callbacks["progress"] is not None:
+                callbacks["progress"](*payload)
+            return
+        if kind == "partial":
+            if not cancelled and callbacks["partial"] is not None:
+                callbacks["partial"](payload)
+            return
+
+        # Terminal event: the job is finished either way. Jobs replaced by a
+        # newer submit still report their cancellation.
+        del self._callbacks[job_id]
+        del self._jobs[job_id]
+        if self._current is job:
+            self._current = None
+
+        if cancelled or kind == "cancelled":
+            if callbacks["cancelled"] is not None:
+                callbacks["cancelled"](payload if kind == "cancelled" else None)
+        elif kind == "result":
+            callbacks["result"](payload)
+        elif callbacks["error"] is not None:
+            callbacks["error"](*payload)
@@ -6,10 +6,10 @@ DESCRIPTION:
 FUNCTIONS:
     create_consequence_analysis_ui(root)
 """
+import copy
 import os
 import sys
 from tkinter import ttk, messagebox, StringVar
-import matplotlib.pyplot as plt
 
 # Add middleware paths
 current_dir = os.path.dirname(os.path.abspath(__file__))
@@ -34,6 +34,10 @@ plume_plot_path = os.path.join(
 if plume_plot_path not in sys.path:
     sys.path.insert(0, plume_plot_path)
 
+gas_dispersion_path = os.path.dirname(plume_plot_path)
+if gas_dispersion_path not in sys.path:
+    sys.path.insert(0, gas_dispersion_path)
+
 explosion_model_path = os.path.join(
     project_root,
     'middleware/analysis/consequence/models/IQRAModeling/IQRA_software/ExplosionModel',
@@ -41,6 +45,10 @@ explosion_model_path = os.path.join(
 if explosion_model_path not in sys.path:
     sys.path.insert(0, explosion_model_path)
 
+analysis_ui_path = os.path.join(project_root, 'ui/components/analysis')
+if analysis_ui_path not in sys.path:
+    sys.path.insert(0, analysis_ui_path)
+
 fire_model_path = os.path.join(
     project_root,
     'middleware/analysis/consequence/models/IQRAModeling/IQRA_software/FireModel',
@@ -59,47 +67,20 @@ try:
 except Exception:
     get_params = None
 
-try:
-    from calculate_consequence import calculate_group_consequence
-except Exception:
-    calculate_group_consequence = None
-
-try:
-    from plum_2Dgraph_ import plot_plume_3d, plot_plume_2d_profile
-except Exception:
-    plot_plume_3d = None
-    plot_plume_2d_profile = None
-
-_tnt_import_error = None
-try:
-    from TNTEqModel import per_distance_pressure
-except Exception as exc:
-    per_distance_pressure = None
-    _tnt_import_error = exc
-
-_tno_import_error = None
-try:
-    from TNOModel import energy_context_calc as tno_energy_context_calc
-    from TNOModel import scenario_calc as tno_scenario_calc
-except Exception as exc:
-    tno_energy_context_calc = None
-    tno_scenario_calc = None
-    _tno_import_error = exc
-
-_bst_import_error = None
-try:
-    from BSTModel import scenario_calc as bst_scenario_calc
-except Exception as exc:
-    bst_scenario_calc = None
-    _bst_import_error = exc
-
-_pool_fire_import_error = None
-try:
-    from PoolFire import calculate_radiant_heat_flux
-except Exception as exc:
-    calculate_radiant_heat_flux = None
-    _pool_fire_import_error = exc
+from analysis_worker import AnalysisWorker
+from lazy_import import LazyModule
 
+# Heavy modules load on first use (see lazy_import.py) so opening the
+# application does not pay for matplotlib, the 3D plume plots or the models.
+plt = LazyModule("matplotlib.pyplot")
+np = LazyModule("numpy")
+_stage_graph = LazyModule("stage_graph")
+_plume = LazyModule("plum_2Dgraph_")
+_tnt = LazyModule("TNTEqModel")
+_tno = LazyModule("TNOModel")
+_bst = LazyModule("BSTModel")
+_pool_fire = LazyModule("PoolFire")
+_radiation = LazyModule("RadiationEngine")
 
 
 def create_consequence_analysis_ui(root):
@@ -115,6 +96,13 @@ def create_consequence_analysis_ui(root):
     summary_label = ttk.Label(frame, text="Inputs: not loaded", anchor="w")
     summary_label.pack(fill="x", pady=(6, 8))
 
+    progress_row = ttk.Frame(frame)
+    progress_row.pack(fill="x", pady=(0, 8))
+    status_var = StringVar(value="Idle")
+    progress_bar = ttk.Progressbar(progress_row, mode="determinate", maximum=1.0, length=200)
+    progress_bar.pack(side="left", padx=(0, 8))
+    ttk.Label(progress_row, textvariable=status_var, anchor="w").pack(side="left", fill="x", expand=True)
+
     explosion_frame = ttk.LabelFrame(frame, text="Explosion / Pool Fire Outputs", padding=8)
     explosion_frame.pack(fill="x", pady=(0, 8))
 
@@ -165,8 +153,43 @@ def create_consequence_analysis_ui(root):
     tree.column("model", width=90, anchor="center")
     tree.column("concentration", width=120, anchor="center")
 
+    # Rows left over from a cancelled study are greyed out as partial results.
+    tree.tag_configure("partial", foreground="gray")
     tree.pack(fill="both", expand=True)
 
+    # Cached stage outputs survive between runs so what-if edits only rerun
+    # the stages whose inputs changed. Created on the first run.
+    pipeline_holder = {"pipeline": None}
+    worker = AnalysisWorker(frame)
+    # Plots get their own worker: opening one must not cancel a running study,
+    # and plot jobs never touch the (single-threaded) pipeline.
+    plot_worker = AnalysisWorker(frame)
+
+    def get_pipeline():
+        if pipeline_holder["pipeline"] is None and _stage_graph.available:
+            pipeline_holder["pipeline"] = _stage_graph.ConsequencePipeline()
+        return pipeline_holder["pipeline"]
+
+    def _on_progress(done, total, message=""):
+        progress_bar["value"] = (done / total) if total else 0.0
+        status_var.set(f"{message} ({done}/{total})" if message else f"{done}/{total}")
+
+    def _on_finished(text):
+        progress_bar["value"] = 0.0
+        status_var.set(text)
+
+    def _on_error(title):
+        def handler(exc, _trace):
+            _on_finished("Failed")
+            messagebox.showerror("Error", f"{title}: {exc}")
+        return handler
+
+    def cancel_job():
+        for running in (worker, plot_worker):
+            if running.busy:
+                running.cancel()
+                status_var.set("Cancelling...")
+
     def _try_float(value):
         try:
             return float(value)
@@ -229,15 +252,11 @@ def create_consequence_analysis_ui(root):
         bst_ps = None
         if ambient_pressure is not None and ambient_pressure > 0 and heat_combustion > 0 and distance > 0:
             try:
-                if tno_energy_context_calc is not None:
-                    energy_kj = tno_energy_context_calc(mass, heat_combustion)
-                    tno_points = tno_scenario_calc(energy_kj, ambient_pressure) if tno_scenario_calc else []
-                    if 1 <= int(distance) <= len(tno_points):
-                        tno_ps = tno_points[int(distance) - 1][2]
-                if bst_scenario_calc is not None:
-                    bst_points = bst_scenario_calc(energy_kj, ambient_pressure)
-                    if 1 <= int(distance) <= len(bst_points):
-                        bst_ps = bst_points[int(distance) - 1][2]
+                energy_kj = mass * heat_combustion
+                if _tno.available:
+                    tno_ps = _tno.pressure_calc(_tno.scaled_distance_calc(distance, energy_kj, ambient_pressure))
+                if _bst.available:
+                    bst_ps = _bst.pressure_calc(_bst.scaled_distance_calc(energy_kj, ambient_pressure, distance))
             except Exception:
                 tno_ps = None
                 bst_ps = None
@@ -247,8 +266,8 @@ def create_consequence_analysis_ui(root):
 
         pool_flux = None
         try:
-            if calculate_radiant_heat_flux is not None:
-                pool_flux = calculate_radiant_heat_flux(
+            if _pool_fire.available:
+                pool_flux = _pool_fire.calculate_radiant_heat_flux(
                     float(getattr(params, "pool_fire_heat_release_rate_kw", 0.0)),
                     float(getattr(params, "pool_fire_diameter_m", 0.0)),
                     float(getattr(params, "pool_fire_distance_m", 0.0)),
@@ -286,8 +305,11 @@ def create_consequence_analysis_ui(root):
         return params
 
     def run_consequence():
-        if calculate_group_consequence is None:
-            messagebox.showerror("Error", "Consequence calculation module not available.")
+        pipeline = get_pipeline()
+        if pipeline is None:
+            messagebox.showerror(
+                "Error", f"Consequence calculation module not available: {_stage_graph.error}"
+            )
             return
         if FrequencyGroupManager is None:
             messagebox.showerror("Error", "Frequency group manager not available.")
@@ -297,76 +319,76 @@ def create_consequence_analysis_ui(root):
             messagebox.showerror("Error", "Consequence inputs are not available.")
             return
 
-        group_manager = FrequencyGroupManager()
-        group_ids = [group.group_number for group in group_manager.get_all_groups()]
-        density_overrides = {
-            group_id: {
-                "gas_density": params.gas_density_kg_m3,
-                "liquid_density": params.liquid_density_kg_m3,
-                "gor": params.gor,
-            }
-            for group_id in group_ids
-        }
-
-        dispersion_params = {
-            "model": params.model,
-            "wind_speed_m_s": params.wind_speed_m_s,
-            "release_height_m": params.release_height_m,
-            "stability_class": params.stability_class,
-            "x_m": params.x_m,
-            "y_m": params.y_m,
-            "z_m": params.z_m,
-            "puff_time_s": params.puff_time_s,
-            "release_duration_s": params.release_duration_s,
-        }
+        # Snapshot inputs on the UI thread; the worker must not read Tk or
+        # shared state that the input tabs may change mid-run.
+        params = copy.copy(params)
+        groups = FrequencyGroupManager().get_all_group_data()
 
-        try:
-            results = calculate_group_consequence(
-                group_manager=group_manager,
-                density_overrides=density_overrides,
-                dispersion_params=dispersion_params,
-            )
-        except Exception as exc:
-            messagebox.showerror("Error", f"Consequence calculation failed: {exc}")
-            return
+        # Rows are added group by group as the worker finishes them.
+        finished = []
+
+        def show_group(group_result):
+            finished.append(group_result[0])
+            add_group_rows(*group_result)
+
+        def show_cancelled(_partial):
+            # A study replaced by a new run: its rows are already cleared.
+            if worker.busy:
+                return
+            for item in tree.get_children():
+                tree.item(item, tags=("partial",))
+            _on_finished(f"Cancelled - partial results ({len(finished)} of {len(groups or {})} groups)")
+
+        def job(handle):
+            count = 0
+            for group_result in pipeline.iter_groups(params, groups=groups, job=handle.job):
+                handle.emit(group_result)
+                count += 1
+            return count
 
         for item in tree.get_children():
             tree.delete(item)
+        status_var.set("Running consequence analysis...")
+        worker.submit(
+            job,
+            on_result=lambda count: _on_finished(f"Consequence analysis complete ({count} groups)"),
+            on_error=_on_error("Consequence calculation failed"),
+            on_progress=_on_progress,
+            on_cancelled=show_cancelled,
+            on_partial=show_group,
+        )
 
-        if not results:
-            return
-
-        for group_num, data in sorted(results.items()):
-            ops = data.get("operational_conditions", {})
-            phase = data.get("phase", "")
-            pressure = ops.get("pressure", "")
-            temperature = ops.get("temperature", "")
-
-            categories = data.get("categories", {})
-            for category, cat_data in categories.items():
-                leak_rate = cat_data.get("leak_rate_kg_s", 0.0)
-                dispersion = cat_data.get("dispersion") or {}
-                model = dispersion.get("model", "-")
-                concentration = dispersion.get("concentration_kg_m3")
-                if concentration is None:
-                    concentration_display = "-"
-                else:
-                    concentration_display = f"{concentration:.3e}"
-
-                tree.insert(
-                    "",
-                    "end",
-                    values=(
-                        group_num,
-                        phase,
-                        f"{pressure}",
-                        f"{temperature}",
-                        category,
-                        f"{leak_rate:.3e}",
-                        model,
-                        concentration_display,
-                    ),
-                )
+    def add_group_rows(group_num, data):
+        ops = data.get("operational_conditions", {})
+        phase = data.get("phase", "")
+        pressure = ops.get("pressure", "")
+        temperature = ops.get("temperature", "")
+
+        categories = data.get("categories", {})
+        for category, cat_data in categories.items():
+            leak_rate = cat_data.get("leak_rate_kg_s", 0.0)
+            dispersion = cat_data.get("dispersion") or {}
+            model = dispersion.get("model", "-")
+            concentration = dispersion.get("concentration_kg_m3")
+            if concentration is None:
+                concentration_display = "-"
+            else:
+                concentration_display = f"{concentration:.3e}"
+
+            tree.insert(
+                "",
+                "end",
+                values=(
+                    group_num,
+                    phase,
+                    f"{pressure}",
+                    f"{temperature}",
+                    category,
+                    f"{leak_rate:.3e}",
+                    model,
+                    concentration_display,
+                ),
+            )
 
     def _parse_float(value, fallback=0.0):
         try:
@@ -396,8 +418,8 @@ def create_consequence_analysis_ui(root):
         plt.show()
 
     def open_plume_plot():
-        if plot_plume_3d is None:
-            messagebox.showerror("Error", "Plume plotting module not available.")
+        if not _plume.available:
+            messagebox.showerror("Error", f"Plume plotting module not available: {_plume.error}")
             return
         selection = tree.selection()
         if not selection:
@@ -426,7 +448,7 @@ def create_consequence_analysis_ui(root):
                 c_limit = 1.0
 
         y_max = max(20.0, x_max / 4.0)
-        plot_plume_3d(
+        plume_args = (
             leak_rate,
             float(params.wind_speed_m_s),
             float(params.release_height_m),
@@ -436,12 +458,27 @@ def create_consequence_analysis_ui(root):
             y_max,
             0.0,
             z_max,
-            c_limit,
+        )
+
+        def job(handle):
+            return _plume.compute_plume_field(*plume_args, job=handle.job, threshold=c_limit)
+
+        def show_plot(field):
+            _on_finished("Plume field ready")
+            _plume.plot_plume_3d(*plume_args, c_limit, field=field)
+
+        status_var.set("Computing plume field...")
+        plot_worker.submit(
+            job,
+            on_result=show_plot,
+            on_error=_on_error("Plume plotting failed"),
+            on_progress=_on_progress,
+            on_cancelled=lambda partial: None if plot_worker.busy else _on_finished("Cancelled"),
         )
 
     def open_plume_profile():
-        if plot_plume_2d_profile is None:
-            messagebox.showerror("Error", "Plume plotting module not available.")
+        if not _plume.available:
+            messagebox.showerror("Error", f"Plume plotting module not available: {_plume.error}")
             return
         selection = tree.selection()
         if not selection:
@@ -464,7 +501,7 @@ def create_consequence_analysis_ui(root):
             x_max = 50.0
         c_limit = _parse_float(getattr(params, "critical_concentration_kg_m3", 0.0), 0.0)
 
-        plot_plume_2d_profile(
+        _plume.plot_plume_2d_profile(
             leak_rate,
             float(params.wind_speed_m_s),
             float(params.release_height_m),
@@ -475,14 +512,11 @@ def create_consequence_analysis_ui(root):
         )
 
     def open_explosion_plot():
-        if per_distance_pressure is None:
-            if _tnt_import_error:
-                messagebox.showerror(
-                    "Error",
-                    f"Explosion plotting module not available: {_tnt_import_error}",
-                )
-            else:
-                messagebox.showerror("Error", "Explosion plotting module not available.")
+        if not _tnt.available:
+            messagebox.showerror(
+                "Error",
+                f"Explosion plotting module not available: {_tnt.error}",
+            )
             return
         params = load_params_summary()
         if params is None:
@@ -510,16 +544,7 @@ def create_consequence_analysis_ui(root):
             return
 
         try:
-            if per_distance_pressure is None:
-                if _tnt_import_error:
-                    messagebox.showerror(
-                        "Error",
-                        f"TNT equivalency plotting module not available: {_tnt_import_error}",
-                    )
-                else:
-                    messagebox.showerror("Error", "TNT equivalency plotting module not available.")
-                return
-            points = per_distance_pressure(tnt_mass=w_mass, start=1, end=200)
+            points = _tnt.per_distance_pressure(tnt_mass=w_mass, start=1, end=200)
         except Exception as exc:
             messagebox.showerror("Error", f"Explosion plotting failed: {exc}")
             return
@@ -539,8 +564,8 @@ def create_consequence_analysis_ui(root):
         )
 
     def open_tno_plot():
-        if tno_energy_context_calc is None or tno_scenario_calc is None:
-            messagebox.showerror("Error", f"TNO module not available: {_tno_import_error}")
+        if not _tno.available:
+            messagebox.showerror("Error", f"TNO module not available: {_tno.error}")
             return
         params = load_params_summary()
         if params is None:
@@ -553,8 +578,8 @@ def create_consequence_analysis_ui(root):
             messagebox.showerror("Error", "TNO inputs must be valid positive numbers.")
             return
         try:
-            energy_kj = tno_energy_context_calc(mass, heat_combustion)
-            points = tno_scenario_calc(energy_kj, ambient_pressure)
+            energy_kj = _tno.energy_context_calc(mass, heat_combustion)
+            points = _tno.scenario_calc(energy_kj, ambient_pressure)
         except Exception as exc:
             messagebox.showerror("Error", f"TNO plotting failed: {exc}")
             return
@@ -571,8 +596,8 @@ def create_consequence_analysis_ui(root):
         )
 
     def open_bst_plot():
-        if bst_scenario_calc is None:
-            messagebox.showerror("Error", f"BST module not available: {_bst_import_error}")
+        if not _bst.available:
+            messagebox.showerror("Error", f"BST module not available: {_bst.error}")
             return
         params = load_params_summary()
         if params is None:
@@ -586,7 +611,7 @@ def create_consequence_analysis_ui(root):
             return
         try:
             energy_kj = mass * heat_combustion
-            points = bst_scenario_calc(energy_kj, ambient_pressure)
+            points = _bst.scenario_calc(energy_kj, ambient_pressure)
         except Exception as exc:
             messagebox.showerror("Error", f"BST plotting failed: {exc}")
             return
@@ -603,8 +628,8 @@ def create_consequence_analysis_ui(root):
         )
 
     def open_pool_fire_plot():
-        if calculate_radiant_heat_flux is None:
-            messagebox.showerror("Error", f"Pool fire module not available: {_pool_fire_import_error}")
+        if not _pool_fire.available:
+            messagebox.showerror("Error", f"Pool fire module not available: {_pool_fire.error}")
             return
         params = load_params_summary()
         if params is None:
@@ -618,18 +643,19 @@ def create_consequence_analysis_ui(root):
             messagebox.showerror("Error", "Pool fire inputs are invalid.")
             return
 
-        distances = list(range(1, 201))
+        distances = np.arange(1, 201, dtype=float)
         try:
-            fluxes = [
-                calculate_radiant_heat_flux(q_kw, d_m, float(distance), f, tau)
-                for distance in distances
-            ]
+            fire = _radiation.PoolFires.from_sources(0.0, 0.0, q_kw, d_m, f, tau)
+            receptors = np.column_stack([distances, np.zeros_like(distances)])
+            fluxes = _radiation.pool_fire_flux(fire, receptors, model="point")
+            solid_fluxes = _radiation.pool_fire_flux(fire, receptors, model="solid")
         except Exception as exc:
             messagebox.showerror("Error", f"Pool fire plotting failed: {exc}")
             return
 
         plt.figure(figsize=(8, 5))
-        plt.plot(distances, fluxes, label="Radiant heat flux q''", color="orangered")
+        plt.plot(distances, fluxes, label="Radiant heat flux q'' (point source)", color="orangered")
+        plt.plot(distances, solid_fluxes, label="Radiant heat flux q'' (solid flame)", color="darkred", linestyle="--")
         plt.title("Pool Fire Radiant Flux vs Distance")
         plt.xlabel("Distance from Pool Center [m]")
         plt.ylabel("Radiant Heat Flux [kW/m2]")
@@ -643,6 +669,7 @@ def create_consequence_analysis_ui(root):
     ttk.Button(button_row, text="Run Consequence Analysis", command=run_consequence).pack(
         side="left", padx=5
     )
+    ttk.Button(button_row, text="Cancel", command=cancel_job).pack(side="left", padx=5)
     ttk.Button(button_row, text="Reload Inputs", command=load_params_summary).pack(
         side="left", padx=5
     )
@@ -13,6 +13,7 @@ import ttkbootstrap as tb
 from ttkbootstrap.constants import *
 from tkinter import ttk
 from tkinter import Canvas
+from tkinter import StringVar
 import matplotlib.pyplot as plt
 from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
 from matplotlib.figure import Figure
@@ -41,6 +42,13 @@ db_path = os.path.join(project_root, 'database')
 if db_path not in sys.path:
     sys.path.insert(0, db_path)
 
+# Add analysis UI path (needed for the background worker)
+analysis_ui_path = os.path.join(project_root, 'ui/components/analysis')
+if analysis_ui_path not in sys.path:
+    sys.path.insert(0, analysis_ui_path)
+
+from analysis_worker import AnalysisWorker
+
 # Load calculate_freq module using importlib
 calculate_freq_path = os.path.join(project_root, 'middleware/analysis/frequency/calculate_freq.py')
 print(f"Looking for calculate_freq at: {calculate_freq_path}")
@@ -314,17 +322,35 @@ def create_frequency_analysis_ui(root):
         else:
             ttk.Label(legend_frame, text="No Data").pack()
     
-    def refresh_analysis():
-        """Refresh the analysis by reloading data and updating all visualizations"""
-        print("Refreshing frequency analysis...")
-        group_frequencies = load_frequency_data()
+    def show_frequency_data(group_frequencies):
+        """Update all visualizations (runs on the Tk main thread)"""
         update_graph(group_frequencies)
         update_table(group_frequencies)
         update_legend(group_frequencies)
+        status_var.set("Ready")
         print("Refresh complete!")
     
-    # Initial load
-    group_frequencies = load_frequency_data()
+    def show_load_error(exc, trace):
+        print(f"Error loading frequency data: {str(exc)}")
+        print(trace)
+        status_var.set("Failed to load frequency data")
+    
+    def refresh_analysis():
+        """Refresh the analysis by reloading data on a worker thread and updating all visualizations"""
+        print("Refreshing frequency analysis...")
+        status_var.set("Loading frequency data...")
+        worker.submit(
+            lambda job: load_frequency_data(),
+            on_result=show_frequency_data,
+            on_error=show_load_error,
+            on_cancelled=lambda partial: None if worker.busy else status_var.set("Cancelled"),
+        )
+    
+    # Database queries run off the UI thread; the panel starts empty and is
+    # filled in once the initial load completes.
+    worker = AnalysisWorker(main_frame)
+    status_var = StringVar(value="Loading frequency data...")
+    group_frequencies = {}
     
     # Configure grid
     main_frame.grid_columnconfigure(0, weight=3)
@@ -390,6 +416,11 @@ def create_frequency_analysis_ui(root):
     # Initial table rendering
     update_table(group_frequencies)
     
+    status_label = ttk.Label(main_frame, textvariable=status_var, anchor="w")
+    status_label.grid(row=2, column=0, columnspan=2, sticky="ew", padx=5)
+    
+    refresh_analysis()
+    
     # Return both the frame and the refresh function
     return main_frame, refresh_analysis
 
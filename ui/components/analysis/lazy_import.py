@@ -0,0 +1,68 @@
+"""
+FILE: lazy_import.py
+DESCRIPTION:
+    Deferred module imports for the analysis panels.
+    Heavy modules (matplotlib, the 3D plume plots, explosion and fire models)
+    are wrapped in a LazyModule proxy at import time and only imported the
+    first time an attribute is used, keeping application start-up fast.
+CLASSES:
+    LazyModule: Module proxy that imports its target on first attribute access.
+"""
+import importlib
+import threading
+
+
+class LazyModule:
+    """Proxy for a module that is imported on first attribute access.
+
+    Usage:
+        plt = LazyModule("matplotlib.pyplot")
+        ...
+        plt.figure()          # matplotlib is imported here
+
+    `available` attempts the import and reports whether it succeeded; `error`
+    holds the exception when it did not, so callers can show it to the user.
+    """
+
+    def __init__(self, name):
+        self._name = name
+        self._module = None
+        self._error = None
+        self._lock = threading.Lock()
+
+    def _load(self):
+        if self._module is None:
+            with self._lock:
+                if self._module is None:
+                    if self._error is not None:
+                        raise self._error
+                    try:
+                        self._module = importlib.import_module(self._name)
+                    except Exception as exc:
+                        self._error = exc
+                        raise
+        return self._module
+
+    @property
+    def loaded(self) -> bool:
+        return self._module is not None
+
+    @property
+    def available(self) -> bool:
+        try:
+            self._load()
+        except Exception:
+            return False
+        return True
+
+    @property
+    def error(self):
+        return self._error
+
+    def __getattr__(self, attr):
+        # Only called for attributes not found on the proxy itself.
+        return getattr(self._load(), attr)
+
+    def __repr__(self):
+        state = "loaded" if self._module is not None else "not loaded"
+        return f"<LazyModule {self._name!r} ({state})>"
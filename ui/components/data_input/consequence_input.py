@@ -37,8 +37,10 @@ def create_consequence_input_ui(root):
     defaults = get_params() if get_params else None
 
     gas_density_var = StringVar(value=str(getattr(defaults, 'gas_density_kg_m3', 1.2)))
+    gas_mw_var = StringVar(value=str(getattr(defaults, 'gas_molecular_weight_kg_kmol', 16.04)))
     liquid_density_var = StringVar(value=str(getattr(defaults, 'liquid_density_kg_m3', 800.0)))
     gor_var = StringVar(value=str(getattr(defaults, 'gor', 5.0)))
+    air_density_var = StringVar(value=str(getattr(defaults, 'air_density_kg_m3', 1.225)))
     wind_speed_var = StringVar(value=str(getattr(defaults, 'wind_speed_m_s', 3.0)))
     height_var = StringVar(value=str(getattr(defaults, 'release_height_m', 10.0)))
     stability_var = StringVar(value=str(getattr(defaults, 'stability_class', 'D')))
@@ -59,11 +61,20 @@ def create_consequence_input_ui(root):
     )
     explosion_distance_var = StringVar(value=str(getattr(defaults, 'explosion_distance_m', 10.0)))
     explosion_p0_var = StringVar(value=str(getattr(defaults, 'explosion_ambient_pressure_bar', 1.013)))
+    explosion_lfl_var = StringVar(value=str(getattr(defaults, 'explosion_lfl_vol_pct', 5.0)))
+    explosion_ufl_var = StringVar(value=str(getattr(defaults, 'explosion_ufl_vol_pct', 15.0)))
     pool_fire_q_var = StringVar(value=str(getattr(defaults, 'pool_fire_heat_release_rate_kw', 1000.0)))
     pool_fire_diameter_var = StringVar(value=str(getattr(defaults, 'pool_fire_diameter_m', 5.0)))
     pool_fire_distance_var = StringVar(value=str(getattr(defaults, 'pool_fire_distance_m', 20.0)))
     pool_fire_fraction_var = StringVar(value=str(getattr(defaults, 'pool_fire_radiative_fraction', 0.35)))
     pool_fire_tau_var = StringVar(value=str(getattr(defaults, 'pool_fire_atmospheric_transmissivity', 1.0)))
+    pool_thickness_var = StringVar(value=str(getattr(defaults, 'pool_min_thickness_m', 0.01)))
+    pool_vapour_pressure_var = StringVar(value=str(getattr(defaults, 'pool_vapour_pressure_pa', 10000.0)))
+    pool_mw_var = StringVar(value=str(getattr(defaults, 'pool_molecular_weight_kg_kmol', 100.0)))
+    pool_temperature_var = StringVar(value=str(getattr(defaults, 'pool_temperature_k', 288.15)))
+    pool_burning_rate_var = StringVar(value=str(getattr(defaults, 'pool_burning_rate_kg_m2_s', 0.055)))
+    pool_heat_combustion_var = StringVar(value=str(getattr(defaults, 'pool_heat_combustion_kj_kg', 44000.0)))
+    pool_time_var = StringVar(value=str(getattr(defaults, 'pool_simulation_time_s', 600.0)))
 
     def add_label_entry(row, col, text, var, parent=frame):
         ttk.Label(parent, text=text).grid(row=row, column=col, sticky="w", padx=5, pady=4)
@@ -74,6 +85,7 @@ def create_consequence_input_ui(root):
     add_label_entry(1, 0, "Gas density (kg/m3)", gas_density_var)
     add_label_entry(1, 1, "Liquid density (kg/m3)", liquid_density_var)
     add_label_entry(1, 2, "GOR (-)", gor_var)
+    add_label_entry(1, 3, "Air density (kg/m3)", air_density_var)
 
     add_label_entry(3, 0, "Wind speed (m/s)", wind_speed_var)
     add_label_entry(3, 1, "Release height (m)", height_var)
@@ -93,6 +105,7 @@ def create_consequence_input_ui(root):
     add_label_entry(7, 0, "Puff time (s)", puff_time_var)
     add_label_entry(7, 1, "Release duration (s)", duration_var)
     add_label_entry(7, 2, "Critical conc. (kg/m3)", critical_conc_var)
+    add_label_entry(7, 3, "Gas mol. weight (kg/kmol)", gas_mw_var)
 
     explosion_frame = ttk.LabelFrame(frame, text="Explosion Model Inputs (TNT / TNO / BST)", padding=8)
     explosion_frame.grid(row=9, column=0, columnspan=4, sticky="ew", padx=5, pady=(10, 0))
@@ -103,6 +116,8 @@ def create_consequence_input_ui(root):
     add_label_entry(0, 3, "TNT heat (kJ/kg)", explosion_tnt_heat_var, parent=explosion_frame)
     add_label_entry(2, 0, "Distance (m)", explosion_distance_var, parent=explosion_frame)
     add_label_entry(2, 1, "Ambient pressure p0 (bar)", explosion_p0_var, parent=explosion_frame)
+    add_label_entry(2, 2, "LFL (vol %)", explosion_lfl_var, parent=explosion_frame)
+    add_label_entry(2, 3, "UFL (vol %)", explosion_ufl_var, parent=explosion_frame)
 
     pool_fire_frame = ttk.LabelFrame(frame, text="Pool Fire Model Inputs", padding=8)
     pool_fire_frame.grid(row=10, column=0, columnspan=4, sticky="ew", padx=5, pady=(10, 0))
@@ -112,6 +127,16 @@ def create_consequence_input_ui(root):
     add_label_entry(2, 0, "Radiative fraction f (0-1)", pool_fire_fraction_var, parent=pool_fire_frame)
     add_label_entry(2, 1, "Transmissivity tau (0-1)", pool_fire_tau_var, parent=pool_fire_frame)
 
+    pool_frame = ttk.LabelFrame(frame, text="Liquid Pool Spread / Evaporation Inputs", padding=8)
+    pool_frame.grid(row=11, column=0, columnspan=4, sticky="ew", padx=5, pady=(10, 0))
+    add_label_entry(0, 0, "Min. thickness (m)", pool_thickness_var, parent=pool_frame)
+    add_label_entry(0, 1, "Vapour pressure (Pa)", pool_vapour_pressure_var, parent=pool_frame)
+    add_label_entry(0, 2, "Molecular weight (kg/kmol)", pool_mw_var, parent=pool_frame)
+    add_label_entry(0, 3, "Liquid temperature (K)", pool_temperature_var, parent=pool_frame)
+    add_label_entry(2, 0, "Burning rate (kg/m2/s)", pool_burning_rate_var, parent=pool_frame)
+    add_label_entry(2, 1, "Heat combustion (kJ/kg)", pool_heat_combustion_var, parent=pool_frame)
+    add_label_entry(2, 2, "Simulated time (s)", pool_time_var, parent=pool_frame)
+
     def save_params():
         if update_params is None:
             messagebox.showerror("Error", "Consequence input state is unavailable.")
@@ -120,10 +145,33 @@ def create_consequence_input_ui(root):
             eta_val = float(explosion_eta_var.get())
             if not 0.005 <= eta_val <= 0.2:
                 raise ValueError("Eta must be between 0.005 and 0.2.")
+            lfl_val = float(explosion_lfl_var.get())
+            ufl_val = float(explosion_ufl_var.get())
+            if not 0 < lfl_val < ufl_val <= 100:
+                raise ValueError("Flammability limits must satisfy 0 < LFL < UFL <= 100 vol %.")
+            air_density_val = float(air_density_var.get())
+            if air_density_val <= 0:
+                raise ValueError("Air density must be positive.")
+            gas_mw_val = float(gas_mw_var.get())
+            if gas_mw_val <= 0:
+                raise ValueError("Gas molecular weight must be positive.")
+            pool_values = {
+                'pool_min_thickness_m': float(pool_thickness_var.get()),
+                'pool_vapour_pressure_pa': float(pool_vapour_pressure_var.get()),
+                'pool_molecular_weight_kg_kmol': float(pool_mw_var.get()),
+                'pool_temperature_k': float(pool_temperature_var.get()),
+                'pool_burning_rate_kg_m2_s': float(pool_burning_rate_var.get()),
+                'pool_heat_combustion_kj_kg': float(pool_heat_combustion_var.get()),
+                'pool_simulation_time_s': float(pool_time_var.get()),
+            }
+            if any(value <= 0 for value in pool_values.values()):
+                raise ValueError("Pool spread inputs must be positive numbers.")
             update_params(
                 gas_density_kg_m3=float(gas_density_var.get()),
+                gas_molecular_weight_kg_kmol=gas_mw_val,
                 liquid_density_kg_m3=float(liquid_density_var.get()),
                 gor=float(gor_var.get()),
+                air_density_kg_m3=air_density_val,
                 wind_speed_m_s=float(wind_speed_var.get()),
                 release_height_m=float(height_var.get()),
                 stability_class=stability_var.get().strip().upper(),
@@ -140,17 +188,20 @@ def create_consequence_input_ui(root):
                 explosion_tnt_heat_combustion_kj_kg=float(explosion_tnt_heat_var.get()),
                 explosion_distance_m=float(explosion_distance_var.get()),
                 explosion_ambient_pressure_bar=float(explosion_p0_var.get()),
+                explosion_lfl_vol_pct=lfl_val,
+                explosion_ufl_vol_pct=ufl_val,
                 pool_fire_heat_release_rate_kw=float(pool_fire_q_var.get()),
                 pool_fire_diameter_m=float(pool_fire_diameter_var.get()),
                 pool_fire_distance_m=float(pool_fire_distance_var.get()),
                 pool_fire_radiative_fraction=float(pool_fire_fraction_var.get()),
                 pool_fire_atmospheric_transmissivity=float(pool_fire_tau_var.get()),
+                **pool_values,
             )
             messagebox.showinfo("Saved", "Consequence inputs saved.")
         except ValueError as exc:
             messagebox.showerror("Error", str(exc) or "Please enter valid numeric values.")
 
     save_button = tb.Button(frame, text="Save Inputs", bootstyle=SUCCESS, command=save_params)
-    save_button.grid(row=11, column=0, sticky="w", padx=5, pady=10)
+    save_button.grid(row=12, column=0, sticky="w", padx=5, pady=10)
 
     return frame
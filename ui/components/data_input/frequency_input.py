@@ -14,6 +14,8 @@ FUNCTIONS:
                 Configure the scroll region of the inner canvas.
             set_fuel_phase(value):
                 Set the selected fuel phase in the menu.
+            import_register_file():
+                Build groups from a CSV/XLSX equipment register (register_import.py).
 """
 
 '''IMPORT STATEMENTS'''
@@ -25,6 +27,7 @@ from tkinter import Canvas
 from tkinter import StringVar
 from tkinter.font import Font
 from tkinter import messagebox
+from tkinter import filedialog
 import sys
 import os
 
@@ -127,7 +130,33 @@ def create_group_ui(root):
     
     # Reset button
     ttk.Label(controls_frame, text="Reset All Groups").pack(anchor=W, pady=(5, 5))
-    ttk.Button(controls_frame, text="Reset", bootstyle=DANGER, width=15, command=reset_groups).pack(fill=X, pady=(0, 5))
+    ttk.Button(controls_frame, text="Reset", bootstyle=DANGER, width=15, command=reset_groups).pack(fill=X, pady=(0, 15))
+
+    '''FUNCTION: import_register_file() builds groups from a line list / parts-count file'''
+    def import_register_file():
+        """Import an equipment register (CSV/XLSX) and add its groups."""
+        path = filedialog.askopenfilename(
+            title="Import Equipment Register",
+            filetypes=[("Registers", "*.csv *.xlsx"), ("CSV", "*.csv"), ("Excel", "*.xlsx")],
+        )
+        if not path:
+            return
+        from register_import import import_register
+        try:
+            groups, report = import_register(path, group_manager)
+        except Exception as e:
+            messagebox.showerror("Import Failed", str(e))
+            return
+        update_groups_display()
+        summary = f"Created {len(groups)} group(s).\n\n{report.summary(limit=15)}"
+        if report.ok:
+            messagebox.showinfo("Import Complete", summary)
+        else:
+            messagebox.showwarning("Import Completed With Errors", summary)
+
+    # Import button
+    ttk.Label(controls_frame, text="Import Register").pack(anchor=W, pady=(5, 5))
+    ttk.Button(controls_frame, text="Import...", bootstyle=SECONDARY, width=15, command=import_register_file).pack(fill=X, pady=(0, 5))
     
     # Create a labeled frame to group row headers and groups view
     view_all_frame = ttk.LabelFrame(grouping_frame, text="View of All Groups", padding=5)
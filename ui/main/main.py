@@ -22,6 +22,12 @@ NOTE: The Icons must be change so that Windows can also display them properly.
 
 '''IMPORT STATEMENTS'''
 
+import os
+import sys
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+import startup_timing
+startup_timing.mark('python started')
+
 # Debug block for ttkbootstrap availability check
 import ttkbootstrap as tb
 try:
@@ -35,15 +41,11 @@ except Exception:
     TB_AVAILABLE = False
 import tkinter as tk
 from tkinter import ttk
-import sys
-import os
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../components/data_input')))
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../components/analysis/frequency')))
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../components/analysis/consequence')))
-from frequency_input import create_group_ui
-from frequency_analysis import create_frequency_analysis_ui
-from consequence_input import create_consequence_input_ui
-from consequence_analysis import create_consequence_analysis_ui
+# Panel modules are imported when their tab is first opened (see build()).
+startup_timing.mark('toolkit imported')
 
 '''build(root, style=None): FUNCTION'''
 
@@ -151,37 +153,83 @@ def build(root, style=None):
     # Extra tab
     outer.add(tb.Frame(outer) if TB_AVAILABLE else ttk.Frame(outer), text='⚙️ Extra')
 
+    # Panels are built the first time their tab is shown, so start-up only
+    # pays for the visible tab. Keys are Tk widget paths of the tab frames.
+    lazy_tabs = {}
+    inner_notebooks = {str(data_frame): inner, str(analysis_frame): analysis_inner}
+
+    def build_selected(notebook):
+        selected = notebook.select()
+        builder = lazy_tabs.pop(selected, None)
+        if builder is not None:
+            with startup_timing.timed(f"build {notebook.tab(selected, 'text')}"):
+                builder()
+        if notebook is outer and selected in inner_notebooks:
+            build_selected(inner_notebooks[selected])
+
+    def on_tab_changed(event):
+        build_selected(event.widget)
+
+    for notebook in (outer, inner, analysis_inner):
+        notebook.bind('<<NotebookTabChanged>>', on_tab_changed, add='+')
+
     # Put placeholder content in the parameter tab replicating the wireframe
     lbl = tb.Label(param, text='Parameter Input area — add widgets here', anchor='center') if TB_AVAILABLE else ttk.Label(param, text='Parameter Input area — add widgets here', anchor='center')
     lbl.pack(fill='both', expand=True, padx=12, pady=12)
 
-    # Replace placeholder content in the Frequency Data tab with the frame from frequency_data.py
-    for widget in freq.winfo_children():
-        widget.destroy()  # Clear placeholder content
-    generate_analysis_callback = create_group_ui(freq)
+    # The Generate Analysis button in frequency_input refreshes the Frequency
+    # Analysis panel, building it first if it has not been opened yet.
+    freq_analysis_refresh = {'function': None}
+
+    def build_frequency_input():
+        from frequency_input import create_group_ui
+        # Replace placeholder content in the Frequency Data tab with the frame from frequency_data.py
+        for widget in freq.winfo_children():
+            widget.destroy()  # Clear placeholder content
+        generate_analysis_callback = create_group_ui(freq)
+        # Connect the Generate Analysis button in frequency_input to the refresh function
+        if generate_analysis_callback is not None:
+            generate_analysis_callback['function'] = refresh_frequency_analysis
 
-    for widget in cons.winfo_children():
-        widget.destroy()
-    create_consequence_input_ui(cons)
+    def build_consequence_input():
+        from consequence_input import create_consequence_input_ui
+        for widget in cons.winfo_children():
+            widget.destroy()
+        create_consequence_input_ui(cons)
+
+    def build_frequency_analysis():
+        from frequency_analysis import create_frequency_analysis_ui
+        # Add frequency analysis UI to Frequency Analysis tab and get refresh function
+        freq_analysis_frame, refresh_analysis = create_frequency_analysis_ui(freq_analysis)
+        freq_analysis_refresh['function'] = refresh_analysis
+
+    def refresh_frequency_analysis():
+        builder = lazy_tabs.pop(str(freq_analysis), None)
+        if builder is not None:
+            builder()  # a freshly built panel loads its data itself
+        elif freq_analysis_refresh['function'] is not None:
+            freq_analysis_refresh['function']()
+
+    def build_consequence_analysis():
+        from consequence_analysis import create_consequence_analysis_ui
+        for widget in cons_analysis.winfo_children():
+            widget.destroy()
+        create_consequence_analysis_ui(cons_analysis)
+
+    lazy_tabs[str(freq)] = build_frequency_input
+    lazy_tabs[str(cons)] = build_consequence_input
+    lazy_tabs[str(freq_analysis)] = build_frequency_analysis
+    lazy_tabs[str(cons_analysis)] = build_consequence_analysis
 
     lbl4 = tb.Label(safety, text='Safety system & Human factor area — add widgets here', anchor='center') if TB_AVAILABLE else ttk.Label(safety, text='Safety system & Human factor area — add widgets here', anchor='center')
     lbl4.pack(fill='both', expand=True, padx=12, pady=12)
 
-    # Add frequency analysis UI to Frequency Analysis tab and get refresh function
-    freq_analysis_frame, refresh_analysis = create_frequency_analysis_ui(freq_analysis)
-    
-    # Connect the Generate Analysis button in frequency_input to the refresh function
-    if generate_analysis_callback is not None:
-        generate_analysis_callback['function'] = refresh_analysis
-    
-    # Add placeholder content for other analysis tabs
-    for widget in cons_analysis.winfo_children():
-        widget.destroy()
-    create_consequence_analysis_ui(cons_analysis)
-    
     lbl_risk = tb.Label(risk_assessment, text='Risk Assessment area — add widgets here', anchor='center') if TB_AVAILABLE else ttk.Label(risk_assessment, text='Risk Assessment area — add widgets here', anchor='center')
     lbl_risk.pack(fill='both', expand=True, padx=12, pady=12)
 
+    # Build whatever is visible at start-up
+    build_selected(outer)
+
     return root
 
 '''main(): FUNCTION'''
@@ -198,9 +246,17 @@ def main():
         style = ttk.Style(root)
         print("ttkbootstrap not available — using default ttk style")
 
+    startup_timing.mark('window created')
     root.geometry('1100x760')
     build(root, style=style)
     root.title('NAOME Risk Assessment Software')
+    startup_timing.mark('ui built')
+
+    def first_idle():
+        startup_timing.mark('first idle')
+        startup_timing.print_report()
+
+    root.after_idle(first_idle)
     root.mainloop()
 
 
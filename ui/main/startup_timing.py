@@ -0,0 +1,66 @@
+"""
+FILE: startup_timing.py
+DESCRIPTION:
+    Start-up timing report for the Tk application.
+    main.py records named marks while it starts (imports, window creation,
+    first panel build, first idle frame). Set RISK_STARTUP_TIMING=1 to print
+    the report once the window is idle; lazily built panels report their build
+    time when they are first opened.
+
+    For a per-module import breakdown run:
+        python -X importtime ui/main/main.py 2> import_times.txt
+FUNCTIONS:
+    mark(label): Record the time since start-up under `label`.
+    enabled() -> bool: Whether reporting is switched on.
+    report() -> str: Format the recorded marks as a table.
+    print_report(): Print the report if enabled.
+    timed(label): Context manager recording the duration of a block.
+"""
+import os
+import sys
+import time
+from contextlib import contextmanager
+
+_START = time.perf_counter()
+_MARKS = []
+ENV_VAR = "RISK_STARTUP_TIMING"
+# Cold start target for the main window to become idle.
+BUDGET_S = 1.0
+
+
+def enabled() -> bool:
+    return os.environ.get(ENV_VAR, "").strip().lower() in ("1", "true", "yes", "on")
+
+
+def mark(label):
+    """Record seconds since start-up and the number of loaded modules."""
+    _MARKS.append((label, time.perf_counter() - _START, len(sys.modules)))
+
+
+@contextmanager
+def timed(label):
+    """Record how long the enclosed block took (printed immediately if enabled)."""
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        elapsed = time.perf_counter() - started
+        _MARKS.append((f"{label} ({elapsed * 1000:.0f} ms)", time.perf_counter() - _START, len(sys.modules)))
+        if enabled():
+            print(f"[startup] {label}: {elapsed * 1000:.0f} ms")
+
+
+def report() -> str:
+    lines = [f"{'Mark':<50} {'t (s)':>8} {'modules':>8}"]
+    for label, seconds, modules in _MARKS:
+        lines.append(f"{label:<50} {seconds:>8.3f} {modules:>8}")
+    if _MARKS:
+        total = _MARKS[-1][1]
+        status = "within" if total <= BUDGET_S else "OVER"
+        lines.append(f"Start-up {total:.3f}s ({status} {BUDGET_S:.1f}s budget)")
+    return "\n".join(lines)
+
+
+def print_report():
+    if enabled():
+        print(report())
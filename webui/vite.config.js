@@ -5,6 +5,10 @@ export default defineConfig({
   plugins: [react()],
   server: {
     port: 5173,
-    host: true
+    host: true,
+    // Calculation endpoints are served by middleware/api_service.py
+    proxy: {
+      '/api': 'http://127.0.0.1:8000'
+    }
   }
 });